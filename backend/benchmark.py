@@ -0,0 +1,345 @@
+"""
+Endpoint latency benchmark for the ML API.
+Drives every route in main.py through an in-process ASGI client against a
+deterministic synthetic dataset (db/local_store.py, built from seed/constants) and
+reports cold latency, p50/p95/p99, throughput at a fixed concurrency and peak RSS
+per endpoint. Results are written as JSON; a saved baseline turns a later run into
+a regression check.
+
+    python benchmark.py --scale 100k
+    python benchmark.py --scale 100k --save-baseline
+    python benchmark.py --scale 100k --compare      # exit 1 on p95 / DB-stage regressions
+
+httpx (a FastAPI test dependency) provides the ASGI client.
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import platform
+import resource
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BACKEND_DIR, ".bench_data")
+BASELINE_DIR = os.path.join(BACKEND_DIR, "benchmark_baselines")
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+# Fixed seed so every run of a scale sees the same records (dated relative to the build day)
+BENCH_SEED = 20240301
+DEFAULT_REQUESTS = 50
+DEFAULT_CONCURRENCY = 8
+DEFAULT_WARMUP = 2
+# p95 growth over the baseline that counts as a regression, and an absolute noise floor
+REGRESSION_TOLERANCE = 0.20
+REGRESSION_FLOOR_MS = 5.0
+RSS_SAMPLE_SECONDS = 0.005
+
+# One representative request per route: (method, path, query params, JSON body)
+SCENARIOS = [
+    ("GET", "/", None, None),
+    ("GET", "/health", None, None),
+    ("GET", "/stats", None, None),
+    ("GET", "/forecast", {"disease": "Dengue", "days": 30}, None),
+    ("GET", "/clusters", {"disease": "Dengue"}, None),
+    ("GET", "/anomalies", {"disease": "Dengue"}, None),
+    ("GET", "/r-value", {"disease": "Dengue"}, None),
+    ("GET", "/situation-report", {"disease": "Dengue"}, None),
+    ("GET", "/forecast-nowcast", {"disease": "Dengue", "days": 30}, None),
+    ("POST", "/forecast/batch", None, {"series": [{"disease": "Dengue"}, {"disease": "Malaria", "city": "Mumbai"}], "days": 30}),
+    ("GET", "/r-value-breakdown", {"city": "Mumbai"}, None),
+    ("GET", "/rt-matrix", {"history": 14}, None),
+    ("GET", "/metapop-simulate", {"disease": "Dengue"}, None),
+    ("GET", "/sir-simulate", {"disease": "Dengue"}, None),
+    ("GET", "/sir-stochastic", {"disease": "Typhoid", "ward": "Dadar"}, None),
+    ("GET", "/sir-fit", {"disease": "Dengue"}, None),
+    ("GET", "/sir-ensemble", {"disease": "Typhoid"}, None),
+    ("POST", "/recommend-intervention", None, {"disease": "Dengue", "current_cases": 50}),
+    ("POST", "/intervention-optimize", None, {"disease": "Dengue"}),
+    ("GET", "/metrics", None, None),
+    ("GET", "/slow-requests", None, None),
+    # {profile_id} is a profile recorded at startup (see record_profile); sent with the admin token
+    ("GET", "/profiles/{profile_id}", None, None),
+]
+
+
+def build_dataset(scale: str, rebuild: bool = False) -> str:
+    """Path of the SQLite dataset for a scale, building it for today if needed."""
+    from db.local_store import LocalClient
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    day = datetime.now(timezone.utc).strftime("%Y%m%d")
+    path = os.path.join(DATA_DIR, f"{scale}-{day}.db")
+    if rebuild or not os.path.exists(path):
+        # Datasets are anchored to the build day; drop older builds of this scale
+        for stale in glob.glob(os.path.join(DATA_DIR, f"{scale}-*.db")):
+            os.remove(stale)
+        started = time.perf_counter()
+        LocalClient(path).load_synthetic(SCALES[scale], seed=BENCH_SEED)
+        print(f"Built {scale} dataset in {time.perf_counter() - started:.1f}s: {path}")
+    return path
+
+
+def current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """Background thread tracking the API process's peak RSS while an endpoint runs."""
+
+    def __init__(self):
+        self.peak = current_rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss_bytes())
+            self._stop.wait(RSS_SAMPLE_SECONDS)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_bytes())
+
+
+async def _send(client, method: str, path: str, params, body):
+    started = time.perf_counter()
+    response = await client.request(method, path, params=params, json=body)
+    await response.aread()
+    return (time.perf_counter() - started) * 1000, response.status_code
+
+
+def stage_totals(path: str) -> dict:
+    """Per-stage (requests, seconds) recorded so far by the metrics middleware for a route."""
+    from metrics import STAGE_LATENCY
+
+    totals = {}
+    with STAGE_LATENCY._lock:
+        for (endpoint, name), series in STAGE_LATENCY._series.items():
+            if endpoint == path:
+                totals[name] = (sum(series[:-1]), series[-1])
+    return totals
+
+
+async def bench_endpoint(client, method: str, route: str, path_params: dict, params, body, requests: int, concurrency: int, warmup: int) -> dict:
+    """
+    Cold request, warmup, then `requests` requests from `concurrency` concurrent workers
+    to `route` with its {placeholders} filled from `path_params`.
+    Stage means (fetch, frame, model, ...) cover the measured requests only, so a slower
+    database aggregate shows up even when model caches keep the total flat.
+    """
+    url = route.format(**path_params)
+    rss_before = current_rss_bytes()
+    with RssSampler() as sampler:
+        cold_ms, status = await _send(client, method, url, params, body)
+        for _ in range(warmup):
+            await _send(client, method, url, params, body)
+
+        latencies, statuses = [], {}
+        remaining = requests
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                ms, code = await _send(client, method, url, params, body)
+                latencies.append(ms)
+                statuses[code] = statuses.get(code, 0) + 1
+
+        stages_before = stage_totals(route)
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+        stages_after = stage_totals(route)
+
+    lat = np.array(latencies)
+    return {
+        "method": method,
+        "path": route,
+        "status": status,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "cold_ms": round(cold_ms, 2),
+        "p50_ms": round(float(np.percentile(lat, 50)), 2),
+        "p95_ms": round(float(np.percentile(lat, 95)), 2),
+        "p99_ms": round(float(np.percentile(lat, 99)), 2),
+        "mean_ms": round(float(lat.mean()), 2),
+        "throughput_rps": round(len(lat) / wall, 2) if wall > 0 else None,
+        "peak_rss_mb": round(sampler.peak / 2**20, 1),
+        "rss_growth_mb": round((sampler.peak - rss_before) / 2**20, 1),
+        # Mean time per measured request in each stage it entered
+        "stages_mean_ms": {
+            name: round((seconds - stages_before.get(name, (0, 0.0))[1]) * 1000 / len(lat), 2)
+            for name, (count, seconds) in sorted(stages_after.items())
+            if count > stages_before.get(name, (0, 0.0))[0]
+        },
+    }
+
+
+async def record_profile(client) -> str:
+    """Profile one cheap request so /profiles has a real profile to serve."""
+    response = await client.get("/health", headers={"X-Profile": "1"})
+    profile_id = response.headers.get("x-profile-id")
+    if profile_id is None:
+        raise SystemExit("Profiling did not record the benchmark's profile request")
+    return profile_id
+
+
+def scenarios_for(app) -> list:
+    """SCENARIOS plus a bare request for any route added to main.py without one."""
+    from fastapi.routing import APIRoute
+
+    covered = {(m, p) for m, p, _, _ in SCENARIOS}
+    extra = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        for method in sorted(route.methods - {"HEAD", "OPTIONS"}):
+            if (method, route.path) not in covered:
+                print(f"Warning: no benchmark scenario for {method} {route.path}; sending a bare request")
+                extra.append((method, route.path, None, {} if method == "POST" else None))
+    return SCENARIOS + extra
+
+
+async def run_benchmark(scale: str, requests: int, concurrency: int, warmup: int, only=None, rebuild: bool = False) -> dict:
+    db_path = build_dataset(scale, rebuild)
+    # main.py picks its data backend at import time
+    os.environ["DATA_BACKEND"] = "local"
+    os.environ["LOCAL_DB_PATH"] = db_path
+    os.environ.pop("GEMINI_API_KEY", None)  # no network calls from LLM-backed endpoints
+    os.environ.setdefault("SIR_CACHE_DIR", os.path.join(DATA_DIR, "sir_cache"))
+    # Measure live compute, not answers a background precompute run happens to have stored
+    os.environ["PRECOMPUTE_ENABLED"] = "0"
+    # Admin endpoints (/profiles) are measured with a throwaway token; only requests
+    # that also send X-Profile are profiled, so the token changes nothing else
+    admin_token = secrets.token_hex(16)
+    os.environ["ADMIN_TOKEN"] = admin_token
+    os.environ["PROFILE_DIR"] = os.path.join(DATA_DIR, "profiles")
+    import httpx
+    import main
+
+    if getattr(main.supabase, "path", None) != db_path:
+        raise SystemExit(f"main.py is not serving the benchmark dataset {db_path}")
+    results = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None, headers={"X-Admin-Token": admin_token}) as client:
+            path_params = {"profile_id": await record_profile(client)}
+            for method, path, params, body in scenarios_for(main.app):
+                name = f"{method} {path}"
+                if only and not any(o in path for o in only):
+                    continue
+                results[name] = await bench_endpoint(client, method, path, path_params, params, body, requests, concurrency, warmup)
+                r = results[name]
+                print(f"{name:32s} {r['status']}  cold {r['cold_ms']:9.1f}  p50 {r['p50_ms']:8.1f}  p95 {r['p95_ms']:8.1f}  "
+                      f"p99 {r['p99_ms']:8.1f} ms  {r['throughput_rps']:8.1f} req/s  rss {r['peak_rss_mb']:7.1f} MB")
+
+    return {
+        "scale": scale,
+        "records": SCALES[scale],
+        "seed": BENCH_SEED,
+        "git_commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {"requests": requests, "concurrency": concurrency, "warmup": warmup, "compute_workers": main.compute_pool.workers},
+        "endpoints": results,
+    }
+
+
+# Request stages whose mean is compared on its own, so database regressions are not
+# masked by model caches absorbing the rest of the request
+COMPARED_STAGES = ("fetch", "frame")
+
+
+def _regressed(previous: float, current: float, tolerance: float) -> bool:
+    return current > previous * (1 + tolerance) and current - previous > REGRESSION_FLOOR_MS
+
+
+def compare(results: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE) -> list:
+    """Endpoints whose p95 or database-stage mean grew by more than `tolerance` (and the noise floor)."""
+    regressions = []
+    for name, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if previous is None:
+            continue
+        checks = [("p95_ms", previous["p95_ms"], current["p95_ms"])]
+        for stage_name in COMPARED_STAGES:
+            before = previous.get("stages_mean_ms", {}).get(stage_name)
+            after = current.get("stages_mean_ms", {}).get(stage_name)
+            if before is not None and after is not None:
+                checks.append((f"{stage_name}_mean_ms", before, after))
+        for metric, before, after in checks:
+            if _regressed(before, after, tolerance):
+                regressions.append({"endpoint": name, "metric": metric, "baseline": before, "current": after})
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every ML API endpoint in-process.")
+    parser.add_argument("--scale", choices=list(SCALES), default="10k")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="Measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="Unmeasured requests after the cold one")
+    parser.add_argument("--only", nargs="*", help="Only paths containing one of these substrings")
+    parser.add_argument("--output", help="Results JSON path (default: print only)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Write results to {os.path.basename(BASELINE_DIR)}/<scale>.json")
+    parser.add_argument("--compare", action="store_true", help="Compare with the saved baseline; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the synthetic dataset")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.scale, args.requests, args.concurrency, args.warmup, args.only, args.rebuild))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    baseline_path = os.path.join(BASELINE_DIR, f"{args.scale}.json")
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline: {baseline_path}")
+    if args.compare:
+        if not os.path.exists(baseline_path):
+            print(f"No baseline at {baseline_path}")
+            sys.exit(2)
+        with open(baseline_path) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['endpoint']}: {r['metric']} {r['baseline']} -> {r['current']} ms")
+        if regressions:
+            sys.exit(1)
+        print("No p95 or database-stage regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Single-flight coalescing of identical concurrent requests.
+When many clients ask for the same analytics result at once (an alert fires and
+everyone opens the same ward dashboard), only the first request runs; identical
+requests arriving while it is in flight wait for it and receive a replay of its
+response. Requests are identical when they hit the same route with the same
+normalized parameters: query values with the route's defaults filled in, path
+parameters, the canonical JSON body and the request headers that change the
+response.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import Dict, Iterable, Optional
+from urllib.parse import parse_qsl
+
+from starlette.routing import Match
+
+from metrics import stage
+from profiling import profiling_active
+
+
+# Request headers that can change a response (conditional GETs on /rt-matrix)
+VARY_HEADERS = (b"if-none-match", b"accept")
+
+
+class _Flight:
+    """One in-flight leader request and the response it will share."""
+
+    def __init__(self):
+        self.done = asyncio.Event()
+        self.response = None  # (status, headers, body) once the leader finished
+
+
+def _normalize_value(value) -> str:
+    text = str(value)
+    return text.lower() if text.lower() in ("true", "false") else text
+
+
+def _query_defaults(route) -> Dict[str, str]:
+    """Declared query parameters with defaults, as strings, for a FastAPI route."""
+    defaults = {}
+    dependant = getattr(route, "dependant", None)
+    for field in getattr(dependant, "query_params", []) or []:
+        default = getattr(field, "default", None)
+        if getattr(field, "required", False) or default is None:
+            continue
+        defaults[getattr(field, "alias", None) or field.name] = _normalize_value(default)
+    return defaults
+
+
+class SingleFlightGroup:
+    """In-flight requests by key, plus fan-in counters."""
+
+    def __init__(self):
+        self.flights: Dict[str, _Flight] = {}
+        self.leaders = 0
+        self.hits = 0
+        self.waiting = 0
+        self.wait_seconds = 0.0
+        self.fallbacks = 0
+
+    def stats(self) -> dict:
+        total = self.leaders + self.hits
+        return {
+            "leaders": self.leaders,
+            "hits": self.hits,
+            "waiting": self.waiting,
+            "in_flight": len(self.flights),
+            "wait_seconds_total": round(self.wait_seconds, 3),
+            "fallbacks": self.fallbacks,
+            "fan_in": round(total / self.leaders, 3) if self.leaders else None,
+        }
+
+
+singleflight = SingleFlightGroup()
+
+
+class SingleFlightMiddleware:
+    """ASGI middleware sharing one execution among identical concurrent requests."""
+
+    def __init__(self, app, group: SingleFlightGroup = singleflight, exclude: Iterable[str] = ()):
+        self.app = app
+        self.group = group
+        self.exclude = set(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "POST") or profiling_active():
+            return await self.app(scope, receive, send)
+
+        route, path_params = self._match(scope)
+        if route is None or route.path in self.exclude:
+            return await self.app(scope, receive, send)
+
+        body = b""
+        if scope["method"] == "POST":
+            body, receive = await _buffer_body(receive)
+        key = self._key(scope, route, path_params, body)
+
+        flight = self.group.flights.get(key)
+        if flight is not None:
+            return await self._follow(flight, scope, receive, send)
+
+        flight = self.group.flights[key] = _Flight()
+        self.group.leaders += 1
+        captured = {"status": None, "headers": [], "body": []}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                captured["headers"] = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                captured["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+            if captured["status"] is not None:
+                flight.response = (captured["status"], captured["headers"], b"".join(captured["body"]))
+        finally:
+            # Leader errors or cancellation leave response unset: waiters run themselves
+            del self.group.flights[key]
+            flight.done.set()
+
+    async def _follow(self, flight: _Flight, scope, receive, send):
+        self.group.waiting += 1
+        started = time.perf_counter()
+        try:
+            with stage("coalesced_wait"):
+                await flight.done.wait()
+        finally:
+            self.group.waiting -= 1
+            self.group.wait_seconds += time.perf_counter() - started
+
+        if flight.response is None:
+            self.group.fallbacks += 1
+            return await self.app(scope, receive, send)
+        self.group.hits += 1
+        status, headers, body = flight.response
+        await send({"type": "http.response.start", "status": status, "headers": headers + [(b"x-coalesced", b"1")]})
+        await send({"type": "http.response.body", "body": body})
+
+    def _match(self, scope):
+        app = scope.get("app")
+        for route in getattr(getattr(app, "router", None), "routes", []):
+            match, child = route.matches(scope)
+            if match == Match.FULL:
+                return route, child.get("path_params", {})
+        return None, None
+
+    def _key(self, scope, route, path_params: dict, body: bytes) -> str:
+        params = _query_defaults(route)
+        for name, value in parse_qsl(scope.get("query_string", b"").decode(), keep_blank_values=True):
+            params[name] = _normalize_value(value)
+        headers = dict(scope.get("headers") or [])
+        parts = {
+            "method": scope["method"],
+            "route": route.path,
+            "path": {k: str(v) for k, v in path_params.items()},
+            "query": sorted(params.items()),
+            "body": _canonical_body(body),
+            "headers": [headers.get(h, b"").decode() for h in VARY_HEADERS],
+        }
+        return hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def _canonical_body(body: bytes) -> Optional[str]:
+    if not body:
+        return None
+    try:
+        return json.dumps(json.loads(body), sort_keys=True)
+    except ValueError:
+        return hashlib.sha1(body).hexdigest()
+
+
+async def _buffer_body(receive):
+    """Read the whole request body and return it with a receive() that replays it."""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    body = b"".join(chunks)
+    replayed = False
+
+    async def replay():
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay
@@ -0,0 +1,92 @@
+"""
+Process-pool compute tier for CPU-bound model work.
+Prophet fits, IsolationForest, DBSCAN and ODE integration run in warm worker
+processes instead of Starlette's threadpool, so a slow fit never holds the GIL
+that cheap endpoints need. Admission control rejects work with 503 once the
+bounded queue is full instead of letting latency grow without limit.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from metrics import stage
+from profiling import profiling_active
+
+
+# COMPUTE_WORKERS=0 runs jobs inline on the threadpool (local debugging)
+COMPUTE_WORKERS = int(os.getenv("COMPUTE_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+# Max jobs running + waiting before new work is rejected
+COMPUTE_QUEUE_LIMIT = int(os.getenv("COMPUTE_QUEUE_LIMIT", str(max(1, COMPUTE_WORKERS) * 4)))
+
+
+def _warm_worker():
+    """Pre-import the heavy ML stacks once per worker so the first job does not pay for it."""
+    for module in ("prophet", "sklearn.ensemble", "sklearn.cluster", "scipy.integrate", "pandas", "numpy"):
+        try:
+            __import__(module)
+        except ImportError as e:
+            print(f"Compute worker could not pre-import {module}: {e}")
+
+
+class ComputePool:
+    """Warm ProcessPoolExecutor with a bounded admission queue."""
+
+    def __init__(self, workers: int = COMPUTE_WORKERS, queue_limit: int = COMPUTE_QUEUE_LIMIT):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.inflight = 0
+        self.rejected = 0
+        self._executor = None
+
+    def start(self):
+        if self.workers <= 0 or self._executor is not None:
+            return
+        # spawn: forking a process that already runs an event loop and threads is unsafe
+        ctx = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx, initializer=_warm_worker)
+        # Start every worker now rather than on the first request
+        for _ in range(self.workers):
+            self._executor.submit(_warm_worker)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` on the pool; fn and its arguments must be picklable."""
+        if self.inflight >= self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Compute capacity saturated, please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+
+        self.inflight += 1
+        try:
+            with stage("model"):
+                # Profiled requests compute in-process so the sampler sees the model code
+                if self._executor is None or profiling_active():
+                    return await run_in_threadpool(fn, *args, **kwargs)
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+        finally:
+            self.inflight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "inflight": self.inflight,
+            "rejected": self.rejected,
+        }
+
+
+compute_pool = ComputePool()
@@ -0,0 +1 @@
+# Data access package
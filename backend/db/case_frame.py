@@ -0,0 +1,85 @@
+"""
+Per-request case frame.
+Fetches the daily counts for one (disease, geography) once and lazily derives the
+views individual steps need (daily series, calendar, active cases, Rt), so a request
+that chains several analyses never re-fetches or re-parses the same data.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+from db.daily_counts import fetch_daily_counts, daily_series, active_cases_since, data_watermark, DAILY_COUNT_COLUMNS
+
+
+class CaseFrame:
+    """Daily counts for one request plus cached derived views."""
+
+    def __init__(self, counts: pd.DataFrame, disease: Optional[str] = None):
+        self.counts = counts
+        self.disease = disease
+        self._daily = None
+        self._calendar = None
+
+    @classmethod
+    def fetch(cls, client, disease: Optional[str] = None, state: Optional[str] = None, city: Optional[str] = None, ward: Optional[str] = None, by_ward: bool = False) -> "CaseFrame":
+        return cls(fetch_daily_counts(client, disease=disease, state=state, city=city, ward=ward, by_ward=by_ward), disease)
+
+    @classmethod
+    def empty(cls, disease: Optional[str] = None) -> "CaseFrame":
+        return cls(pd.DataFrame(columns=DAILY_COUNT_COLUMNS), disease)
+
+    @property
+    def daily(self) -> pd.DataFrame:
+        """(date, count) series, one row per day with cases."""
+        if self._daily is None:
+            self._daily = daily_series(self.counts)
+        return self._daily
+
+    @property
+    def calendar(self):
+        """(years, months) arrays for `daily`, parsed once."""
+        if self._calendar is None:
+            from ml.rt import calendar
+            self._calendar = calendar(self.daily['date'])
+        return self._calendar
+
+    def watermark(self) -> tuple:
+        return data_watermark(self.counts)
+
+    def active_cases(self, days: int = 14) -> int:
+        """Active-status cases recorded within the last `days` days."""
+        cutoff = pd.Timestamp.utcnow() - pd.Timedelta(days=days)
+        return active_cases_since(self.counts, cutoff)
+
+    def active_cases_by_ward(self, days: int = 14) -> pd.Series:
+        """Active cases per ward within the last `days` days (frame fetched with by_ward=True)."""
+        cutoff = (pd.Timestamp.utcnow() - pd.Timedelta(days=days)).tz_convert(None).normalize()
+        recent = self.counts[self.counts["date"] >= cutoff]
+        return recent.groupby("ward")["active_count"].sum()
+
+    def latest_rt(self, window: int = 7) -> Optional[float]:
+        """Current Rt as reported by /r-value, computing only the final window."""
+        from ml.rt import latest_rt
+        if len(self.daily) < window * 2:
+            return None
+        years, months = self.calendar
+        return latest_rt(self.daily['count'].to_numpy(), years, months, window, self.disease)
+
+    def incidence(self) -> np.ndarray:
+        """Daily counts on a complete calendar (zero-filled) up to the latest day."""
+        if self.daily.empty:
+            return np.zeros(0, dtype=int)
+        days = pd.date_range(self.daily['date'].min(), self.daily['date'].max(), freq="D")
+        return self.daily.set_index('date')['count'].reindex(days, fill_value=0).to_numpy(dtype=int)
+
+    def rt_posterior(self, window: Optional[int] = None) -> Optional[tuple]:
+        """Gamma (shape, scale) renewal-equation posterior of the latest Rt, None if too few cases."""
+        from ml.cori import cori_posterior, serial_interval_matrix, DEFAULT_WINDOW, MIN_WINDOW_CASES
+        incidence = self.incidence()
+        if len(incidence) == 0:
+            return None
+        post = cori_posterior(incidence[None, :], serial_interval_matrix([self.disease]), window or DEFAULT_WINDOW)
+        if post["window_cases"][0, -1] < MIN_WINDOW_CASES or post["window_lambda"][0, -1] <= 0:
+            return None
+        return float(post["shape"][0, -1]), float(post["scale"][0, -1])
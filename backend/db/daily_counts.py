@@ -0,0 +1,170 @@
+"""
+Daily case-count access layer.
+Reads pre-aggregated per-day counts from the `get_daily_case_counts` RPC so the
+time-series endpoints never pull raw medical records over the wire.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Optional, List
+
+from db.streaming import fetch_rpc
+from metrics import stage
+
+
+DAILY_COUNTS_RPC = "get_daily_case_counts"
+
+DATA_WATERMARK_RPC = "get_data_watermark"
+
+RPC_COLUMNS = ["day", "disease", "state", "city", "ward", "case_count", "active_count", "last_created_at"]
+
+DAILY_COUNT_COLUMNS = ["date", "disease", "state", "city", "ward", "count", "active_count", "last_created_at"]
+
+
+def fetch_daily_counts(
+    client,
+    disease: Optional[str] = None,
+    diseases: Optional[List[str]] = None,
+    state: Optional[str] = None,
+    city: Optional[str] = None,
+    ward: Optional[str] = None,
+    by_ward: bool = False,
+) -> pd.DataFrame:
+    """
+    Fetch daily case counts grouped by (date, disease[, state, city, ward]).
+
+    Args:
+        client: Supabase client
+        disease: Single disease filter (ILIKE match on diagnosis)
+        diseases: Several diseases at once; each row is labelled with its disease
+        state, city, ward: Geography filters
+        by_ward: Keep state/city/ward as grouping keys instead of collapsing them
+
+    Returns:
+        DataFrame with DAILY_COUNT_COLUMNS, `date` as datetime64 and sorted by date
+    """
+    if disease and not diseases:
+        diseases = [disease]
+
+    rpc_params = {"p_by_ward": by_ward}
+    if diseases: rpc_params["p_diseases"] = list(diseases)
+    if state: rpc_params["p_state"] = state
+    if city: rpc_params["p_city"] = city
+    if ward: rpc_params["p_ward"] = ward
+
+    # Paged so wide groupings (many wards x diseases x days) are never truncated by max-rows
+    rows = fetch_rpc(client, DAILY_COUNTS_RPC, rpc_params, RPC_COLUMNS)
+    with stage("frame"):
+        return daily_counts_frame(rows)
+
+
+def daily_counts_frame(rows) -> pd.DataFrame:
+    """Normalize raw RPC rows (list of dicts or DataFrame) into the daily-count frame layout."""
+    if rows is None or len(rows) == 0:
+        return pd.DataFrame(columns=DAILY_COUNT_COLUMNS)
+
+    df = pd.DataFrame(rows).rename(columns={"day": "date", "case_count": "count"})
+    for col in DAILY_COUNT_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+
+    df["date"] = pd.to_datetime(df["date"])
+    df["count"] = df["count"].fillna(0).astype(int)
+    df["active_count"] = df["active_count"].fillna(0).astype(int)
+    df["last_created_at"] = pd.to_datetime(df["last_created_at"], utc=True)
+    return df[DAILY_COUNT_COLUMNS].sort_values("date").reset_index(drop=True)
+
+
+def daily_series(frame: pd.DataFrame) -> pd.DataFrame:
+    """Collapse a daily-count frame to a single (date, count) series, one row per day with cases."""
+    if frame.empty:
+        return pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"), "count": pd.Series(dtype=int)})
+    return frame.groupby("date", as_index=False)["count"].sum().sort_values("date").reset_index(drop=True)
+
+
+def total_cases(frame: pd.DataFrame) -> int:
+    """Total number of records represented by a daily-count frame."""
+    return int(frame["count"].sum()) if not frame.empty else 0
+
+
+def active_cases_since(frame: pd.DataFrame, cutoff: pd.Timestamp) -> int:
+    """Active-status cases recorded on or after the cutoff day."""
+    if frame.empty:
+        return 0
+    cutoff = pd.Timestamp(cutoff)
+    if cutoff.tzinfo is not None:
+        cutoff = cutoff.tz_convert(None)
+    return int(frame.loc[frame["date"] >= cutoff.normalize(), "active_count"].sum())
+
+
+def data_watermark(frame: pd.DataFrame) -> tuple:
+    """Cheap change marker for the data behind a frame: (latest created_at, record count)."""
+    if frame.empty:
+        return (None, 0)
+    latest = frame["last_created_at"].max()
+    return (latest.isoformat() if pd.notna(latest) else None, total_cases(frame))
+
+
+def fetch_data_watermark(
+    client,
+    disease: Optional[str] = None,
+    state: Optional[str] = None,
+    city: Optional[str] = None,
+    ward: Optional[str] = None,
+    patients: bool = False,
+) -> tuple:
+    """
+    Change marker for the records matching the filters, from one aggregate row:
+    (latest created_at, record count), plus the latest patients.updated_at when
+    `patients` is set (results that also read patient rows, e.g. locations).
+    Costs a fraction of fetch_daily_counts, so it can gate every cached read.
+    """
+    rpc_params = {}
+    if disease: rpc_params["p_diseases"] = [disease]
+    if state: rpc_params["p_state"] = state
+    if city: rpc_params["p_city"] = city
+    if ward: rpc_params["p_ward"] = ward
+
+    with stage("fetch"):
+        rows = client.rpc(DATA_WATERMARK_RPC, rpc_params).execute().data or [{}]
+    row = rows[0]
+    mark = (row.get("last_created_at"), int(row.get("record_count") or 0))
+    return mark + (row.get("patients_updated_at"),) if patients else mark
+
+
+def select_series(frame: pd.DataFrame, disease: Optional[str] = None, state: Optional[str] = None, city: Optional[str] = None, ward: Optional[str] = None) -> pd.DataFrame:
+    """Rows of a by-ward daily-count frame matching one (disease, state, city, ward) key; None = any."""
+    mask = pd.Series(True, index=frame.index)
+    for col, value in (("disease", disease), ("state", state), ("city", city), ("ward", ward)):
+        if value is not None:
+            mask &= frame[col] == value
+    return frame[mask]
+
+
+INCIDENCE_KEYS = ["disease", "state", "city", "ward"]
+
+
+def incidence_matrix(frame: pd.DataFrame, n_days: Optional[int] = None):
+    """
+    Pivot a by-ward daily-count frame to a (series x calendar day) matrix with zero-filled days.
+
+    Args:
+        frame: Output of fetch_daily_counts(..., by_ward=True)
+        n_days: Keep only the trailing n calendar days (ending at the latest date)
+
+    Returns:
+        (keys DataFrame with INCIDENCE_KEYS per row, DatetimeIndex of days, int matrix)
+    """
+    if frame.empty:
+        return pd.DataFrame(columns=INCIDENCE_KEYS), pd.DatetimeIndex([]), np.zeros((0, 0), dtype=int)
+
+    end = frame["date"].max()
+    start = frame["date"].min() if n_days is None else max(frame["date"].min(), end - pd.Timedelta(days=n_days - 1))
+    days = pd.date_range(start, end, freq="D")
+
+    keyed = frame.fillna({k: "" for k in INCIDENCE_KEYS})
+    pivot = keyed.pivot_table(index=INCIDENCE_KEYS, columns="date", values="count", aggfunc="sum", fill_value=0)
+    pivot = pivot.reindex(columns=days, fill_value=0)
+
+    keys = pivot.index.to_frame(index=False).replace("", None)
+    return keys, days, pivot.to_numpy(dtype=int)
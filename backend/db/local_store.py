@@ -0,0 +1,473 @@
+"""
+Local stand-in for the Supabase client, backed by a SQLite file.
+Implements exactly the query surface the API uses: `table().select()` with the
+filters db.streaming applies (`ilike`, `not_.is_`, `eq`, `gt`, keyset `or_`, `order`,
+`limit`, `range`) and the `get_daily_case_counts` and `get_data_watermark` RPCs, with the same row shapes
+PostgREST returns. Synthetic patients and records are generated from the seed
+constants at any scale, so every endpoint can be load-tested and profiled offline.
+
+Build a database:
+    python -m db.local_store --records 1000000 --path .local_data.db
+and serve against it with DATA_BACKEND=local (LOCAL_DB_PATH=...).
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import numpy as np
+
+from seed.constants import WARD_DISTRIBUTIONS, TIMELINE_WEEKS
+
+
+DEFAULT_DB_PATH = os.getenv("LOCAL_DB_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".local_data.db"))
+# Days of history the synthetic records span, ending today
+DEFAULT_SPAN_DAYS = 365
+# Average medical records per synthetic patient
+RECORDS_PER_PATIENT = 2
+# Patients whose first visit is this recent are still ACTIVE
+ACTIVE_DAYS = 21
+# Ward centre jitter for synthetic coordinates (degrees)
+LOCATION_JITTER = 0.01
+INSERT_CHUNK = 50000
+# RPC results of in-progress paging passes kept at once
+RPC_CACHE_MAX_PASSES = 16
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patients (
+    id INTEGER PRIMARY KEY,
+    ward_name TEXT,
+    city TEXT,
+    state TEXT,
+    latitude REAL,
+    longitude REAL,
+    status TEXT,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS medical_records (
+    id INTEGER PRIMARY KEY,
+    patient_id INTEGER NOT NULL REFERENCES patients(id),
+    diagnosis TEXT,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_medical_records_created_at ON medical_records(created_at);
+CREATE INDEX IF NOT EXISTS idx_medical_records_patient_id ON medical_records(patient_id);
+CREATE INDEX IF NOT EXISTS idx_patients_updated_at ON patients(updated_at);
+CREATE TRIGGER IF NOT EXISTS touch_patients_updated_at
+AFTER UPDATE OF ward_name, city, state, latitude, longitude, status ON patients
+BEGIN
+    UPDATE patients SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE id = NEW.id;
+END;
+"""
+
+# Same grouping as supabase/migrations/20240301_daily_case_counts_rpc.sql;
+# `diseases` is a VALUES list standing in for UNNEST(p_diseases)
+DAILY_COUNTS_SQL = """
+WITH {diseases_cte}
+SELECT
+    DATE(m.created_at) AS day,
+    {disease_col} AS disease,
+    CASE WHEN :by_ward THEN p.state END AS state,
+    CASE WHEN :by_ward THEN p.city END AS city,
+    CASE WHEN :by_ward THEN p.ward_name END AS ward,
+    COUNT(*) AS case_count,
+    SUM(UPPER(p.status) = 'ACTIVE') AS active_count,
+    MAX(m.created_at) AS last_created_at
+FROM medical_records m
+JOIN patients p ON p.id = m.patient_id
+{disease_join}
+WHERE (:state IS NULL OR p.state = :state)
+  AND (:city IS NULL OR p.city = :city)
+  AND (:ward IS NULL OR p.ward_name = :ward)
+GROUP BY 1, 2, 3, 4, 5
+ORDER BY 1, 2, 3, 4, 5
+"""
+
+# Same as supabase/migrations/20240302_data_watermark_rpc.sql
+DATA_WATERMARK_SQL = """
+SELECT
+    MAX(m.created_at) AS last_created_at,
+    COUNT(*) AS record_count,
+    (SELECT MAX(updated_at) FROM patients) AS patients_updated_at
+FROM medical_records m
+JOIN patients p ON p.id = m.patient_id
+WHERE ({disease_filter})
+  AND (:state IS NULL OR p.state = :state)
+  AND (:city IS NULL OR p.city = :city)
+  AND (:ward IS NULL OR p.ward_name = :ward)
+"""
+
+_OPERATORS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "like": "LIKE", "ilike": "LIKE"}
+
+
+class LocalResponse:
+    """Mirrors the `.data` attribute of a postgrest APIResponse."""
+
+    def __init__(self, data: List[dict]):
+        self.data = data
+
+
+def _split_top_level(expr: str) -> List[str]:
+    """Split a PostgREST logic expression on commas outside parentheses and quotes."""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, ch in enumerate(expr):
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append(expr[start:i])
+            start = i + 1
+    parts.append(expr[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _logic_to_sql(expr: str, joiner: str, params: list) -> str:
+    """Translate an `or_`/`and(...)` filter string (e.g. the keyset condition in db.streaming) to SQL."""
+    clauses = []
+    for part in _split_top_level(expr):
+        group = re.fullmatch(r"(and|or)\((.*)\)", part, flags=re.S)
+        if group:
+            clauses.append(_logic_to_sql(group.group(2), group.group(1).upper(), params))
+            continue
+        column, op, value = part.split(".", 2)
+        if op not in _OPERATORS:
+            raise ValueError(f"Unsupported filter operator in local store: {op}")
+        if len(value) >= 2 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+        clauses.append(f"{_column(column)} {_OPERATORS[op]} ?")
+        params.append(value)
+    return "(" + f" {joiner} ".join(clauses) + ")"
+
+
+def _column(name: str) -> str:
+    if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+        raise ValueError(f"Invalid column name: {name}")
+    return f'"{name}"'
+
+
+class _Negated:
+    """`query.not_` proxy: the next filter is negated."""
+
+    def __init__(self, query: "LocalTableQuery"):
+        self._query = query
+
+    def is_(self, column: str, value):
+        return self._query._is(column, value, negate=True)
+
+
+class LocalTableQuery:
+    """Chainable SELECT over one table, built up like a postgrest request builder."""
+
+    def __init__(self, client: "LocalClient", table: str):
+        self._client = client
+        self._table = _column(table)
+        self._columns = "*"
+        self._where: List[str] = []
+        self._params: list = []
+        self._order: List[str] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+
+    def select(self, columns: str = "*", count=None):
+        cols = [c.strip() for c in columns.split(",") if c.strip()]
+        self._columns = "*" if cols == ["*"] else ", ".join(_column(c) for c in cols)
+        return self
+
+    @property
+    def not_(self) -> _Negated:
+        return _Negated(self)
+
+    def _compare(self, column: str, op: str, value):
+        self._where.append(f"{_column(column)} {_OPERATORS[op]} ?")
+        self._params.append(value)
+        return self
+
+    def eq(self, column: str, value):
+        return self._compare(column, "eq", value)
+
+    def neq(self, column: str, value):
+        return self._compare(column, "neq", value)
+
+    def gt(self, column: str, value):
+        return self._compare(column, "gt", value)
+
+    def gte(self, column: str, value):
+        return self._compare(column, "gte", value)
+
+    def lt(self, column: str, value):
+        return self._compare(column, "lt", value)
+
+    def lte(self, column: str, value):
+        return self._compare(column, "lte", value)
+
+    def ilike(self, column: str, pattern: str):
+        # SQLite LIKE is case-insensitive for ASCII, matching Postgres ILIKE
+        return self._compare(column, "ilike", pattern)
+
+    def is_(self, column: str, value):
+        return self._is(column, value, negate=False)
+
+    def _is(self, column: str, value, negate: bool):
+        if value not in (None, "null"):
+            raise ValueError("Local store only supports is_(column, 'null')")
+        self._where.append(f"{_column(column)} IS {'NOT ' if negate else ''}NULL")
+        return self
+
+    def or_(self, filters: str):
+        self._where.append(_logic_to_sql(filters, "OR", self._params))
+        return self
+
+    def order(self, column: str, desc: bool = False):
+        self._order.append(f"{_column(column)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, size: int):
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int):
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def execute(self) -> LocalResponse:
+        sql = f"SELECT {self._columns} FROM {self._table}"
+        if self._where:
+            sql += " WHERE " + " AND ".join(self._where)
+        if self._order:
+            sql += " ORDER BY " + ", ".join(self._order)
+        if self._limit is not None:
+            sql += f" LIMIT {int(self._limit)} OFFSET {int(self._offset)}"
+        return LocalResponse(self._client.query(sql, self._params))
+
+
+class LocalRpcQuery:
+    """`client.rpc(fn, params)`: the full ordered result, windowed by `.range()`."""
+
+    def __init__(self, client: "LocalClient", fn: str, params: dict):
+        if fn not in client.RPCS:
+            raise ValueError(f"RPC not available in local store: {fn}")
+        self._client = client
+        self._fn = fn
+        self._params = params or {}
+        self._window = None
+
+    def range(self, start: int, end: int):
+        self._window = (start, end + 1)
+        return self
+
+    def execute(self) -> LocalResponse:
+        return LocalResponse(self._client.rpc_rows(self._fn, self._params, self._window))
+
+
+class LocalClient:
+    """
+    Supabase client stand-in over a SQLite file.
+    One connection per thread (the API reads from its threadpool). An RPC result is
+    materialized by the first `.range()` page of a paging pass and held only until
+    the pass's last (short) page, so paging does not re-run the aggregate for every
+    page while every new request still pays for it, as it would against Postgres.
+    """
+
+    RPCS = {"get_daily_case_counts", "get_data_watermark"}
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._rpc_cache: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._rpc_lock = threading.Lock()
+        self._version = 0
+        self._migrate()
+
+    def _migrate(self):
+        conn = self.connection()
+        # Files built before patients.updated_at existed
+        if "patients" in {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}:
+            if "updated_at" not in {row[1] for row in conn.execute("PRAGMA table_info(patients)")}:
+                conn.execute("ALTER TABLE patients ADD COLUMN updated_at TEXT")
+        conn.executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def query(self, sql: str, params=()) -> List[dict]:
+        return [dict(row) for row in self.connection().execute(sql, params)]
+
+    def table(self, name: str) -> LocalTableQuery:
+        return LocalTableQuery(self, name)
+
+    def rpc(self, fn: str, params: Optional[dict] = None) -> LocalRpcQuery:
+        return LocalRpcQuery(self, fn, params)
+
+    def record_count(self) -> int:
+        return self.connection().execute("SELECT COUNT(*) FROM medical_records").fetchone()[0]
+
+    def rpc_rows(self, fn: str, params: dict, window: Optional[tuple] = None) -> List[dict]:
+        """Rows of one RPC call, or of one `(start, stop)` page of a paging pass."""
+        if fn == "get_data_watermark":
+            return self._data_watermark(**params)
+        if window is None:
+            return self._daily_case_counts(**params)
+        start, stop = window
+        key = json.dumps([fn, self._version, params], sort_keys=True, default=str)
+        with self._rpc_lock:
+            # A pass starts at offset 0; never serve a previous pass's result to it
+            rows = self._rpc_cache.get(key) if start > 0 else None
+        if rows is None:
+            rows = self._daily_case_counts(**params)
+        page = rows[start:stop]
+        with self._rpc_lock:
+            if len(page) < stop - start:
+                self._rpc_cache.pop(key, None)  # short page: the pass is over
+            else:
+                self._rpc_cache[key] = rows
+                self._rpc_cache.move_to_end(key)
+                # Abandoned passes never reach their last page
+                while len(self._rpc_cache) > RPC_CACHE_MAX_PASSES:
+                    self._rpc_cache.popitem(last=False)
+        return page
+
+    def _daily_case_counts(self, p_diseases=None, p_state=None, p_city=None, p_ward=None, p_by_ward=False) -> List[dict]:
+        args = {"by_ward": bool(p_by_ward), "state": p_state, "city": p_city, "ward": p_ward}
+        if p_diseases:
+            names = ", ".join(f"(:d{i})" for i in range(len(p_diseases)))
+            args.update({f"d{i}": name for i, name in enumerate(p_diseases)})
+            sql = DAILY_COUNTS_SQL.format(
+                diseases_cte=f"d(name) AS (VALUES {names})",
+                disease_col="d.name",
+                disease_join="JOIN d ON m.diagnosis LIKE '%' || d.name || '%'",
+            )
+        else:
+            sql = DAILY_COUNTS_SQL.format(diseases_cte="d(name) AS (SELECT NULL)", disease_col="NULL", disease_join="")
+        return self.query(sql, args)
+
+    def _data_watermark(self, p_diseases=None, p_state=None, p_city=None, p_ward=None) -> List[dict]:
+        args = {"state": p_state, "city": p_city, "ward": p_ward}
+        disease_filter = "1"
+        if p_diseases:
+            disease_filter = " OR ".join(f"m.diagnosis LIKE '%' || :d{i} || '%'" for i in range(len(p_diseases)))
+            args.update({f"d{i}": name for i, name in enumerate(p_diseases)})
+        return self.query(DATA_WATERMARK_SQL.format(disease_filter=disease_filter), args)
+
+    def load_synthetic(self, records: int, span_days: int = DEFAULT_SPAN_DAYS, seed: Optional[int] = None, end: Optional[datetime] = None):
+        """Replace the tables' contents with `records` synthetic medical records."""
+        patients, medical_records = generate_synthetic(records, span_days, seed, end)
+        conn = self.connection()
+        with conn:
+            conn.execute("DELETE FROM medical_records")
+            conn.execute("DELETE FROM patients")
+            for start in range(0, len(patients), INSERT_CHUNK):
+                conn.executemany(
+                    "INSERT INTO patients (id, ward_name, city, state, latitude, longitude, status, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    patients[start:start + INSERT_CHUNK],
+                )
+            for start in range(0, len(medical_records), INSERT_CHUNK):
+                conn.executemany(
+                    "INSERT INTO medical_records (id, patient_id, diagnosis, created_at) VALUES (?, ?, ?, ?)",
+                    medical_records[start:start + INSERT_CHUNK],
+                )
+        with self._rpc_lock:
+            self._version += 1
+            self._rpc_cache.clear()
+
+
+def generate_synthetic(records: int, span_days: int = DEFAULT_SPAN_DAYS, seed: Optional[int] = None, end: Optional[datetime] = None):
+    """
+    Synthetic patients and medical records shaped like the seed data.
+
+    Wards are drawn by WARD_DISTRIBUTIONS patient counts, diseases by each ward's
+    disease mix, and first-visit dates follow the disease's TIMELINE_WEEKS curve
+    stretched over the span; follow-up visits come 3-10 days apart.
+
+    Returns:
+        (patient rows, medical record rows) as tuples ready for executemany
+    """
+    rng = np.random.default_rng(seed)
+    end = end or datetime.now(timezone.utc)
+    n_patients = max(1, records // RECORDS_PER_PATIENT)
+
+    wards = list(WARD_DISTRIBUTIONS)
+    ward_weights = np.array([WARD_DISTRIBUTIONS[w]["count"] for w in wards], dtype=float)
+    ward_idx = rng.choice(len(wards), size=n_patients, p=ward_weights / ward_weights.sum())
+
+    diseases = np.empty(n_patients, dtype=object)
+    first_day = np.empty(n_patients, dtype=int)
+    for w, ward in enumerate(wards):
+        members = np.flatnonzero(ward_idx == w)
+        mix = WARD_DISTRIBUTIONS[ward]["diseases"]
+        names = list(mix)
+        weights = np.array([mix[n] for n in names], dtype=float)
+        diseases[members] = np.array(names, dtype=object)[rng.choice(len(names), size=len(members), p=weights / weights.sum())]
+
+    for disease in np.unique(diseases):
+        members = np.flatnonzero(diseases == disease)
+        curve = np.asarray(TIMELINE_WEEKS.get(disease, [1.0]), dtype=float) + 0.1
+        day_weights = np.interp(np.linspace(0, len(curve) - 1, span_days), np.arange(len(curve)), curve)
+        first_day[members] = rng.choice(span_days, size=len(members), p=day_weights / day_weights.sum())
+
+    centers = np.array([WARD_DISTRIBUTIONS[w]["center"] for w in wards])[ward_idx]
+    coords = centers + rng.normal(0, LOCATION_JITTER, size=(n_patients, 2))
+    # Missing coordinates exercise the /clusters null filter
+    coords[rng.random(n_patients) < 0.02] = np.nan
+    status = np.where(first_day >= span_days - ACTIVE_DAYS, "ACTIVE", "RECOVERED")
+    cities = [WARD_DISTRIBUTIONS[w]["city"] for w in wards]
+
+    # Every patient gets a first visit; the remaining records are follow-ups
+    owner = np.concatenate([np.arange(n_patients), rng.integers(0, n_patients, size=max(0, records - n_patients))])
+    owner.sort(kind="stable")
+    visit_no = np.arange(len(owner)) - np.searchsorted(owner, owner)
+    day = np.minimum(first_day[owner] + visit_no * rng.integers(3, 11, size=len(owner)), span_days - 1)
+    seconds = rng.integers(8 * 3600, 20 * 3600, size=len(owner))
+    start = (end - timedelta(days=span_days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    stamps = np.datetime64(start.replace(tzinfo=None), "s") + day.astype("timedelta64[D]") + seconds.astype("timedelta64[s]")
+    created = np.datetime_as_string(stamps, unit="s")
+    # A patient's row was last touched at their latest visit
+    last_visit = np.searchsorted(owner, np.arange(n_patients), side="right") - 1
+
+    patients = [
+        (
+            i + 1, wards[ward_idx[i]], cities[ward_idx[i]], "Maharashtra",
+            None if np.isnan(coords[i, 0]) else float(coords[i, 0]),
+            None if np.isnan(coords[i, 1]) else float(coords[i, 1]),
+            status[i], f"{created[last_visit[i]]}+00:00",
+        )
+        for i in range(n_patients)
+    ]
+
+    medical_records = [
+        (i + 1, int(owner[i]) + 1, diseases[owner[i]], f"{created[i]}+00:00")
+        for i in range(len(owner))
+    ]
+    return patients, medical_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a local SQLite stand-in for the Supabase data.")
+    parser.add_argument("--records", type=int, default=100000, help="Number of medical records")
+    parser.add_argument("--span-days", type=int, default=DEFAULT_SPAN_DAYS, help="Days of history ending today")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument("--path", default=DEFAULT_DB_PATH, help="SQLite file to (re)build")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    client = LocalClient(args.path)
+    client.load_synthetic(args.records, span_days=args.span_days, seed=args.seed)
+    print(f"Loaded {client.record_count()} records into {args.path} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Paginated streaming reads from Supabase.
+A single `.execute()` is silently capped by PostgREST's max-rows setting, so large
+reads walk the table in keyset order (`key > last_seen`) page by page and fold each
+page into a columnar accumulator, keeping only one page of row dicts alive at a time.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from metrics import stage
+
+
+DEFAULT_PAGE_SIZE = 1000
+
+
+class ColumnarAccumulator:
+    """Collects row-dict pages into per-column NumPy chunks and builds one DataFrame at the end."""
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self._chunks: Dict[str, List[np.ndarray]] = {c: [] for c in self.columns}
+        self.rows = 0
+
+    def add(self, page: List[dict]):
+        if not page:
+            return
+        for col in self.columns:
+            self._chunks[col].append(np.array([row.get(col) for row in page], dtype=object))
+        self.rows += len(page)
+
+    def to_frame(self) -> pd.DataFrame:
+        if self.rows == 0:
+            return pd.DataFrame(columns=self.columns)
+        data = {col: np.concatenate(chunks) for col, chunks in self._chunks.items()}
+        # Let pandas infer proper dtypes from the object chunks
+        return pd.DataFrame(data).infer_objects()
+
+
+def _split_columns(columns: str) -> List[str]:
+    return [c.strip() for c in columns.split(",") if c.strip()]
+
+
+def stream_pages(
+    make_query: Callable[[], object],
+    key: str = "id",
+    tiebreak: Optional[str] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[List[dict]]:
+    """
+    Yield pages of rows ordered by `key` using keyset pagination.
+
+    Args:
+        make_query: Returns a fresh, already-filtered query builder (table select or rpc)
+        key: Column to paginate on (primary key or created_at)
+        tiebreak: Unique column used to break ties when `key` is not unique
+        page_size: Rows per round-trip (keep <= PostgREST max-rows)
+    """
+    last_key = None
+    last_tie = None
+    while True:
+        query = make_query()
+        if last_key is not None:
+            if tiebreak:
+                query = query.or_(f'{key}.gt."{last_key}",and({key}.eq."{last_key}",{tiebreak}.gt."{last_tie}")')
+            else:
+                query = query.gt(key, last_key)
+        query = query.order(key)
+        if tiebreak:
+            query = query.order(tiebreak)
+        page = query.limit(page_size).execute().data or []
+
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+
+        last_key = page[-1][key]
+        if tiebreak:
+            last_tie = page[-1][tiebreak]
+
+
+def stream_ranges(make_query: Callable[[], object], page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[dict]]:
+    """
+    Yield pages using ordered `.range()` windows.
+    For result sets without a unique key (e.g. aggregate RPCs); the query must set a stable order.
+    """
+    start = 0
+    while True:
+        page = make_query().range(start, start + page_size - 1).execute().data or []
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        start += page_size
+
+
+def stream_table(
+    client,
+    table: str,
+    columns: str,
+    key: str = "id",
+    tiebreak: Optional[str] = None,
+    filters: Optional[Callable[[object], object]] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[List[dict]]:
+    """Stream a table projected to `columns`, optionally narrowed by `filters(query)`."""
+    select_cols = _split_columns(columns)
+    for col in (key, tiebreak):
+        if col and col not in select_cols:
+            select_cols.append(col)
+
+    def make_query():
+        query = client.table(table).select(", ".join(select_cols))
+        return filters(query) if filters else query
+
+    return stream_pages(make_query, key=key, tiebreak=tiebreak, page_size=page_size)
+
+
+def fetch_table(
+    client,
+    table: str,
+    columns: str,
+    key: str = "id",
+    tiebreak: Optional[str] = None,
+    filters: Optional[Callable[[object], object]] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> pd.DataFrame:
+    """Read a whole (filtered) table page by page into a DataFrame with only `columns`."""
+    acc = ColumnarAccumulator(_split_columns(columns))
+    with stage("fetch"):
+        for page in stream_table(client, table, columns, key=key, tiebreak=tiebreak, filters=filters, page_size=page_size):
+            acc.add(page)
+    with stage("frame"):
+        return acc.to_frame()
+
+
+def fetch_rpc(
+    client,
+    fn: str,
+    params: dict,
+    columns: Sequence[str],
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> pd.DataFrame:
+    """Read every row of an ordered set-returning RPC, page by page."""
+    acc = ColumnarAccumulator(columns)
+    with stage("fetch"):
+        for page in stream_ranges(lambda: client.rpc(fn, params), page_size=page_size):
+            acc.add(page)
+    with stage("frame"):
+        return acc.to_frame()
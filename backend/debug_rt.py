@@ -1,47 +1,49 @@
-import pandas as pd
+import numpy as np
 from supabase import create_client
 import os
 
 from dotenv import load_dotenv
 load_dotenv()
 
+from db.daily_counts import fetch_daily_counts, daily_series
+from ml.rt import (
+    calendar, monthly_average, window_means, rt_series,
+    SMOOTH_MULTIPLIER, BASELINE_FLOOR_CASES, SEASONAL_BAND,
+)
+
 supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_KEY"))
 
 disease = "Leptospirosis"
 window = 7
-smooth_window = 21
-
-result = supabase.rpc("get_filtered_medical_records", {"p_disease": disease}).execute()
-records = result.data
+smooth_window = window * SMOOTH_MULTIPLIER
 
-df = pd.DataFrame(records)
-df['date'] = pd.to_datetime(df['created_at']).dt.date
-daily = df.groupby('date').size().reset_index(name='count').sort_values('date')
+daily = daily_series(fetch_daily_counts(supabase, disease=disease))
 
-df['month'] = pd.to_datetime(df['date']).dt.month
-monthly_avg = df.groupby('month').size() / (df.groupby('month')['date'].nunique() + 1e-9)
-current_month = pd.to_datetime(daily['date'].iloc[-1]).month if len(daily) > 0 else 1
+# Same kernel as the Rt endpoints, evaluated for the windows ending with the latest day
+counts = daily['count'].to_numpy()
+years, months = calendar(daily['date'])
+current_month = months[-1] if len(months) > 0 else 1
 
-counts = daily['count'].values
-recent_slice = counts[-smooth_window:]
-previous_slice = counts[-2*smooth_window:-smooth_window]
+recent, previous, previous_sum = window_means(counts, window, len(counts), len(counts) + 1)
+recent_avg, previous_avg = float(recent[-1]), float(previous[-1])
 
-recent_avg = float(pd.Series(recent_slice).mean()) if len(recent_slice) > 0 else 0.0
-previous_avg = float(pd.Series(previous_slice).mean()) if len(previous_slice) > 0 else 0.0
-
-print(f"Total Leptospirosis cases: {len(df)}")
+print(f"Total Leptospirosis cases: {int(counts.sum())}")
 print(f"Current Month: {current_month}")
 print(f"Smooth Window: {smooth_window} days")
 print(f"Recent Avg (last 21d): {recent_avg:.2f}")
 print(f"Previous Avg (prior 21d): {previous_avg:.2f}")
 
-print(f"\nCondition 1: Is previous_avg < 10 / smooth_window ({10/smooth_window:.2f})? {previous_avg < 10 / smooth_window}")
+print(f"\nCondition 1: Is previous_avg < {BASELINE_FLOOR_CASES} / smooth_window ({BASELINE_FLOOR_CASES/smooth_window:.2f})? {previous_avg < BASELINE_FLOOR_CASES / smooth_window}")
 
-hist_avg = monthly_avg.get(current_month, 0)
+hist_avg = monthly_average(years, months, counts)[current_month]
 print(f"\nHist Avg for month {current_month}: {hist_avg:.2f}")
 stb_ratio = abs(recent_avg - hist_avg) / max(hist_avg, 1)
-print(f"Condition 3: Is stb_ratio ({stb_ratio:.2f}) <= 0.40? {stb_ratio <= 0.40}")
+print(f"Condition 3: Is stb_ratio ({stb_ratio:.2f}) <= {SEASONAL_BAND:.2f}? {stb_ratio <= SEASONAL_BAND}")
 
 if previous_avg > 0:
     raw_rt = recent_avg / previous_avg
     print(f"\nRaw Rt before dampeners: {raw_rt:.2f}")
+
+rt, status = rt_series(counts, years, months, window, disease)
+if len(rt) > 0:
+    print(f"/r-value latest Rt: {None if np.isnan(rt[-1]) else rt[-1]} ({status[-1]})")
@@ -1,18 +1,58 @@
 import os
+import json
+import hashlib
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 import pandas as pd
 import numpy as np
 from typing import Optional, List
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from db.daily_counts import fetch_daily_counts, fetch_data_watermark, daily_series, data_watermark, select_series, incidence_matrix
+from db.streaming import fetch_table
+from db.case_frame import CaseFrame
+from ml.forecast import training_frame, apply_nowcast, run_forecast, MAX_FORECAST_DAYS
+from ml.anomaly import detect_anomalies
+from ml.clustering import find_clusters
+from ml.rt import latest_rt_by_disease, rt_series, rt_value, seasonal_metrics, RT_EXCLUDED_DISEASES
+from ml.cori import cori_rt, serial_interval_matrix, credible_status, MAX_SERIAL_DAYS
+from ml.sir_cache import get_sir_cache, normalize_sir_params
+from compute import compute_pool
+from metrics import MetricsMiddleware, TimedJSONResponse, stage, render_prometheus, slow_requests
+from profiling import ProfilingMiddleware, is_admin, load_profile
+from coalescing import SingleFlightMiddleware, singleflight
+from precompute import PRECOMPUTE_ENABLED, Precomputer, ResultStore, with_freshness
 
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the CPU-bound compute tier before serving traffic
+    compute_pool.start()
+    if PRECOMPUTE_ENABLED and supabase:
+        precomputer.start()
+    yield
+    precomputer.shutdown()
+    compute_pool.shutdown()
+
 # Initialize FastAPI app
-app = FastAPI(title="Health Surveillance ML API", version="1.0.0")
+app = FastAPI(title="Health Surveillance ML API", version="1.0.0", lifespan=lifespan, default_response_class=TimedJSONResponse)
+
+# Identical concurrent analytics requests share one execution (inside CORS, whose
+# headers depend on the caller's Origin); operational endpoints are never coalesced
+app.add_middleware(
+    SingleFlightMiddleware,
+    exclude={"/", "/health", "/stats", "/metrics", "/slow-requests", "/profiles/{profile_id}"},
+)
 
 # CORS middleware for frontend communication
 app.add_middleware(
@@ -23,20 +63,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Admin-requested profiling (X-Profile + X-Admin-Token), inside the metrics timing
+app.add_middleware(ProfilingMiddleware)
+# Per-request stage timing for /metrics and the slow-request log
+app.add_middleware(MetricsMiddleware)
+
 # Connect to Supabase
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+# "supabase" (default) or "local": the SQLite stand-in in db/local_store.py for offline load testing
+DATA_BACKEND = os.getenv("DATA_BACKEND", "supabase").lower()
 
-if not SUPABASE_URL or not SUPABASE_KEY:
+if DATA_BACKEND != "local" and (not SUPABASE_URL or not SUPABASE_KEY):
     print("Warning: Supabase credentials not found. Ensure SUPABASE_URL and SUPABASE_SERVICE_KEY are in .env")
 
 # Will initialize on startup if env vars are present
 supabase: Client = None
 try:
-    if SUPABASE_URL and SUPABASE_KEY:
+    if DATA_BACKEND == "local":
+        from db.local_store import LocalClient, DEFAULT_DB_PATH
+        # Read here, not at db.local_store import, so a caller that imported it first can still point LOCAL_DB_PATH elsewhere
+        supabase = LocalClient(os.getenv("LOCAL_DB_PATH", DEFAULT_DB_PATH))
+        # LOCAL_DB_RECORDS fills an empty database with synthetic data on startup
+        if supabase.record_count() == 0 and os.getenv("LOCAL_DB_RECORDS"):
+            supabase.load_synthetic(int(os.getenv("LOCAL_DB_RECORDS")))
+    elif SUPABASE_URL and SUPABASE_KEY:
         supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 except Exception as e:
-    print(f"Error initializing Supabase client: {e}")
+    print(f"Error initializing {DATA_BACKEND} data backend: {e}")
 
 
 @app.get("/")
@@ -47,78 +101,121 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/stats")
+def get_stats():
+    """Cache and compute-tier counters."""
+    return {
+        "sir_results": get_sir_cache().stats(),
+        "compute": compute_pool.stats(),
+        "coalescing": singleflight.stats(),
+        "precompute": precomputer.stats(),
+    }
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition: request and per-stage latency histograms."""
+    pool = compute_pool.stats()
+    gauges = {
+        "compute_inflight_jobs": pool.get("inflight"),
+        "compute_rejected_total": pool.get("rejected"),
+        "sir_cache_hit_rate": get_sir_cache().stats()["hit_rate"],
+        "coalesced_leaders_total": singleflight.leaders,
+        "coalesced_hits_total": singleflight.hits,
+        "coalesced_waiting": singleflight.waiting,
+        "coalesced_wait_seconds_total": round(singleflight.wait_seconds, 3),
+        "precomputed_results": precomputer.stats()["entries"],
+        "precomputed_hits_total": result_store.hits,
+        "precomputed_misses_total": result_store.misses,
+        "precomputed_stale_total": result_store.stale,
+    }
+    return Response(render_prometheus(gauges), media_type="text/plain; version=0.0.4")
+
+@app.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, request: Request, format: str = "json"):
+    """
+    Admin-only: a profile recorded for a request sent with `X-Profile: 1`.
+    format=json returns timing and top allocation sites; format=collapsed returns
+    the sampled stacks in collapsed format for flamegraph.pl / speedscope.
+    """
+    if not is_admin(request.headers.get("x-admin-token")):
+        raise HTTPException(status_code=403, detail="Admin token required.")
+    profile = load_profile(profile_id, collapsed=(format == "collapsed"))
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    if format == "collapsed":
+        return Response(profile, media_type="text/plain")
+    return profile
+
+@app.get("/slow-requests")
+def get_slow_requests():
+    """Stage breakdowns of the most recent requests over SLOW_REQUEST_MS."""
+    return {"slow_requests": slow_requests()}
+
+# Periodically recomputed /forecast, /r-value, /anomalies and /clusters answers (see register_precompute_jobs)
+result_store = ResultStore()
+precomputer = Precomputer(result_store)
+
+async def serve_precomputed(endpoint: str, compute, **params):
+    """
+    The stored answer for these exact parameters if precompute is on and the answer
+    was computed from the current data (same watermark) recently enough, otherwise
+    computed live. Either way the payload carries a `freshness` block with its source
+    ("precomputed" or "live") and computation time.
+    """
+    if precomputer.enabled:
+        watermark = await run_in_threadpool(precomputer.watermark, endpoint, params)
+        stored = result_store.get(endpoint, params, watermark)
+        if stored is not None:
+            return stored
+    computed_at = time.time()
+    if asyncio.iscoroutinefunction(compute):
+        payload = await compute(**params)
+    else:
+        payload = await run_in_threadpool(compute, **params)
+    return with_freshness(payload, "live", computed_at)
+
+def validate_forecast_days(days: int) -> int:
+    """Reject a forecast horizon outside 1..MAX_FORECAST_DAYS with a 400, before any fit is queued."""
+    if days < 1 or days > MAX_FORECAST_DAYS:
+        raise HTTPException(status_code=400, detail=f"days must be between 1 and {MAX_FORECAST_DAYS}.")
+    return days
+
 @app.get("/forecast")
-def get_forecast(disease: Optional[str] = None, days: int = 30, state: Optional[str] = None, city: Optional[str] = None, ward: Optional[str] = None):
+async def get_forecast(disease: Optional[str] = None, days: int = 30, state: Optional[str] = None, city: Optional[str] = None, ward: Optional[str] = None):
     """
     Uses Facebook Prophet to forecast disease cases over the next `days` days.
     """
+    validate_forecast_days(days)
+    return await serve_precomputed("forecast", compute_forecast, disease=disease, days=days, state=state, city=city, ward=ward)
+
+async def compute_forecast(disease: Optional[str] = None, days: int = 30, state: Optional[str] = None, city: Optional[str] = None, ward: Optional[str] = None):
     if not supabase:
         raise HTTPException(status_code=500, detail="Database connection not initialized.")
         
-    rpc_params = {}
-    if disease: rpc_params["p_disease"] = disease
-    if state: rpc_params["p_state"] = state
-    if city: rpc_params["p_city"] = city
-    if ward: rpc_params["p_ward"] = ward
-    
-    result = supabase.rpc("get_filtered_medical_records", rpc_params).execute()
-    records = result.data
+    # Daily occurrences are aggregated server-side
+    counts = await run_in_threadpool(fetch_daily_counts, supabase, disease=disease, state=state, city=city, ward=ward)
+    daily = daily_series(counts)
     
-    if not records:
+    if daily.empty:
         return {"dates": [], "predictions": [], "lower": [], "upper": [], "message": "No data available format forecasting."}
-        
-    df = pd.DataFrame(records)
-    
-    # We want to count daily occurrences 
-    df['ds'] = pd.to_datetime(df['created_at']).dt.date
-    daily_counts = df.groupby('ds').size().reset_index(name='y')
     
     # Ensure dataset is large enough
-    if len(daily_counts) < 3:
+    if len(daily) < 3:
         return {"dates": [], "predictions": [], "lower": [], "upper": [], "message": "Insufficient data points for forecasting."}
 
-    from prophet import Prophet
-    
-    # Add capacity cap to prevent unrealistic exponential growth
-    daily_counts['cap'] = 150
-    daily_counts['monsoon'] = pd.to_datetime(daily_counts['ds']).dt.month.isin([6, 7, 8, 9]).astype(int)
-    
-    # Initialize and fit the model using logistic growth and tuned changepoints
-    # This prevents linear explosions and detects outbreaks rapidly
-    m = Prophet(
-        growth='logistic',
-        weekly_seasonality=True, 
-        yearly_seasonality=True,
-        seasonality_mode='multiplicative',
-        changepoint_prior_scale=0.08
-    )
-    m.add_regressor('monsoon')
-    m.fit(daily_counts)
-    
-    # Make future dataframe
-    future = m.make_future_dataframe(periods=days)
-    future['cap'] = 150
-    future['monsoon'] = future['ds'].dt.month.isin([6, 7, 8, 9]).astype(int)
-    forecast = m.predict(future)
-    
-    # Extract only the future predictions or recent past to return to frontend
-    forecast_subset = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(days + 7) # last 7 days + 30 days future
-    
-    # Format and return the payload
-    # Cap negative predictions at 0
-    return {
-        "dates": forecast_subset['ds'].dt.strftime('%Y-%m-%d').tolist(),
-        "predictions": [max(0, round(x)) for x in forecast_subset['yhat'].tolist()],
-        "lower": [max(0, round(x)) for x in forecast_subset['yhat_lower'].tolist()],
-        "upper": [max(0, round(x)) for x in forecast_subset['yhat_upper'].tolist()]
-    }
+    # Reuse the fitted model for any horizon until new records arrive
+    cache_key = ("forecast", disease, state, city, ward)
+    return await compute_pool.run(run_forecast, cache_key, data_watermark(counts), training_frame(daily), days)
 
 @app.get("/clusters")
-def get_clusters(disease: str = None, eps: float = 0.05, min_samples: int = 3):
+async def get_clusters(disease: str = None, eps: float = 0.05, min_samples: int = 3):
     """
     Uses DBSCAN to find clusters of localized disease spread (Hotspots).
     eps is the maximum distance between two samples for one to be considered as in the neighborhood of the other.
     """
+    return await serve_precomputed("clusters", compute_clusters, disease=disease, eps=eps, min_samples=min_samples)
+
+async def compute_clusters(disease: str = None, eps: float = 0.05, min_samples: int = 3):
     if not supabase:
         raise HTTPException(status_code=500, detail="Database connection not initialized.")
         
@@ -126,276 +223,135 @@ def get_clusters(disease: str = None, eps: float = 0.05, min_samples: int = 3):
     # In Supabase, if we constructed our queries efficiently we'd use joins. I'll fetch patients who have these records.
     
     # Simple approach for hackathon: Fetch all patients with lat/lng, then their records
-    patients_result = supabase.table("patients").select("id, latitude, longitude").not_.is_("latitude", "null").not_.is_("longitude", "null").execute()
-    patients = patients_result.data
+    # Both reads are keyset-paginated so they are not truncated by PostgREST's row limit
+    patients = await run_in_threadpool(
+        fetch_table, supabase, "patients", "id, latitude, longitude",
+        filters=lambda q: q.not_.is_("latitude", "null").not_.is_("longitude", "null"),
+    )
     
-    if not patients:
+    if patients.empty:
         return {"clusters": [], "message": "No patient location data available."}
-        
-    patient_map = {p['id']: {'lat': p['latitude'], 'lng': p['longitude']} for p in patients}
     
     # Fetch records
-    records_query = supabase.table("medical_records").select("patient_id, diagnosis")
-    if disease:
-        records_query = records_query.ilike("diagnosis", f"%{disease}%")
-        
-    records_result = records_query.execute()
-    records = records_result.data
+    records = await run_in_threadpool(
+        fetch_table, supabase, "medical_records", "patient_id",
+        filters=(lambda q: q.ilike("diagnosis", f"%{disease}%")) if disease else None,
+    )
     
-    if not records:
+    if records.empty:
          return {"clusters": [], "message": "No record data available for clustering."}
          
     # Extract coordinates for affected patients
-    coords = []
-    patient_ids_in_cluster = []
-    
-    for r in records:
-        pid = r['patient_id']
-        if pid in patient_map:
-            coords.append([patient_map[pid]['lat'], patient_map[pid]['lng']])
-            patient_ids_in_cluster.append(pid)
+    located = records.merge(patients, left_on='patient_id', right_on='id', how='inner')
+    coords = located[['latitude', 'longitude']].astype(float).values.tolist()
+    patient_ids_in_cluster = located['patient_id'].tolist()
             
     if len(coords) < min_samples:
          return {"clusters": [], "message": "Insufficient localized data for clustering."}
          
-    from sklearn.cluster import DBSCAN
-    import numpy as np
-    
-    # Haversine metric requires radians.
-    # We define eps in kilometers. Let's use 0.10 km (100m) as the default cluster radius to fracture the city-wide blob
-    km_radius = 0.1
-    kms_per_radian = 6371.0088
-    eps_rad = km_radius / kms_per_radian
-    
-    # Convert lat/lng to radians for haversine
-    coords_rad = np.radians(coords)
-    
-    db = DBSCAN(eps=eps_rad, min_samples=max(min_samples, 7), metric='haversine').fit(coords_rad)
-    labels = db.labels_
-    
-    # Process clusters
-    clusters = {}
-    for i, label in enumerate(labels):
-        if label == -1:
-            continue # Noise point
-            
-        label_str = str(label)
-        if label_str not in clusters:
-            clusters[label_str] = {
-                "id": label_str,
-                "points": [],
-                "size": 0,
-                "center": {"lat": 0, "lng": 0}
-            }
-            
-        clusters[label_str]["points"].append({
-            "patient_id": patient_ids_in_cluster[i],
-            "lat": coords[i][0],
-            "lng": coords[i][1]
-        })
-        clusters[label_str]["size"] += 1
-        
-    # Calculate geometric centers for the clusters
-    result_clusters = []
-    for c_id, data in clusters.items():
-        if data["size"] > 0:
-            avg_lat = sum(p["lat"] for p in data["points"]) / data["size"]
-            avg_lng = sum(p["lng"] for p in data["points"]) / data["size"]
-            data["center"] = {"lat": avg_lat, "lng": avg_lng}
-            
-            # Risk level heuristic based on size
-            risk = "Low"
-            if data["size"] >= 7:
-                risk = "Medium"
-            if data["size"] >= 15:
-                risk = "High"
-            if data["size"] >= 30:
-                risk = "Severe"
-                
-            data["riskLevel"] = risk
-            result_clusters.append(data)
+    result_clusters = await compute_pool.run(find_clusters, coords, patient_ids_in_cluster, min_samples)
             
     return {"clusters": result_clusters}
 
 @app.get("/anomalies")
-def get_anomalies(disease: Optional[str] = None, contamination: float = 0.1, state: Optional[str] = None, city: Optional[str] = None, ward: Optional[str] = None):
+async def get_anomalies(disease: Optional[str] = None, contamination: float = 0.1, state: Optional[str] = None, city: Optional[str] = None, ward: Optional[str] = None):
     """
     Uses Isolation Forest to detect anomalous spikes in daily case counts.
     contamination: expected proportion of outliers (0.05 to 0.2 recommended).
     """
+    return await serve_precomputed("anomalies", compute_anomalies, disease=disease, contamination=contamination, state=state, city=city, ward=ward)
+
+async def compute_anomalies(disease: Optional[str] = None, contamination: float = 0.1, state: Optional[str] = None, city: Optional[str] = None, ward: Optional[str] = None):
     if not supabase:
         raise HTTPException(status_code=500, detail="Database connection not initialized.")
     
-    rpc_params = {}
-    if disease: rpc_params["p_disease"] = disease
-    if state: rpc_params["p_state"] = state
-    if city: rpc_params["p_city"] = city
-    if ward: rpc_params["p_ward"] = ward
+    counts = await run_in_threadpool(fetch_daily_counts, supabase, disease=disease, state=state, city=city, ward=ward)
+    daily = daily_series(counts)
     
-    result = supabase.rpc("get_filtered_medical_records", rpc_params).execute()
-    records = result.data
-    
-    if not records:
+    if daily.empty:
         return {"anomalies": [], "message": "No data available."}
-        
-    df = pd.DataFrame(records)
-    df['date'] = pd.to_datetime(df['created_at']).dt.date
-    daily = df.groupby('date').size().reset_index(name='count')
     
     if len(daily) < 10:
         return {"anomalies": [], "message": "Need at least 10 days of data for anomaly detection."}
     
-    from sklearn.ensemble import IsolationForest
-    
-    X = daily[['count']].values
-    clf = IsolationForest(contamination=contamination, random_state=42)
-    daily['anomaly'] = clf.fit_predict(X)
-    
-    # -1 = anomaly, 1 = normal
-    anomalous = daily[daily['anomaly'] == -1]
-    
-    return {
-        "anomalies": [
-            {
-                "date": str(row['date']),
-                "count": int(row['count']),
-                "severity": "High" if row['count'] > daily['count'].mean() + 2 * daily['count'].std() else "Medium"
-            }
-            for _, row in anomalous.iterrows()
-        ],
-        "stats": {
-            "total_days": len(daily),
-            "anomaly_days": len(anomalous),
-            "mean_daily_cases": round(float(daily['count'].mean()), 1),
-            "std_daily_cases": round(float(daily['count'].std()), 1)
-        }
-    }
+    return await compute_pool.run(detect_anomalies, daily, contamination)
 
 @app.get("/r-value")
-def get_r_value(disease: Optional[str] = None, window: int = 7, state: Optional[str] = None, city: Optional[str] = None, ward: Optional[str] = None):
+async def get_r_value(disease: Optional[str] = None, window: int = 7, state: Optional[str] = None, city: Optional[str] = None, ward: Optional[str] = None):
     """
     Computes the effective reproduction number (Rt) using a simple ratio method.
     Rt = (cases in current window) / (cases in previous window).
     A value > 1 means exponential growth.
     """
+    return await serve_precomputed("r-value", compute_r_value, disease=disease or "Leptospirosis", window=window, state=state, city=city, ward=ward)
+
+def compute_r_value(disease: Optional[str] = None, window: int = 7, state: Optional[str] = None, city: Optional[str] = None, ward: Optional[str] = None):
     if not supabase:
         raise HTTPException(status_code=500, detail="Database connection not initialized.")
     
-    rpc_params = {}
     if not disease: disease = "Leptospirosis"
-    rpc_params["p_disease"] = disease
-    if state: rpc_params["p_state"] = state
-    if city: rpc_params["p_city"] = city
-    if ward: rpc_params["p_ward"] = ward
     
-    result = supabase.rpc("get_filtered_medical_records", rpc_params).execute()
-    records = result.data
+    frame = CaseFrame.fetch(supabase, disease=disease, state=state, city=city, ward=ward)
+    daily = frame.daily
     
-    if not records:
+    if daily.empty:
         return {"r_values": [], "message": "No data available."}
-        
-    df = pd.DataFrame(records)
-    df['date'] = pd.to_datetime(df['created_at']).dt.date
-    daily = df.groupby('date').size().reset_index(name='count').sort_values('date')
     
     if len(daily) < window * 2:
         return {"r_values": [], "message": f"Need at least {window * 2} days of data."}
     
-    r_values = []
-    
-    counts = daily['count'].values
-    dates = daily['date'].values
+    # Whole history in one vectorized pass; dates are parsed exactly once
+    counts = daily['count'].to_numpy()
+    years, months = frame.calendar
+    with stage("model"):
+        rt, status = rt_series(counts, years, months, window, disease)
+    dates = daily['date'].dt.strftime('%Y-%m-%d').to_numpy()[window:]
     
-    df['month'] = pd.to_datetime(df['date']).dt.month
-    df['year'] = pd.to_datetime(df['date']).dt.year
-    
-    current_year = df['year'].max() if len(df) > 0 else 2026
-    
-    # Calculate historical baseline excluding the current active year (to prevent self-masking the spike)
-    historical_df = df[df['year'] < current_year]
-    monthly_avg = historical_df.groupby('month').size() / (historical_df.groupby('month')['date'].nunique() + 1e-9)
-
-    for i in range(window, len(counts)):
-        # 1. Use rolling averages instead of single-week ratios (3 weeks)
-        smooth_window = window * 3 
-        recent_slice = counts[max(0, i - smooth_window):i]
-        previous_slice = counts[max(0, i - 2 * smooth_window):max(0, i - smooth_window)]
-        
-        recent_avg = float(np.mean(recent_slice)) if len(recent_slice) > 0 else 0.0
-        previous_avg = float(np.mean(previous_slice)) if len(previous_slice) > 0 else 0.0
-        
-        if disease == "Tuberculosis":
-            rt = None
-            status = "Insufficient Data"
-        elif sum(previous_slice) >= 3:
-            # 2. Add a minimum baseline threshold
-            # Lowered the absolute floor to 10 to allow outbreak detection from a low baseline
-            if previous_avg < 10 / smooth_window: 
-                rt = 1.0
-            else:
-                raw_rt = recent_avg / previous_avg
-                # Dampen explosive statistical ratios into the realistic epidemiological range (target ~ 1.34)
-                rt = round(1.0 + (raw_rt - 1.0) * 0.15, 2)
-                
-                # 3. Add seasonal stability filtering
-                current_month = pd.to_datetime(dates[i]).month
-                hist_avg = monthly_avg.get(current_month, 0)
-                # Widened the stability band to 40% to allow aggressive spikes to break through
-                if hist_avg > 0 and abs(recent_avg - hist_avg) / max(hist_avg, 1) <= 0.40:
-                    rt = 1.0
-                    
-                if rt > 5.0:
-                    rt = None
-                    status = "Insufficient Data"
-                else:
-                    rt = min(rt, 1.8) # Apply safety clamp to avoid unrealistic epidemic rates
-                    
-            if rt is not None:
-                # Require rt > 1.25 to trigger the "Growing" / Above Threshold alert in UI
-                status = "Growing" if rt > 1.25 else ("Stable" if rt >= 0.95 else "Declining")
-        else:
-            rt = None
-            status = "Insufficient Data"
-            
-        r_values.append({
-            "date": str(dates[i]),
-            "r_value": rt,
-            "status": status
-        })
-    
-    # Current R value (latest)
-    current_rt = r_values[-1]["r_value"] if r_values else None
-    
-    # Calculate YoY metrics based on the latest date in df
-    latest_date = df['date'].max()
-    current_year = latest_date.year
-    current_month = latest_date.month
-    
-    current_month_cases = len(df[(pd.to_datetime(df['date']).dt.year == current_year) & (pd.to_datetime(df['date']).dt.month == current_month)])
-    same_month_last_year_cases = len(df[(pd.to_datetime(df['date']).dt.year == current_year - 1) & (pd.to_datetime(df['date']).dt.month == current_month)])
-    
-    multiplier = "N/A"
-    if same_month_last_year_cases > 0:
-        multiplier = round(current_month_cases / same_month_last_year_cases, 1)
-
-    # find max cases in monsoon (June-Sept) of previous year
-    monsoon_df = df[(pd.to_datetime(df['date']).dt.year == current_year - 1) & (pd.to_datetime(df['date']).dt.month >= 6) & (pd.to_datetime(df['date']).dt.month <= 9)]
-    max_monsoon_cases = 0
-    if not monsoon_df.empty:
-        # Group by month and find the max
-        max_monsoon_cases = int(monsoon_df.groupby(pd.to_datetime(monsoon_df['date']).dt.month).size().max())
+    r_values = [
+        {"date": d, "r_value": rt_value(v), "status": str(st)}
+        for d, v, st in zip(dates, rt, status)
+    ]
     
     return {
         "r_values": r_values,
-        "current_r": current_rt,
+        "current_r": r_values[-1]["r_value"] if r_values else None,
         "current_status": r_values[-1]["status"] if r_values else "Insufficient Data",
         "window_days": window,
-        "current_month_cases": current_month_cases,
-        "same_month_last_year_cases": same_month_last_year_cases,
-        "multiplier": multiplier,
-        "max_monsoon_cases": max_monsoon_cases
+        **seasonal_metrics(years, months, counts),
     }
 
+def precompute_geographies() -> List[dict]:
+    """All cases, each city and each ward of the seeded ward map."""
+    from seed.constants import WARD_DISTRIBUTIONS
+    cities = sorted({info["city"] for info in WARD_DISTRIBUTIONS.values()})
+    return [{}] + [{"city": c} for c in cities] + [{"ward": w} for w in WARD_DISTRIBUTIONS]
+
+def precompute_combinations(diseases: List[Optional[str]], **defaults) -> List[dict]:
+    # Keys and defaults must match the route's serve_precomputed() call for lookups to hit
+    return [
+        {"disease": disease, **defaults, "state": None, "city": geo.get("city"), "ward": geo.get("ward")}
+        for disease in diseases
+        for geo in precompute_geographies()
+    ]
+
+def counts_watermark(disease: Optional[str] = None, state: Optional[str] = None, city: Optional[str] = None, ward: Optional[str] = None, **_) -> tuple:
+    """Watermark of the records behind one precomputed result, from a single aggregate row."""
+    return fetch_data_watermark(supabase, disease=disease, state=state, city=city, ward=ward)
+
+def clusters_watermark(disease: Optional[str] = None, **_) -> tuple:
+    """The disease's records plus the latest patient update, so moved locations invalidate clusters."""
+    return fetch_data_watermark(supabase, disease=disease, patients=True)
+
+def register_precompute_jobs():
+    """Every tracked disease (and all diseases together) x city / ward, at default model settings."""
+    # TRACKED_DISEASES is defined further down; combinations are expanded per run
+    precomputer.register("forecast", compute_forecast, lambda: precompute_combinations([None] + TRACKED_DISEASES, days=30), counts_watermark)
+    precomputer.register("r-value", compute_r_value, lambda: precompute_combinations(TRACKED_DISEASES, window=7), counts_watermark)
+    precomputer.register("anomalies", compute_anomalies, lambda: precompute_combinations([None] + TRACKED_DISEASES, contamination=0.1), counts_watermark)
+    precomputer.register("clusters", compute_clusters, lambda: [{"disease": d, "eps": 0.05, "min_samples": 3} for d in [None] + TRACKED_DISEASES], clusters_watermark)
+
+register_precompute_jobs()
+
 @app.get("/situation-report")
 def get_situation_report(disease: str = None):
     """
@@ -404,17 +360,13 @@ def get_situation_report(disease: str = None):
     if not supabase:
         raise HTTPException(status_code=500, detail="Database connection not initialized.")
     
-    # Gather key metrics
-    records_result = supabase.table("medical_records").select("created_at, diagnosis, record_type").execute()
-    patients_result = supabase.table("patients").select("id, status, city, ward_name").execute()
-    
-    records = records_result.data
-    patients = patients_result.data
+    # Gather key metrics (paginated, projected to the columns actually used)
+    df = fetch_table(supabase, "medical_records", "created_at, diagnosis")
+    patients = fetch_table(supabase, "patients", "status")
     
-    if not records:
+    if df.empty:
         return {"report": "No data available to generate a situation report."}
     
-    df = pd.DataFrame(records)
     df['date'] = pd.to_datetime(df['created_at']).dt.date
     
     # Compute summary stats
@@ -429,9 +381,9 @@ def get_situation_report(disease: str = None):
     
     # Patient status breakdown
     status_counts = {}
-    for p in patients:
-        s = p.get('status') or 'ACTIVE'
-        status_counts[s] = status_counts.get(s, 0) + 1
+    if not patients.empty:
+        statuses = patients['status'].fillna('').replace('', 'ACTIVE')
+        status_counts = {str(k): int(v) for k, v in statuses.value_counts(sort=False).items()}
     
     # Top diseases (handle NaN diagnosis)
     diagnoses = df['diagnosis'].fillna('Unknown')
@@ -465,7 +417,8 @@ Format the report as a professional public health situation report with sections
 
 Keep it concise and data-driven."""
             
-            response = model.generate_content(prompt)
+            with stage("llm"):
+                response = model.generate_content(prompt)
             return {"report": response.text, "source": "gemini"}
         except Exception as e:
             pass  # Fall through to structured report
@@ -503,6 +456,8 @@ Total {total_cases} cases recorded. The 7-day trend is **{trend}** with {recent_
 # Stage 13 endpoints
 # ──────────────────────────────────────────────────────────────
 
+TRACKED_DISEASES = ["Dengue", "Malaria", "Leptospirosis", "Typhoid", "Tuberculosis", "Gastroenteritis", "Chikungunya"]
+
 # Nowcasting delay per disease (average reporting lag in days)
 REPORTING_DELAY = {
     "Dengue": 3,
@@ -515,7 +470,7 @@ REPORTING_DELAY = {
 }
 
 @app.get("/forecast-nowcast")
-def get_forecast_nowcast(disease: Optional[str] = None, days: int = 30, state: Optional[str] = None, city: Optional[str] = None, ward: Optional[str] = None):
+async def get_forecast_nowcast(disease: Optional[str] = None, days: int = 30, state: Optional[str] = None, city: Optional[str] = None, ward: Optional[str] = None):
     """
     Prophet forecast with nowcasting adjustment.
     Adjusts the most recent N days of data upward to account for reporting delay,
@@ -523,68 +478,99 @@ def get_forecast_nowcast(disease: Optional[str] = None, days: int = 30, state: O
     """
     if not supabase:
         raise HTTPException(status_code=500, detail="Database connection not initialized.")
+    validate_forecast_days(days)
 
-    rpc_params = {}
-    if disease: rpc_params["p_disease"] = disease
-    if state: rpc_params["p_state"] = state
-    if city: rpc_params["p_city"] = city
-    if ward: rpc_params["p_ward"] = ward
-    
-    result = supabase.rpc("get_filtered_medical_records", rpc_params).execute()
-    records = result.data
+    counts = await run_in_threadpool(fetch_daily_counts, supabase, disease=disease, state=state, city=city, ward=ward)
+    daily = daily_series(counts)
 
-    if not records:
+    if daily.empty:
         return {"dates": [], "predictions": [], "lower": [], "upper": [], "nowcast_adjusted": True, "message": "No data."}
 
-    df = pd.DataFrame(records)
-    df['ds'] = pd.to_datetime(df['created_at']).dt.date
-    daily_counts = df.groupby('ds').size().reset_index(name='y')
-
-    if len(daily_counts) < 3:
+    if len(daily) < 3:
         return {"dates": [], "predictions": [], "lower": [], "upper": [], "nowcast_adjusted": True, "message": "Insufficient data."}
 
     # Apply nowcasting adjustment to recent days
     delay = REPORTING_DELAY.get(disease, 3) if disease else 3
-    daily_counts = daily_counts.sort_values('ds')
-    n = len(daily_counts)
-    for i in range(max(0, n - delay), n):
-        days_ago = n - 1 - i
-        adjustment_factor = 1 + (delay - days_ago) * 0.15  # linearly increase recent counts
-        daily_counts.iloc[i, daily_counts.columns.get_loc('y')] = int(
-            daily_counts.iloc[i]['y'] * adjustment_factor
-        )
+    train = apply_nowcast(training_frame(daily), delay)
 
-    from prophet import Prophet
+    cache_key = ("forecast-nowcast", disease, state, city, ward)
+    result = await compute_pool.run(run_forecast, cache_key, data_watermark(counts), train, days)
+    result["nowcast_adjusted"] = True
+    result["reporting_delay_days"] = delay
+    return result
 
-    # Adding cap for logistic growth
-    daily_counts['cap'] = 150
-    daily_counts['monsoon'] = pd.to_datetime(daily_counts['ds']).dt.month.isin([6, 7, 8, 9]).astype(int)
 
-    m = Prophet(
-        growth='logistic',
-        weekly_seasonality=True, 
-        yearly_seasonality=True,
-        seasonality_mode='multiplicative',
-        changepoint_prior_scale=0.08
-    )
-    m.add_regressor('monsoon')
-    m.fit(daily_counts)
+class ForecastSeriesKey(BaseModel):
+    disease: str
+    state: Optional[str] = None
+    city: Optional[str] = None
+    ward: Optional[str] = None
 
-    future = m.make_future_dataframe(periods=days)
-    future['cap'] = 150
-    future['monsoon'] = future['ds'].dt.month.isin([6, 7, 8, 9]).astype(int)
-    forecast = m.predict(future)
 
-    forecast_subset = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(days + 7)
+class BatchForecastRequest(BaseModel):
+    series: List[ForecastSeriesKey]
+    days: int = 30
+    nowcast: bool = False
 
-    return {
-        "dates": forecast_subset['ds'].dt.strftime('%Y-%m-%d').tolist(),
-        "predictions": [max(0, round(x)) for x in forecast_subset['yhat'].tolist()],
-        "lower": [max(0, round(x)) for x in forecast_subset['yhat_lower'].tolist()],
-        "upper": [max(0, round(x)) for x in forecast_subset['yhat_upper'].tolist()],
-        "nowcast_adjusted": True,
-        "reporting_delay_days": delay,
-    }
+
+# Upper bound on series per batch call
+MAX_BATCH_SERIES = 200
+
+
+@app.post("/forecast/batch")
+async def forecast_batch(req: BatchForecastRequest):
+    """
+    Forecasts many disease x geography series in one call.
+    All series are fetched with a single daily-count query, fits fan out across the
+    compute pool and each result is streamed back as an NDJSON line as soon as it
+    finishes. Fitted models are shared with /forecast and /forecast-nowcast.
+    """
+    if not supabase:
+        raise HTTPException(status_code=500, detail="Database connection not initialized.")
+    if not req.series:
+        raise HTTPException(status_code=400, detail="At least one series is required.")
+    if len(req.series) > MAX_BATCH_SERIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SERIES} series per batch.")
+    validate_forecast_days(req.days)
+
+    # One round-trip for every requested series, grouped by ward
+    diseases = sorted({k.disease for k in req.series})
+    counts = await run_in_threadpool(fetch_daily_counts, supabase, diseases=diseases, by_ward=True)
+
+    variant = "forecast-nowcast" if req.nowcast else "forecast"
+
+    async def forecast_one(key: ForecastSeriesKey):
+        line = {"key": key.model_dump()}
+        subset = select_series(counts, key.disease, key.state, key.city, key.ward)
+        daily = daily_series(subset)
+        if len(daily) < 3:
+            line.update({"dates": [], "predictions": [], "lower": [], "upper": [], "message": "Insufficient data points for forecasting."})
+            return line
+
+        train = training_frame(daily)
+        if req.nowcast:
+            delay = REPORTING_DELAY.get(key.disease, 3)
+            train = apply_nowcast(train, delay)
+            line.update({"nowcast_adjusted": True, "reporting_delay_days": delay})
+
+        cache_key = (variant, key.disease, key.state, key.city, key.ward)
+        # Hold at most one job per worker so a batch cannot exhaust the admission queue
+        async with slots:
+            try:
+                line.update(await compute_pool.run(run_forecast, cache_key, data_watermark(subset), train, req.days))
+            except HTTPException as e:
+                line["error"] = e.detail
+            except Exception as e:
+                line["error"] = f"Forecast error: {str(e)}"
+        return line
+
+    slots = asyncio.Semaphore(max(1, compute_pool.workers))
+
+    async def stream():
+        for finished in asyncio.as_completed([forecast_one(k) for k in req.series]):
+            yield json.dumps(await finished) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 @app.get("/r-value-breakdown")
@@ -592,151 +578,407 @@ def get_r_value_breakdown(city: Optional[str] = None, window: int = 7):
     """
     Returns per-disease R-value breakdown for a given city (or system-wide).
     This powers the per-disease R-value card in the Workspace.
+    All diseases are fetched in one query and evaluated together as a disease x day matrix.
     """
     if not supabase:
         raise HTTPException(status_code=500, detail="Database connection not initialized.")
 
-    TRACKED_DISEASES = ["Dengue", "Malaria", "Leptospirosis", "Typhoid", "Tuberculosis", "Gastroenteritis", "Chikungunya"]
-
-    rpc_params = {}
-    if city: rpc_params["p_city"] = city
+    counts = fetch_daily_counts(supabase, diseases=TRACKED_DISEASES, city=city)
+    with stage("model"):
+        breakdown = latest_rt_by_disease(counts, TRACKED_DISEASES, window)
 
-    breakdown = []
-    for disease in TRACKED_DISEASES:
-        rpc_params["p_disease"] = disease
-        result = supabase.rpc("get_filtered_medical_records", rpc_params).execute()
-        records = result.data
+    return {
+        "breakdown": breakdown,
+        "city": city or "System-Wide",
+        "window_days": window,
+    }
 
-        if not records or len(records) < 5:
-            breakdown.append({"disease": disease, "r_value": None, "status": "Insufficient Data", "case_count": len(records) if records else 0})
-            continue
 
-        df = pd.DataFrame(records)
-        df['date'] = pd.to_datetime(df['created_at']).dt.date
-        daily = df.groupby('date').size().reset_index(name='count').sort_values('date')
+# /rt-matrix payloads per parameter set, least recently used evicted: params -> (watermark, payload)
+_rt_matrix_cache = OrderedDict()
+_rt_matrix_lock = threading.Lock()
+RT_MATRIX_CACHE_SIZE = 64
+# Accepted /rt-matrix smoothing window and history (days)
+RT_MATRIX_WINDOW_RANGE = (1, 28)
+RT_MATRIX_HISTORY_RANGE = (0, 365)
 
-        if len(daily) < window * 2:
-            breakdown.append({"disease": disease, "r_value": None, "status": "Insufficient Data", "case_count": len(records)})
-            continue
+# Browser/CDN cache lifetime for /rt-matrix responses
+RT_MATRIX_MAX_AGE = 300
 
-        df['month'] = pd.to_datetime(df['date']).dt.month
-        df['year'] = pd.to_datetime(df['date']).dt.year
-        current_year = df['year'].max() if len(df) > 0 else 2026
-        
-        # Calculate historical baseline excluding the current active year
-        historical_df = df[df['year'] < current_year]
-        monthly_avg = historical_df.groupby('month').size() / (historical_df.groupby('month')['date'].nunique() + 1e-9)
-        current_month = pd.to_datetime(daily['date'].iloc[-1]).month if len(daily) > 0 else 1
-
-        counts = daily['count'].values
-        # 1. Use 3-week rolling averages
-        smooth_window = window * 3
-        recent_slice = counts[-smooth_window:]
-        previous_slice = counts[-2*smooth_window:-smooth_window]
-        
-        recent_avg = float(np.mean(recent_slice)) if len(recent_slice) > 0 else 0.0
-        previous_avg = float(np.mean(previous_slice)) if len(previous_slice) > 0 else 0.0
-
-        if disease == "Tuberculosis":
-            rt = None
-            status = "Insufficient Data"
-        elif sum(previous_slice) >= 3:
-            # 2. Add a minimum baseline threshold
-            if previous_avg < 10 / smooth_window:
-                rt = 1.0
-            else:
-                raw_rt = recent_avg / previous_avg
-                # Dampen explosive statistical ratios into the realistic epidemiological range
-                rt = round(1.0 + (raw_rt - 1.0) * 0.15, 2)
-                
-                # 3. Add seasonal stability filtering
-                hist_avg = monthly_avg.get(current_month, 0)
-                if hist_avg > 0 and abs(recent_avg - hist_avg) / max(hist_avg, 1) <= 0.40:
-                    rt = 1.0
-                    
-                if rt > 5.0:
-                    rt = None
-                    status = "Insufficient Data"
-                else:
-                    rt = min(rt, 1.8) # Apply safety clamp
-                    
-            if rt is not None:
-                status = "Growing" if rt > 1.25 else ("Stable" if rt >= 0.95 else "Declining")
-        else:
-            rt = None
-            status = "Insufficient Data"
 
-        breakdown.append({
-            "disease": disease,
-            "r_value": rt,
-            "status": status,
-            "case_count": len(records),
-        })
+@app.get("/rt-matrix")
+def get_rt_matrix(
+    request: Request,
+    response: Response,
+    disease: Optional[str] = None,
+    state: Optional[str] = None,
+    city: Optional[str] = None,
+    window: int = 7,
+    history: int = 0,
+):
+    """
+    Renewal-equation (Cori et al.) Rt with 95% credible intervals for every
+    (disease, ward) pair at once, powering the ward-level Rt map.
+    history: number of preceding days to include per cell as a series (0 = latest only).
+    Responses carry an ETag derived from the data watermark and are cacheable.
+    """
+    if not RT_MATRIX_WINDOW_RANGE[0] <= window <= RT_MATRIX_WINDOW_RANGE[1]:
+        raise HTTPException(status_code=400, detail=f"window must be between {RT_MATRIX_WINDOW_RANGE[0]} and {RT_MATRIX_WINDOW_RANGE[1]}.")
+    if not RT_MATRIX_HISTORY_RANGE[0] <= history <= RT_MATRIX_HISTORY_RANGE[1]:
+        raise HTTPException(status_code=400, detail=f"history must be between {RT_MATRIX_HISTORY_RANGE[0]} and {RT_MATRIX_HISTORY_RANGE[1]}.")
+    if not supabase:
+        raise HTTPException(status_code=500, detail="Database connection not initialized.")
 
-    return {
-        "breakdown": breakdown,
-        "city": city or "System-Wide",
+    diseases = [disease] if disease else TRACKED_DISEASES
+    counts = fetch_daily_counts(supabase, diseases=diseases, state=state, city=city, by_ward=True)
+
+    params = (tuple(diseases), state, city, window, history)
+    watermark = data_watermark(counts)
+    etag = '"' + hashlib.sha1(json.dumps([params, watermark], default=str).encode()).hexdigest() + '"'
+    cache_headers = {"ETag": etag, "Cache-Control": f"public, max-age={RT_MATRIX_MAX_AGE}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=cache_headers)
+    response.headers.update(cache_headers)
+
+    with _rt_matrix_lock:
+        cached = _rt_matrix_cache.get(params)
+        if cached is not None and cached[0] == watermark:
+            _rt_matrix_cache.move_to_end(params)
+            return cached[1]
+
+    # Enough calendar history to fill the longest serial interval before the reported days
+    keys, days, incidence = incidence_matrix(counts, n_days=MAX_SERIAL_DAYS + window + history)
+    if len(keys) == 0:
+        return {"cells": [], "dates": [], "window_days": window, "message": "No data available."}
+
+    with stage("model"):
+        est = cori_rt(incidence, serial_interval_matrix(keys["disease"].tolist()), window)
+    status = credible_status(est["lower"], est["upper"])
+    excluded = keys["disease"].isin(RT_EXCLUDED_DISEASES).to_numpy()
+
+    span = slice(len(days) - history - 1, len(days))
+    cells = []
+    for i, key in enumerate(keys.to_dict("records")):
+        cell = {
+            **key,
+            "r_value": None if excluded[i] else rt_value(round(est["mean"][i, -1], 2)),
+            "lower": None if excluded[i] else rt_value(round(est["lower"][i, -1], 2)),
+            "upper": None if excluded[i] else rt_value(round(est["upper"][i, -1], 2)),
+            "status": "Insufficient Data" if excluded[i] else str(status[i, -1]),
+            "window_cases": int(est["window_cases"][i, -1]),
+        }
+        if history > 0:
+            cell["series"] = [None if excluded[i] else rt_value(round(v, 2)) for v in est["mean"][i, span]]
+        cells.append(cell)
+
+    payload = {
+        "cells": cells,
+        "as_of": days[-1].strftime('%Y-%m-%d'),
+        "dates": days[span].strftime('%Y-%m-%d').tolist() if history > 0 else [],
         "window_days": window,
+        "method": "cori",
     }
+    with _rt_matrix_lock:
+        _rt_matrix_cache[params] = (watermark, payload)
+        _rt_matrix_cache.move_to_end(params)
+        while len(_rt_matrix_cache) > RT_MATRIX_CACHE_SIZE:
+            _rt_matrix_cache.popitem(last=False)
+    return payload
+
+
+WARD_POPULATION = {
+    "Wadala": 180000, "Antop Hill": 120000, "Sewri": 95000, 
+    "Colaba": 50000, "Fort": 40000, "Matunga": 85000, 
+    "Dadar": 110000, "Kalyan West": 350000, "Kalyan East": 280000, 
+    "Dombivli": 280000, "Vashi": 200000, "Belapur": 150000, 
+    "Nerul": 130000, "Shivajinagar": 120000, "Hadapsar": 180000, 
+    "Pimpri": 220000
+}
+DEFAULT_WARD_POPULATION = 5000
 
+# Calibrated SIR parameters per (disease, ward), least recently used evicted: key -> (watermark, fit)
+_sir_fit_cache = OrderedDict()
+_sir_fit_lock = threading.Lock()
+SIR_FIT_CACHE_SIZE = 256
 
-@app.get("/sir-simulate")
-def sir_simulate(
+
+def get_sir_fit(disease: str, ward: Optional[str], watermark):
+    """Cached fit for (disease, ward) computed from data with this watermark, or None."""
+    with _sir_fit_lock:
+        cached = _sir_fit_cache.get((disease, ward))
+        if cached is None or cached[0] != watermark:
+            return None
+        _sir_fit_cache.move_to_end((disease, ward))
+        return cached[1]
+
+
+def put_sir_fit(disease: str, ward: Optional[str], watermark, fit: dict):
+    with _sir_fit_lock:
+        _sir_fit_cache[(disease, ward)] = (watermark, fit)
+        _sir_fit_cache.move_to_end((disease, ward))
+        while len(_sir_fit_cache) > SIR_FIT_CACHE_SIZE:
+            _sir_fit_cache.popitem(last=False)
+
+
+def cached_sir_fit(disease: str, ward: Optional[str], frame: CaseFrame):
+    """
+    Calibrated parameters for this data, if /sir-fit has already run on it.
+
+    Returns:
+        (fit, rejection): the reusable fit or None, and why an existing fit was not reused
+    """
+    from ml.sir_fit import fit_rejection
+
+    fit = get_sir_fit(disease, ward, frame.watermark())
+    if fit is None:
+        return None, None
+    rejection = fit_rejection(fit)
+    return (None, rejection) if rejection else (fit, None)
+
+
+def sir_fit_response(fit: dict, cached: bool) -> dict:
+    """Fit as returned by /sir-fit; the cache keeps full-precision beta and gamma."""
+    rounded = {k: round(fit[k], 4) for k in ("beta", "gamma") if k in fit}
+    return {**fit, **rounded, "cached": cached}
+
+
+@app.get("/metapop-simulate")
+async def metapop_simulate(
     disease: str = "Dengue",
-    ward: Optional[str] = None,
     days: int = 90,
-    intervention_day: Optional[int] = None,
-    intervention_effectiveness: float = 0.0,
+    travel_fraction: float = 0.10,
+    seed_ward: Optional[str] = None,
+    include_series: bool = True,
 ):
     """
-    Run the SIR compartmental model for a given disease.
-    Returns S, I, R time series and key metrics (R0, peak day, total infected).
+    Metapopulation SEIR across every seeded ward, coupled by commuting between
+    neighbouring wards. Each ward starts from its observed active cases
+    (last 14 days); `seed_ward` seeds 10 cases there when nothing is observed.
     """
-    from ml.sir_model import run_sir_model, DEFAULT_SIR_PARAMS
+    from seed.constants import WARD_DISTRIBUTIONS
+    from ml.sir_model import DEFAULT_SIR_PARAMS
+    from ml.metapop import run_metapop_seir, MAX_DAYS
+
+    if days < 1 or days > MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"days must be between 1 and {MAX_DAYS}.")
+    if not 0 <= travel_fraction < 1:
+        raise HTTPException(status_code=400, detail="travel_fraction must be in [0, 1).")
+    if seed_ward is not None and seed_ward not in WARD_DISTRIBUTIONS:
+        raise HTTPException(status_code=404, detail=f"Unknown ward: {seed_ward}")
+
+    names = list(WARD_DISTRIBUTIONS)
+    lats = np.array([WARD_DISTRIBUTIONS[w]["center"][0] for w in names])
+    lngs = np.array([WARD_DISTRIBUTIONS[w]["center"][1] for w in names])
+    populations = np.array([WARD_POPULATION.get(w, DEFAULT_WARD_POPULATION) for w in names], dtype=float)
+
+    # One by-ward fetch gives both the per-ward seeds and the system-wide Rt
+    initial = np.zeros(len(names))
+    rt = None
+    if supabase:
+        try:
+            frame = await run_in_threadpool(CaseFrame.fetch, supabase, disease=disease, by_ward=True)
+            initial = frame.active_cases_by_ward(days=14).reindex(names, fill_value=0).to_numpy(dtype=float)
+            rt = frame.latest_rt(window=7)
+        except Exception as e:
+            print("Error fetching case data:", e)
+    if initial.sum() == 0:
+        initial[names.index(seed_ward) if seed_ward else 0] = 10
 
-    WARD_POPULATION = {
-        "Wadala": 180000, "Antop Hill": 120000, "Sewri": 95000, 
-        "Colaba": 50000, "Fort": 40000, "Matunga": 85000, 
-        "Dadar": 110000, "Kalyan West": 350000, "Kalyan East": 280000, 
-        "Dombivli": 280000, "Vashi": 200000, "Belapur": 150000, 
-        "Nerul": 130000, "Shivajinagar": 120000, "Hadapsar": 180000, 
-        "Pimpri": 220000
-    }
-    N = WARD_POPULATION.get(ward, 5000) if ward else 5000
-    
-    # Calculate I0: active cases within the last 14 days
-    I0 = 10 # Default fallback
+    gamma_val = DEFAULT_SIR_PARAMS.get(disease, DEFAULT_SIR_PARAMS["Default"])["gamma"]
+    beta_val = float(rt) * gamma_val * 0.85 if rt is not None else None
+
+    try:
+        return await compute_pool.run(
+            run_metapop_seir,
+            disease=disease,
+            ward_names=names,
+            lats=lats,
+            lngs=lngs,
+            populations=populations,
+            initial_infected=initial,
+            days=days,
+            beta=beta_val,
+            gamma=gamma_val,
+            travel_fraction=travel_fraction,
+            include_series=include_series,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Metapopulation simulation error: {str(e)}")
+
+
+class InterventionEvent(BaseModel):
+    start_day: int
+    end_day: Optional[int] = None  # None = until the end of the simulation
+    beta_multiplier: float
+
+
+def parse_schedule(schedule: Optional[str]) -> List[tuple]:
+    """
+    Parse a query-string schedule "start:end:multiplier,..." (end may be empty)
+    into (start_day, end_day, beta_multiplier) tuples.
+    """
+    if not schedule:
+        return []
+    events = []
+    try:
+        for item in schedule.split(","):
+            start, end, multiplier = item.strip().split(":")
+            events.append((int(start), int(end) if end else None, float(multiplier)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="schedule must look like 'start:end:multiplier,...', e.g. '7:40:0.65,14::0.8'.")
+    return events
+
+
+def validate_schedule(events: List[tuple], days: int) -> List[tuple]:
+    """Reject malformed intervention events with a 400 before any model work is queued."""
+    from ml.sir_model import normalize_schedule
+    try:
+        return normalize_schedule(events, days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def validate_effectiveness(intervention_effectiveness: float) -> float:
+    """Reject an intervention effectiveness outside [0, 1] with a 400."""
+    if not 0 <= intervention_effectiveness <= 1:
+        raise HTTPException(status_code=400, detail="intervention_effectiveness must be between 0 and 1.")
+    return intervention_effectiveness
+
+
+async def run_sir_cached(**kwargs) -> dict:
+    """
+    run_sir_model behind the SIR result cache. Full simulations run on the compute
+    pool; metrics-only runs are cheap enough to run inline.
+    """
+    from ml.sir_model import run_sir_model
+
+    params = normalize_sir_params(**kwargs)
+    cache = get_sir_cache()
+    result = cache.get(params)
+    if result is None:
+        if params["metrics_only"]:
+            with stage("model"):
+                result = run_sir_model(**params)
+        else:
+            result = await compute_pool.run(run_sir_model, **params)
+        cache.put(params, result)
+    # Callers annotate the payload; keep the cached entry pristine
+    return dict(result)
+
+
+async def fetch_case_frame(disease: str, ward: Optional[str], by_ward: bool = False, city: Optional[str] = None) -> CaseFrame:
+    """Case frame for one request; empty when the database is unavailable."""
+    frame = CaseFrame.empty(disease)
     if supabase:
-        rpc_params = {"p_disease": disease}
-        if ward: rpc_params["p_ward"] = ward
         try:
-            res = supabase.rpc("get_filtered_medical_records", rpc_params).execute()
-            if res.data:
-                df = pd.DataFrame(res.data)
-                if not df.empty and 'created_at' in df.columns and 'status' in df.columns:
-                    df['created_at'] = pd.to_datetime(df['created_at'], utc=True)
-                    cutoff = pd.Timestamp.utcnow() - pd.Timedelta(days=14)
-                    active = df[(df['status'].str.upper() == 'ACTIVE') & (df['created_at'] >= cutoff)]
-                    if len(active) > 0:
-                        I0 = len(active)
+            frame = await run_in_threadpool(CaseFrame.fetch, supabase, disease=disease, city=city, ward=ward, by_ward=by_ward)
         except Exception as e:
-            print("Error computing I0:", e)
+            print("Error fetching case data:", e)
+    return frame
+
+
+async def observed_sir_state(disease: str, ward: Optional[str], frame: Optional[CaseFrame] = None):
+    """
+    Starting point for the SIR endpoints from one case-frame fetch.
+
+    Returns:
+        (I0, beta, gamma, calibration): active cases in the last 14 days, and either
+        the /sir-fit parameters for this data or beta derived from the latest Rt
+    """
+    from ml.sir_model import DEFAULT_SIR_PARAMS
+
+    # One fetch shared by the I0 and Rt steps
+    if frame is None:
+        frame = await fetch_case_frame(disease, ward)
+
+    # Calculate I0: active cases within the last 14 days
+    I0 = frame.active_cases(days=14) or 10 # Default fallback
 
-    # Compute Beta
+    # Parameters calibrated by /sir-fit on this exact data take precedence
+    fit, rejection = cached_sir_fit(disease, ward, frame)
+    if fit is not None:
+        calibration = {"source": "fitted", "r_squared": fit["r_squared"], "window_days": fit["window_days"]}
+        return I0, fit["beta"], fit["gamma"], calibration
+
+    # Compute Beta from the latest Rt only (same value /r-value reports as current_r)
     rt = 1.0
     try:
-        r_data = get_r_value(disease=disease, window=7, ward=ward)
-        if r_data.get("current_r") is not None:
-            rt = float(r_data["current_r"])
+        current_r = frame.latest_rt(window=7)
+        if current_r is not None:
+            rt = float(current_r)
     except Exception as e:
         print("Error getting R value:", e)
-        
+
     gamma_val = DEFAULT_SIR_PARAMS.get(disease, DEFAULT_SIR_PARAMS["Default"])["gamma"]
     # Apply damping factor (0.85) to prevent explosive curves
     beta_val = rt * gamma_val * 0.85
+    calibration = {"source": "rt-heuristic"}
+    if rejection:
+        calibration["fit_rejected"] = rejection
+    return I0, beta_val, gamma_val, calibration
+
+
+@app.get("/sir-simulate")
+async def sir_simulate(
+    disease: str = "Dengue",
+    ward: Optional[str] = None,
+    days: int = 90,
+    intervention_day: Optional[int] = None,
+    intervention_effectiveness: float = 0.0,
+    schedule: Optional[str] = None,
+    age_structured: bool = False,
+    city: Optional[str] = None,
+):
+    """
+    Run the SIR compartmental model for a given disease.
+    Returns S, I, R time series and key metrics (R0, peak day, total infected).
+    `schedule` adds intervention events as "start:end:beta_multiplier,..."
+    (e.g. "7:40:0.65,14:60:0.8,40::1.1"), all integrated in one solver pass.
+    `age_structured=true` splits the population into age bands with a contact
+    matrix and adds per-band curves.
+    Vector-borne diseases (Dengue, Malaria, Chikungunya) use the host-vector model
+    with monsoon-seasonal mosquito capacity. `city` (without a ward) models that
+    city's wards: vector-borne diseases integrate every ward in one batched pass and
+    add per-ward results, other diseases use the city's combined population.
+    """
+    from seed.constants import WARD_DISTRIBUTIONS
+    from ml.vector_model import is_vector_borne
+
+    events = validate_schedule(parse_schedule(schedule), days)
+    validate_effectiveness(intervention_effectiveness)
+
+    city_wards = None
+    if city and not ward:
+        city_wards = [w for w in WARD_POPULATION if WARD_DISTRIBUTIONS.get(w, {}).get("city") == city]
+        if not city_wards:
+            raise HTTPException(status_code=404, detail=f"Unknown city: {city}")
+    if ward:
+        N = WARD_POPULATION.get(ward, DEFAULT_WARD_POPULATION)
+    elif city_wards:
+        N = sum(WARD_POPULATION[w] for w in city_wards)
+    else:
+        N = DEFAULT_WARD_POPULATION
+    vector_borne = is_vector_borne(disease) and not age_structured
+    city_wide = vector_borne and city_wards is not None
+
+    # City-wide runs seed each ward from its own active cases, so fetch by ward
+    frame = await fetch_case_frame(disease, ward, by_ward=city_wide, city=city if city_wards else None)
+    I0, beta_val, gamma_val, calibration = await observed_sir_state(disease, ward, frame)
+
+    wards = None
+    if city_wide:
+        names = city_wards
+        populations = np.array([WARD_POPULATION[n] for n in names], dtype=float)
+        active = frame.active_cases_by_ward(days=14).reindex(names, fill_value=0).to_numpy(dtype=float)
+        if active.sum() == 0:
+            # No ward-level cases: spread the fallback I0 by population
+            active = I0 * populations / populations.sum()
+        wards = [(n, int(p), float(a)) for n, p, a in zip(names, populations, active)]
 
     try:
-        result = run_sir_model(
+        result = await run_sir_cached(
             disease=disease,
             initial_infected=I0,
             days=days,
@@ -745,17 +987,167 @@ def sir_simulate(
             custom_beta=beta_val,
             custom_gamma=gamma_val,
             population=N,
+            schedule=events,
+            age_structured=age_structured,
+            vector_borne=vector_borne,
+            wards=wards,
         )
+        result["calibration"] = calibration
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"SIR simulation error: {str(e)}")
 
 
+@app.get("/sir-stochastic")
+async def sir_stochastic(
+    disease: str = "Dengue",
+    ward: Optional[str] = None,
+    days: int = 90,
+    realizations: int = 10000,
+    initial_infected: Optional[int] = None,
+    seed: Optional[int] = None,
+):
+    """
+    Stochastic (tau-leaping) SIR for small populations and early outbreaks.
+    Returns the extinction probability, the outbreak-size distribution and
+    percentile bands of the infected curve; `seed` makes runs reproducible.
+    """
+    from ml.sir_stochastic import run_stochastic_sir, MAX_REALIZATIONS, MAX_DAYS
+
+    if realizations < 1 or realizations > MAX_REALIZATIONS:
+        raise HTTPException(status_code=400, detail=f"realizations must be between 1 and {MAX_REALIZATIONS}.")
+    if days < 1 or days > MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"days must be between 1 and {MAX_DAYS}.")
+
+    N = WARD_POPULATION.get(ward, DEFAULT_WARD_POPULATION) if ward else DEFAULT_WARD_POPULATION
+    I0, beta_val, gamma_val, calibration = await observed_sir_state(disease, ward)
+
+    try:
+        result = await compute_pool.run(
+            run_stochastic_sir,
+            disease=disease,
+            initial_infected=initial_infected if initial_infected is not None else I0,
+            population=N,
+            days=days,
+            realizations=realizations,
+            custom_beta=beta_val,
+            custom_gamma=gamma_val,
+            seed=seed,
+        )
+        result["calibration"] = calibration
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Stochastic SIR error: {str(e)}")
+
+
+@app.get("/sir-fit")
+async def sir_fit(
+    disease: str = "Dengue",
+    ward: Optional[str] = None,
+):
+    """
+    Calibrate SIR beta, gamma and I0 to the observed daily incidence by least squares.
+    Fits are cached per data watermark; /sir-simulate and /sir-stochastic reuse them
+    only when converged, r_squared >= 0.5 and no parameter sits on a bound.
+    """
+    from ml.sir_fit import fit_sir
+
+    if not supabase:
+        raise HTTPException(status_code=500, detail="Supabase not configured")
+
+    N = WARD_POPULATION.get(ward, DEFAULT_WARD_POPULATION) if ward else DEFAULT_WARD_POPULATION
+    frame = await run_in_threadpool(CaseFrame.fetch, supabase, disease=disease, ward=ward)
+    watermark = frame.watermark()
+
+    cached = get_sir_fit(disease, ward, watermark)
+    if cached is not None:
+        return sir_fit_response(cached, cached=True)
+
+    try:
+        fit = await compute_pool.run(fit_sir, frame.incidence(), N, disease)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"SIR fit error: {str(e)}")
+
+    fit = {**fit, "disease": disease, "ward": ward}
+    put_sir_fit(disease, ward, watermark, fit)
+    return sir_fit_response(fit, cached=False)
+
+
+@app.get("/sir-ensemble")
+async def sir_ensemble(
+    disease: str = "Dengue",
+    ward: Optional[str] = None,
+    days: int = 90,
+    runs: int = 1000,
+    intervention_day: Optional[int] = None,
+    intervention_effectiveness: float = 0.0,
+    schedule: Optional[str] = None,
+    seed: Optional[int] = None,
+):
+    """
+    Monte-Carlo SIR ensemble for a given disease.
+    Samples beta/gamma/I0 from the disease defaults and the observed Rt uncertainty
+    (renewal-equation posterior when enough cases, else the /r-value estimate) and
+    returns percentile bands of the infected and recovered curves.
+    """
+    from ml.sir_ensemble import run_sir_ensemble, MAX_ENSEMBLE_RUNS
+
+    if runs < 1 or runs > MAX_ENSEMBLE_RUNS:
+        raise HTTPException(status_code=400, detail=f"runs must be between 1 and {MAX_ENSEMBLE_RUNS}.")
+
+    events = validate_schedule(parse_schedule(schedule), days)
+    validate_effectiveness(intervention_effectiveness)
+    N = WARD_POPULATION.get(ward, DEFAULT_WARD_POPULATION) if ward else DEFAULT_WARD_POPULATION
+
+    frame = CaseFrame.empty(disease)
+    if supabase:
+        try:
+            frame = await run_in_threadpool(CaseFrame.fetch, supabase, disease=disease, ward=ward)
+        except Exception as e:
+            print("Error fetching case data:", e)
+
+    I0 = frame.active_cases(days=14) or 10 # Default fallback
+    rt, posterior = None, None
+    try:
+        posterior = frame.rt_posterior()
+        rt = frame.latest_rt(window=7)
+    except Exception as e:
+        print("Error getting R value:", e)
+
+    try:
+        return await compute_pool.run(
+            run_sir_ensemble,
+            disease=disease,
+            initial_infected=I0,
+            population=N,
+            days=days,
+            n_runs=runs,
+            rt=rt,
+            rt_posterior=posterior,
+            intervention_day=intervention_day,
+            intervention_effectiveness=intervention_effectiveness,
+            schedule=events,
+            seed=seed,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"SIR ensemble error: {str(e)}")
+
+
 class InterventionRequest(BaseModel):
     disease: str = "Dengue"
     city: Optional[str] = None
     current_cases: int = 50
     current_r_value: Optional[float] = None
+    # Explicit campaign; replaces the rule's single day-7 intervention when given
+    schedule: Optional[List[InterventionEvent]] = None
 
 
 INTERVENTION_RULES = {
@@ -770,14 +1162,14 @@ INTERVENTION_RULES = {
 
 
 @app.post("/recommend-intervention")
-def recommend_intervention(req: InterventionRequest):
+async def recommend_intervention(req: InterventionRequest):
     """
     Recommends an intervention strategy using:
     1. Rule-based lookup (disease → strategy mapping)
     2. SIR model projection (with vs without intervention)
     3. Gemini LLM analysis (if API key available)
     """
-    from ml.sir_model import run_sir_model, DEFAULT_SIR_PARAMS
+    from ml.sir_model import DEFAULT_SIR_PARAMS
 
     # 1. Rule-based recommendation
     rule = INTERVENTION_RULES.get(req.disease, {
@@ -790,24 +1182,32 @@ def recommend_intervention(req: InterventionRequest):
     gamma_val = DEFAULT_SIR_PARAMS.get(req.disease, DEFAULT_SIR_PARAMS["Default"])["gamma"]
     rt = req.current_r_value if req.current_r_value is not None else 1.0
     beta_val = rt * gamma_val * 0.85
+
+    if req.schedule:
+        intervention = {"schedule": validate_schedule([(e.start_day, e.end_day, e.beta_multiplier) for e in req.schedule], 90)}
+    else:
+        intervention = {"intervention_day": 7, "intervention_effectiveness": rule["effectiveness"]}
     
-    baseline = run_sir_model(
+    # Only summary metrics are read, so the closed-form path replaces two ODE solves
+    population = 5000 if req.disease == "Leptospirosis" else 100000
+    baseline = await run_sir_cached(
         disease=req.disease,
         initial_infected=req.current_cases,
         days=90,
         custom_beta=beta_val,
         custom_gamma=gamma_val,
-        population=5000 if req.disease == "Leptospirosis" else 100000, 
+        population=population,
+        metrics_only=True,
     )
-    with_intervention = run_sir_model(
+    with_intervention = await run_sir_cached(
         disease=req.disease,
         initial_infected=req.current_cases,
         days=90,
-        intervention_day=7,
-        intervention_effectiveness=rule["effectiveness"],
         custom_beta=beta_val,
         custom_gamma=gamma_val,
-        population=5000 if req.disease == "Leptospirosis" else 100000,
+        population=population,
+        metrics_only=True,
+        **intervention,
     )
 
     cases_averted = int(baseline["total_infected_end"] - with_intervention["total_infected_end"])
@@ -831,6 +1231,7 @@ def recommend_intervention(req: InterventionRequest):
             "peak_infections": int(with_intervention["peak_infections"]),
             "total_infected": int(with_intervention["total_infected_end"]),
             "R0_post": float(with_intervention["R0_post_intervention"]),
+            "schedule": with_intervention["schedule"],
         },
         "impact": {
             "cases_averted": cases_averted,
@@ -860,7 +1261,8 @@ SIR Model Projection: {cases_averted} cases averted, peak reduced by {peak_reduc
 
 Respond with ONLY the 3-sentence recommendation, no headers or formatting."""
 
-            response = model.generate_content(prompt)
+            with stage("llm"):
+                response = await run_in_threadpool(model.generate_content, prompt)
             result["gemini_recommendation"] = response.text.strip()
             result["source"] = "rule_based+sir+gemini"
         except Exception:
@@ -869,6 +1271,84 @@ Respond with ONLY the 3-sentence recommendation, no headers or formatting."""
     return result
 
 
+class OptimizeRequest(BaseModel):
+    disease: str = "Dengue"
+    ward: Optional[str] = None
+    current_cases: Optional[int] = None  # Observed active cases when omitted
+    current_r_value: Optional[float] = None  # Observed Rt when omitted
+    days: int = 90
+    start_days: List[int] = [0, 3, 7, 10, 14, 21, 28]
+    effectiveness: List[float] = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6]
+    durations: List[Optional[int]] = [7, 14, 28, 42, 56, None]  # None = until the end
+
+
+@app.post("/intervention-optimize")
+async def intervention_optimize(req: OptimizeRequest):
+    """
+    Sweep intervention start day x effectiveness x duration and return the Pareto
+    frontier of cases averted and peak delay against cost. All scenarios are
+    integrated together, split into one batch per compute worker.
+    """
+    from ml.sir_model import DEFAULT_SIR_PARAMS
+    from ml.intervention_optimizer import scenario_grid, simulate_scenarios, scenario_cost, summarize_frontier, MAX_SCENARIOS
+
+    scenarios = scenario_grid(req.days, req.start_days, req.effectiveness, req.durations)
+    if len(scenarios) == 0:
+        raise HTTPException(status_code=400, detail="The sweep grid contains no valid scenarios.")
+    if len(scenarios) > MAX_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"Sweep grid has {len(scenarios)} scenarios; the limit is {MAX_SCENARIOS}.")
+
+    rule = INTERVENTION_RULES.get(req.disease, {
+        "strategy": "General Public Health Advisory",
+        "effectiveness": 0.15,
+        "cost_level": "Low",
+    })
+
+    # Observed state when the caller did not pin it
+    I0, rt = req.current_cases, req.current_r_value
+    if (I0 is None or rt is None) and supabase:
+        try:
+            frame = await run_in_threadpool(CaseFrame.fetch, supabase, disease=req.disease, ward=req.ward)
+            I0 = I0 if I0 is not None else frame.active_cases(days=14)
+            rt = rt if rt is not None else frame.latest_rt(window=7)
+        except Exception as e:
+            print("Error fetching case data:", e)
+    I0 = I0 or 10
+    rt = rt if rt is not None else 1.0
+
+    gamma_val = DEFAULT_SIR_PARAMS.get(req.disease, DEFAULT_SIR_PARAMS["Default"])["gamma"]
+    beta_val = rt * gamma_val * 0.85
+    if req.ward:
+        N = WARD_POPULATION.get(req.ward, DEFAULT_WARD_POPULATION)
+    else:
+        N = 5000 if req.disease == "Leptospirosis" else 100000
+
+    chunks = np.array_split(scenarios, max(1, min(compute_pool.workers, len(scenarios) // 64 or 1)))
+    no_intervention = np.zeros((1, 3))
+    parts = await asyncio.gather(*[
+        compute_pool.run(simulate_scenarios, I0, N, beta_val, gamma_val, req.days, chunk)
+        for chunk in [no_intervention, *chunks]
+    ])
+    baseline = {k: v[0] for k, v in parts[0].items()}
+    results = {k: np.concatenate([part[k] for part in parts[1:]]) for k in baseline}
+
+    frontier = await compute_pool.run(summarize_frontier, scenarios, results, baseline, scenario_cost(scenarios, rule["cost_level"]))
+    return {
+        "disease": req.disease,
+        "ward": req.ward,
+        "strategy": rule["strategy"],
+        "cost_level": rule["cost_level"],
+        "scenarios_evaluated": int(len(scenarios)),
+        "baseline": {
+            "peak_day": int(baseline["peak_day"]),
+            "peak_infections": int(round(baseline["peak_infections"])),
+            "total_infected": int(round(baseline["total_infected"])),
+            "R0": round(beta_val / gamma_val, 2),
+        },
+        "frontier": frontier,
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
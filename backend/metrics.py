@@ -0,0 +1,200 @@
+"""
+Request-scoped stage timing, latency histograms and a slow-request log.
+Each request gets a trace held in a context variable, so `stage("fetch")` blocks
+anywhere on the request path (including the threadpool, which copies the context)
+add their time to it without threading anything through call signatures. The
+middleware folds finished traces into per-endpoint and per-stage histograms,
+rendered as Prometheus text by /metrics, and keeps the breakdown of any request
+slower than SLOW_REQUEST_MS.
+"""
+
+import bisect
+import contextvars
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from fastapi.responses import JSONResponse
+
+
+# Requests slower than this (ms) are kept in the slow-request log
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+SLOW_LOG_SIZE = int(os.getenv("SLOW_LOG_SIZE", "200"))
+# Histogram bucket upper bounds (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+REQUEST_ID_HEADER = "x-request-id"
+
+
+class RequestTrace:
+    """Stage durations recorded for one request."""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self._open: Dict[str, list] = {}  # stage -> [open blocks, first block start]
+        self._lock = threading.Lock()
+
+    def enter(self, name: str):
+        with self._lock:
+            entry = self._open.setdefault(name, [0, 0.0])
+            if entry[0] == 0:
+                entry[1] = time.perf_counter()
+            entry[0] += 1
+
+    def exit(self, name: str):
+        # Nested or concurrent blocks of one stage count as wall time while any is open
+        with self._lock:
+            entry = self._open[name]
+            entry[0] -= 1
+            if entry[0] == 0:
+                self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - entry[1]
+
+
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("request_trace", default=None)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block as stage `name` of the current request; no-op outside a request."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    trace.enter(name)
+    try:
+        yield
+    finally:
+        trace.exit(name)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram keyed by a label tuple."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[tuple, list] = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, seconds: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect.bisect_left(self.buckets, seconds)] += 1
+            series[-1] += seconds
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            items = [(labels, list(series)) for labels, series in items]
+        for labels, series in items:
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_LATENCY = Histogram("api_request_duration_seconds", "End-to-end request latency.", ("endpoint", "method", "status"))
+STAGE_LATENCY = Histogram("api_stage_duration_seconds", "Time spent per request stage.", ("endpoint", "stage"))
+_slow_requests = deque(maxlen=SLOW_LOG_SIZE)
+
+
+def slow_requests() -> list:
+    """Most recent slow requests, newest first."""
+    return list(reversed(_slow_requests))
+
+
+def record_request(trace: RequestTrace, endpoint: str, method: str, path: str, query: str, status: int):
+    elapsed = time.perf_counter() - trace.started
+    REQUEST_LATENCY.observe((endpoint, method, str(status)), elapsed)
+    for name, seconds in trace.stages.items():
+        STAGE_LATENCY.observe((endpoint, name), seconds)
+
+    if elapsed * 1000 >= SLOW_REQUEST_MS:
+        stages_ms = {name: round(s * 1000, 1) for name, s in trace.stages.items()}
+        stages_ms["other"] = round(max(0.0, elapsed - sum(trace.stages.values())) * 1000, 1)
+        _slow_requests.append({
+            "request_id": trace.request_id,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "method": method,
+            "path": path,
+            "query": query,
+            "status": status,
+            "duration_ms": round(elapsed * 1000, 1),
+            "stages_ms": stages_ms,
+        })
+        target = f"{path}?{query}" if query else path
+        print(f"Slow request {trace.request_id} {method} {target} {elapsed * 1000:.0f} ms {stages_ms}")
+
+
+def render_prometheus(extra_gauges: Optional[Dict[str, float]] = None) -> str:
+    lines = REQUEST_LATENCY.render() + STAGE_LATENCY.render()
+    lines += ["# HELP api_slow_requests_logged Slow requests currently in the log.", "# TYPE api_slow_requests_logged gauge", f"api_slow_requests_logged {len(_slow_requests)}"]
+    for name, value in (extra_gauges or {}).items():
+        if value is not None:
+            lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse whose body encoding is recorded as the `serialize` stage."""
+
+    def render(self, content) -> bytes:
+        with stage("serialize"):
+            return super().render(content)
+
+
+class MetricsMiddleware:
+    """ASGI middleware: opens a trace per HTTP request and records it once the response body is sent."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(REQUEST_ID_HEADER.encode(), b"").decode() or uuid.uuid4().hex
+        trace = RequestTrace(request_id)
+        token = _current_trace.set(trace)
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(REQUEST_ID_HEADER.encode(), request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _current_trace.reset(token)
+            # Label by route template, not raw path, to bound series cardinality
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            record_request(trace, endpoint, scope["method"], scope["path"], scope.get("query_string", b"").decode(), status)
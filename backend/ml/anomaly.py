@@ -0,0 +1,44 @@
+"""
+Isolation Forest anomaly detection on daily case counts.
+"""
+
+import pandas as pd
+
+
+def detect_anomalies(daily: pd.DataFrame, contamination: float = 0.1) -> dict:
+    """
+    Flag anomalous spikes in a (date, count) daily series.
+
+    Args:
+        daily: Daily case counts, one row per day
+        contamination: Expected proportion of outliers (0.05 to 0.2 recommended)
+
+    Returns:
+        API payload with anomalous days and summary stats
+    """
+    from sklearn.ensemble import IsolationForest
+
+    daily = daily.copy()
+    X = daily[['count']].values
+    clf = IsolationForest(contamination=contamination, random_state=42)
+    daily['anomaly'] = clf.fit_predict(X)
+
+    # -1 = anomaly, 1 = normal
+    anomalous = daily[daily['anomaly'] == -1]
+
+    return {
+        "anomalies": [
+            {
+                "date": row['date'].strftime('%Y-%m-%d'),
+                "count": int(row['count']),
+                "severity": "High" if row['count'] > daily['count'].mean() + 2 * daily['count'].std() else "Medium"
+            }
+            for _, row in anomalous.iterrows()
+        ],
+        "stats": {
+            "total_days": len(daily),
+            "anomaly_days": len(anomalous),
+            "mean_daily_cases": round(float(daily['count'].mean()), 1),
+            "std_daily_cases": round(float(daily['count'].std()), 1)
+        }
+    }
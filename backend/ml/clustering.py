@@ -0,0 +1,79 @@
+"""
+DBSCAN hotspot clustering on patient locations.
+"""
+
+import numpy as np
+from typing import List
+
+
+# Haversine metric requires radians.
+# We define eps in kilometers. Let's use 0.10 km (100m) as the default cluster radius to fracture the city-wide blob
+CLUSTER_RADIUS_KM = 0.1
+KMS_PER_RADIAN = 6371.0088
+
+
+def find_clusters(coords: List[List[float]], patient_ids: list, min_samples: int = 3) -> List[dict]:
+    """
+    Cluster [lat, lng] points into hotspots.
+
+    Args:
+        coords: [lat, lng] per affected patient record
+        patient_ids: Patient id for each coordinate
+        min_samples: Minimum neighbourhood size (floored at 7)
+
+    Returns:
+        List of clusters with points, size, center and riskLevel
+    """
+    from sklearn.cluster import DBSCAN
+
+    eps_rad = CLUSTER_RADIUS_KM / KMS_PER_RADIAN
+
+    # Convert lat/lng to radians for haversine
+    coords_rad = np.radians(coords)
+
+    db = DBSCAN(eps=eps_rad, min_samples=max(min_samples, 7), metric='haversine').fit(coords_rad)
+    labels = db.labels_
+
+    # Process clusters
+    clusters = {}
+    for i, label in enumerate(labels):
+        if label == -1:
+            continue # Noise point
+
+        label_str = str(label)
+        if label_str not in clusters:
+            clusters[label_str] = {
+                "id": label_str,
+                "points": [],
+                "size": 0,
+                "center": {"lat": 0, "lng": 0}
+            }
+
+        clusters[label_str]["points"].append({
+            "patient_id": patient_ids[i],
+            "lat": coords[i][0],
+            "lng": coords[i][1]
+        })
+        clusters[label_str]["size"] += 1
+
+    # Calculate geometric centers for the clusters
+    result_clusters = []
+    for c_id, data in clusters.items():
+        if data["size"] > 0:
+            avg_lat = sum(p["lat"] for p in data["points"]) / data["size"]
+            avg_lng = sum(p["lng"] for p in data["points"]) / data["size"]
+            data["center"] = {"lat": avg_lat, "lng": avg_lng}
+
+            # Risk level heuristic based on size
+            risk = "Low"
+            if data["size"] >= 7:
+                risk = "Medium"
+            if data["size"] >= 15:
+                risk = "High"
+            if data["size"] >= 30:
+                risk = "Severe"
+
+            data["riskLevel"] = risk
+            result_clusters.append(data)
+
+    return result_clusters
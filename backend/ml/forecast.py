@@ -0,0 +1,100 @@
+"""
+Prophet forecasting shared by /forecast and /forecast-nowcast.
+Fitting is the expensive step, so it is split from prediction: a fitted model can be
+cached and reused for any forecast horizon until new records arrive.
+"""
+
+import pandas as pd
+from typing import Optional
+
+
+# Monsoon months used as an extra regressor (June-September)
+MONSOON_MONTHS = [6, 7, 8, 9]
+
+# Capacity cap for logistic growth, prevents unrealistic exponential growth
+LOGISTIC_CAP = 150
+
+# Recent days of history returned alongside the future predictions
+HISTORY_TAIL_DAYS = 7
+
+# Longest forecast horizon in days
+MAX_FORECAST_DAYS = 365
+
+
+def training_frame(daily: pd.DataFrame) -> pd.DataFrame:
+    """Build the Prophet training frame (ds, y, cap, monsoon) from a (date, count) series."""
+    train = daily.rename(columns={'date': 'ds', 'count': 'y'})[['ds', 'y']].copy()
+    train['cap'] = LOGISTIC_CAP
+    train['monsoon'] = train['ds'].dt.month.isin(MONSOON_MONTHS).astype(int)
+    return train
+
+
+def apply_nowcast(train: pd.DataFrame, delay: int) -> pd.DataFrame:
+    """Adjust the most recent `delay` days upward to account for reporting lag."""
+    train = train.sort_values('ds').reset_index(drop=True)
+    n = len(train)
+    for i in range(max(0, n - delay), n):
+        days_ago = n - 1 - i
+        adjustment_factor = 1 + (delay - days_ago) * 0.15  # linearly increase recent counts
+        train.loc[i, 'y'] = int(train.loc[i, 'y'] * adjustment_factor)
+    return train
+
+
+def fit_prophet(train: pd.DataFrame):
+    """
+    Fit a logistic-growth Prophet model with tuned changepoints.
+    This prevents linear explosions and detects outbreaks rapidly.
+    """
+    from prophet import Prophet
+
+    m = Prophet(
+        growth='logistic',
+        weekly_seasonality=True,
+        yearly_seasonality=True,
+        seasonality_mode='multiplicative',
+        changepoint_prior_scale=0.08
+    )
+    m.add_regressor('monsoon')
+    m.fit(train)
+    return m
+
+
+def predict_tail(model, days: int) -> dict:
+    """Predict `days` into the future and return the recent past + future as the API payload."""
+    future = model.make_future_dataframe(periods=days)
+    future['cap'] = LOGISTIC_CAP
+    future['monsoon'] = future['ds'].dt.month.isin(MONSOON_MONTHS).astype(int)
+    forecast = model.predict(future)
+
+    forecast_subset = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(days + HISTORY_TAIL_DAYS)
+
+    # Cap negative predictions at 0
+    return {
+        "dates": forecast_subset['ds'].dt.strftime('%Y-%m-%d').tolist(),
+        "predictions": [max(0, round(x)) for x in forecast_subset['yhat'].tolist()],
+        "lower": [max(0, round(x)) for x in forecast_subset['yhat_lower'].tolist()],
+        "upper": [max(0, round(x)) for x in forecast_subset['yhat_upper'].tolist()]
+    }
+
+
+def cached_forecast(cache, key: tuple, watermark: Optional[tuple], train: pd.DataFrame, days: int) -> dict:
+    """
+    Forecast using a cached fitted model when the data watermark still matches,
+    fitting (and caching) a fresh model otherwise.
+    """
+    model = cache.get(key, watermark) if cache is not None else None
+    cache_hit = model is not None
+    if model is None:
+        model = fit_prophet(train)
+        if cache is not None:
+            cache.put(key, watermark, model)
+
+    payload = predict_tail(model, days)
+    payload["model_cached"] = cache_hit
+    return payload
+
+
+def run_forecast(key: tuple, watermark: Optional[tuple], train: pd.DataFrame, days: int) -> dict:
+    """Compute-pool entry point: forecast with this process's model cache."""
+    from ml.model_cache import get_model_cache
+    return cached_forecast(get_model_cache(), key, watermark, train, days)
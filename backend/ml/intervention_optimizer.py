@@ -0,0 +1,133 @@
+"""
+Intervention scenario optimizer.
+Sweeps start day x effectiveness x duration grids, advances every scenario together
+with the batched SIR integrator and keeps the Pareto frontier of cases averted,
+peak delay and cost.
+"""
+
+import itertools
+import numpy as np
+from typing import List, Optional
+
+from ml.sir_model import integrate_sir_batch
+
+
+# Relative daily cost of running an intervention at full strength, per INTERVENTION_RULES cost level
+COST_LEVEL_WEIGHTS = {"Low": 1.0, "Medium": 2.0, "High": 3.0, "Very High": 4.0}
+MAX_SCENARIOS = 5000
+
+
+def scenario_grid(days: int, start_days: List[int], effectiveness: List[float], durations: List[Optional[int]]) -> np.ndarray:
+    """
+    Cartesian product of the sweep axes, clipped to the horizon and de-duplicated.
+
+    Returns:
+        (n_scenarios, 3) array of start_day, end_day, effectiveness
+    """
+    rows = set()
+    for start, eff, duration in itertools.product(start_days, effectiveness, durations):
+        if not 0 <= start < days or not 0 < eff <= 1:
+            continue
+        end = days if duration is None else min(start + duration, days)
+        if end > start:
+            rows.add((start, end, round(float(eff), 4)))
+    return np.array(sorted(rows), dtype=float).reshape(-1, 3)
+
+
+def scenario_multipliers(days: int, scenarios: np.ndarray) -> np.ndarray:
+    """(days, n_scenarios) beta multipliers: 1 - effectiveness while each intervention runs."""
+    t = np.arange(days)[:, None]
+    active = (t >= scenarios[:, 0]) & (t < scenarios[:, 1])
+    return np.where(active, 1.0 - scenarios[:, 2], 1.0)
+
+
+def simulate_scenarios(initial_infected: float, population: float, beta: float, gamma: float, days: int, scenarios: np.ndarray) -> dict:
+    """
+    Run a chunk of scenarios in one batched integration (compute-pool entry point).
+
+    Returns:
+        Dict of (n_scenarios,) arrays: total_infected, peak_day, peak_infections
+    """
+    n = len(scenarios)
+    I0 = np.full(n, float(min(initial_infected, population - 1)))
+    traj = integrate_sir_batch(population - I0, I0, np.zeros(n), population, beta, gamma, days,
+                               beta_multiplier=scenario_multipliers(days, scenarios))
+    infected = traj[:, :, 1]
+    return {
+        "total_infected": traj[-1, :, 2],
+        "peak_day": np.argmax(infected, axis=0),
+        "peak_infections": infected.max(axis=0),
+    }
+
+
+def scenario_cost(scenarios: np.ndarray, cost_level: str) -> np.ndarray:
+    """Cost index: level weight x intervention days x effectiveness (stronger, longer campaigns cost more)."""
+    weight = COST_LEVEL_WEIGHTS.get(cost_level, COST_LEVEL_WEIGHTS["Medium"])
+    return weight * (scenarios[:, 1] - scenarios[:, 0]) * scenarios[:, 2]
+
+
+def pareto_front(cost: np.ndarray, averted: np.ndarray, delay: np.ndarray) -> np.ndarray:
+    """
+    Indices of rows not dominated on (lower cost, more cases averted, longer peak delay).
+
+    Rows are visited cheapest first (ties: most averted, then longest delay), so every
+    row that could dominate one is seen before it. A max-Fenwick tree over delay levels
+    holds the most cases averted so far at each delay or longer: O(n log n) time and
+    O(n) memory instead of an n x n dominance matrix.
+
+    Returns:
+        Sorted indices of the Pareto-optimal rows
+    """
+    order = np.lexsort((-delay, -averted, cost)).tolist()
+    # Level 1 is the longest delay, so "delay >= d" is a prefix of the tree
+    levels, level = np.unique(-np.asarray(delay), return_inverse=True)
+    cost, averted, level = np.asarray(cost).tolist(), np.asarray(averted).tolist(), (level + 1).tolist()
+    tree = [-np.inf] * (len(levels) + 1)
+
+    front = []
+    start = 0
+    while start < len(order):
+        i = order[start]
+        # Identical rows do not dominate each other: they share one verdict
+        stop = start + 1
+        while stop < len(order) and (cost[order[stop]], averted[order[stop]], level[order[stop]]) == (cost[i], averted[i], level[i]):
+            stop += 1
+
+        best, k = -np.inf, level[i]
+        while k > 0:
+            best = max(best, tree[k])
+            k -= k & -k
+        if best < averted[i]:
+            front.extend(order[start:stop])
+            k = level[i]
+            while k < len(tree):
+                tree[k] = max(tree[k], averted[i])
+                k += k & -k
+        start = stop
+    return np.sort(np.array(front, dtype=int))
+
+
+def summarize_frontier(scenarios: np.ndarray, results: dict, baseline: dict, cost: np.ndarray) -> List[dict]:
+    """Pareto frontier (cases averted, peak delay vs cost), cheapest first."""
+    averted = baseline["total_infected"] - results["total_infected"]
+    peak_delay = results["peak_day"] - baseline["peak_day"]
+    peak_reduction = baseline["peak_infections"] - results["peak_infections"]
+
+    front = pareto_front(cost, averted, peak_delay)
+    front = front[np.lexsort((-averted[front], cost[front]))]
+
+    return [
+        {
+            "start_day": int(scenarios[i, 0]),
+            "end_day": int(scenarios[i, 1]),
+            "duration_days": int(scenarios[i, 1] - scenarios[i, 0]),
+            "effectiveness_pct": int(round(scenarios[i, 2] * 100)),
+            "cost_index": round(float(cost[i]), 2),
+            "cases_averted": int(round(averted[i])),
+            "peak_reduction": int(round(peak_reduction[i])),
+            "peak_delay_days": int(peak_delay[i]),
+            "peak_day": int(results["peak_day"][i]),
+            "total_infected": int(round(results["total_infected"][i])),
+        }
+        for i in front
+    ]
@@ -0,0 +1,135 @@
+"""
+Fitted Prophet model cache.
+Models are keyed by (variant, disease, state, city, ward) and tagged with a data
+watermark (latest created_at, record count). A cached model is only reused while
+the watermark matches, so a refit happens exactly when new records arrive.
+Fitted parameters are persisted to local disk as JSON with LRU eviction.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+DEFAULT_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".model_cache"))
+DEFAULT_MAX_MEMORY = int(os.getenv("MODEL_CACHE_MAX_MEMORY", "32"))
+DEFAULT_MAX_DISK = int(os.getenv("MODEL_CACHE_MAX_DISK", "256"))
+
+
+def _key_hash(key: tuple) -> str:
+    return hashlib.sha1(json.dumps(list(key), default=str).encode()).hexdigest()
+
+
+class ProphetModelCache:
+    """Two-level (memory + disk) LRU cache of fitted Prophet models."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_memory: int = DEFAULT_MAX_MEMORY, max_disk: int = DEFAULT_MAX_DISK):
+        self.cache_dir = cache_dir
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self._memory = OrderedDict()  # key hash -> (watermark, model)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, key: tuple, watermark: Optional[tuple]):
+        """Return the fitted model for `key` if it was fitted on data with the same watermark."""
+        digest = _key_hash(key)
+        watermark = list(watermark) if watermark is not None else None
+
+        with self._lock:
+            entry = self._memory.get(digest)
+            if entry is not None and entry[0] == watermark:
+                self._memory.move_to_end(digest)
+                self.hits += 1
+                return entry[1]
+
+        model = self._load(digest, watermark)
+        with self._lock:
+            if model is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(digest, watermark, model)
+        return model
+
+    def put(self, key: tuple, watermark: Optional[tuple], model):
+        digest = _key_hash(key)
+        watermark = list(watermark) if watermark is not None else None
+        with self._lock:
+            self._remember(digest, watermark, model)
+        self._store(digest, key, watermark, model)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "memory_entries": len(self._memory)}
+
+    def _remember(self, digest: str, watermark, model):
+        self._memory[digest] = (watermark, model)
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def _load(self, digest: str, watermark):
+        path = self._path(digest)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("watermark") != watermark:
+            return None
+
+        from prophet.serialize import model_from_json
+        try:
+            model = model_from_json(entry["model"])
+        except Exception as e:
+            print(f"Discarding unreadable cached model {path}: {e}")
+            return None
+        # Touch for LRU ordering on disk
+        os.utime(path, None)
+        return model
+
+    def _store(self, digest: str, key: tuple, watermark, model):
+        from prophet.serialize import model_to_json
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(digest)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"key": list(key), "watermark": watermark, "model": model_to_json(model)}, f)
+            os.replace(tmp_path, path)  # atomic, safe with concurrent writers
+            self._evict_disk()
+        except OSError as e:
+            print(f"Error persisting model cache entry: {e}")
+
+    def _evict_disk(self):
+        entries = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.endswith(".json")
+        ]
+        if len(entries) <= self.max_disk:
+            return
+        entries.sort(key=lambda p: os.path.getmtime(p))
+        for path in entries[:len(entries) - self.max_disk]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_default_cache: Optional[ProphetModelCache] = None
+
+
+def get_model_cache() -> ProphetModelCache:
+    """Process-wide model cache instance."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ProphetModelCache()
+    return _default_cache
@@ -0,0 +1,275 @@
+"""
+Effective reproduction number (Rt) rules shared by the Rt endpoints.
+Rt is a dampened ratio of 3-week rolling means of daily case counts, with a minimum
+baseline floor, a seasonal stability filter against the historical monthly average
+and safety clamps. Everything here works on NumPy arrays so many diseases (or many
+days) are evaluated at once.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Tuple
+
+
+# The smoothing window is SMOOTH_MULTIPLIER x the requested window (3 weeks for 7 days)
+SMOOTH_MULTIPLIER = 3
+# Minimum cases in the previous window before a ratio is attempted
+MIN_PREVIOUS_CASES = 3
+# Lowered the absolute floor to 10 to allow outbreak detection from a low baseline
+BASELINE_FLOOR_CASES = 10
+# Dampen explosive statistical ratios into the realistic epidemiological range (target ~ 1.34)
+DAMPENING = 0.15
+# Widened the stability band to 40% to allow aggressive spikes to break through
+SEASONAL_BAND = 0.40
+# Ratios above this are treated as statistical noise
+EXPLOSIVE_LIMIT = 5.0
+# Safety clamp to avoid unrealistic epidemic rates
+CLAMP_MAX = 1.8
+# Require rt > 1.25 to trigger the "Growing" / Above Threshold alert in UI
+GROWING_THRESHOLD = 1.25
+STABLE_THRESHOLD = 0.95
+# Diseases whose reporting cadence makes a ratio estimate meaningless
+RT_EXCLUDED_DISEASES = ("Tuberculosis",)
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    """
+    Round to 2 decimals with Python's correctly-rounded `round` (np.round scales by 100
+    first and disagrees on ties like 0.975), so published values stay identical.
+    """
+    flat = values.ravel()
+    out = np.array([round(v, 2) if np.isfinite(v) else v for v in flat.tolist()], dtype=float)
+    return out.reshape(values.shape)
+
+
+def apply_rt_rules(recent_avg, previous_avg, previous_sum, hist_avg, smooth_window: int) -> np.ndarray:
+    """
+    Apply baseline floor, dampening, seasonal filter and clamps element-wise.
+
+    Args:
+        recent_avg: Mean daily cases over the recent smoothing window
+        previous_avg: Mean daily cases over the window before it
+        previous_sum: Total cases in the previous window
+        hist_avg: Historical average daily cases for the current month (0 = unknown)
+        smooth_window: Smoothing window length in days
+
+    Returns:
+        Rt per element, NaN where Rt is not available ("Insufficient Data")
+    """
+    recent_avg = np.asarray(recent_avg, dtype=float)
+    previous_avg = np.asarray(previous_avg, dtype=float)
+    previous_sum = np.asarray(previous_sum, dtype=float)
+    hist_avg = np.asarray(hist_avg, dtype=float)
+
+    below_floor = previous_avg < BASELINE_FLOOR_CASES / smooth_window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw_rt = recent_avg / previous_avg
+    rt = _round2(1.0 + (raw_rt - 1.0) * DAMPENING)
+
+    seasonal = (hist_avg > 0) & (np.abs(recent_avg - hist_avg) / np.maximum(hist_avg, 1) <= SEASONAL_BAND)
+    rt = np.where(seasonal, 1.0, rt)
+    rt = np.where(rt > EXPLOSIVE_LIMIT, np.nan, np.minimum(rt, CLAMP_MAX))
+
+    rt = np.where(below_floor, 1.0, rt)
+    return np.where(previous_sum >= MIN_PREVIOUS_CASES, rt, np.nan)
+
+
+def rt_status(rt: np.ndarray) -> np.ndarray:
+    """Map Rt values to UI status labels."""
+    rt = np.asarray(rt, dtype=float)
+    return np.select(
+        [np.isnan(rt), rt > GROWING_THRESHOLD, rt >= STABLE_THRESHOLD],
+        ["Insufficient Data", "Growing", "Stable"],
+        default="Declining",
+    )
+
+
+def rt_value(rt: float):
+    """NaN -> None for JSON payloads."""
+    return None if np.isnan(rt) else float(rt)
+
+
+def calendar(dates) -> Tuple[np.ndarray, np.ndarray]:
+    """Parse dates once into (year, month) arrays."""
+    index = pd.DatetimeIndex(dates)
+    return index.year.to_numpy(), index.month.to_numpy()
+
+
+def monthly_average(years: np.ndarray, months: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Historical average daily cases per calendar month (index 1-12), excluding the
+    current (latest) year so a spike cannot mask itself. Months without history are 0.
+    """
+    hist = years < years.max()
+    sums = np.bincount(months[hist], weights=counts[hist], minlength=13)
+    days = np.bincount(months[hist], minlength=13)
+    return sums / (days + 1e-9)
+
+
+def window_means(counts: np.ndarray, window: int, start: int, stop: int = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Recent / previous smoothing-window means for every evaluation index start <= i < stop,
+    from one cumulative sum: recent = counts[i-sw:i], previous = counts[i-2sw:i-sw].
+    i = len(counts) evaluates the windows ending with the latest day.
+
+    Returns:
+        (recent_avg, previous_avg, previous_sum) arrays of length stop - start
+    """
+    smooth_window = window * SMOOTH_MULTIPLIER
+    csum = np.concatenate([[0.0], np.cumsum(counts, dtype=float)])
+    i = np.arange(start, len(counts) if stop is None else stop)
+    mid = np.maximum(0, i - smooth_window)
+    lo = np.maximum(0, i - 2 * smooth_window)
+
+    recent_sum, recent_n = csum[i] - csum[mid], i - mid
+    previous_sum, previous_n = csum[mid] - csum[lo], mid - lo
+    recent_avg = np.divide(recent_sum, recent_n, out=np.zeros(len(i)), where=recent_n > 0)
+    previous_avg = np.divide(previous_sum, previous_n, out=np.zeros(len(i)), where=previous_n > 0)
+    return recent_avg, previous_avg, previous_sum
+
+
+def rt_series(counts: np.ndarray, years: np.ndarray, months: np.ndarray, window: int = 7, disease: str = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rt for every day from index `window` onwards of a daily series (days with cases).
+
+    Args:
+        counts: Daily case counts sorted by date
+        years, months: Calendar of each day (see `calendar`)
+        window: Base window in days (smoothing uses 3x)
+        disease: Disease name, for exclusions
+
+    Returns:
+        (rt, status) arrays aligned with counts[window:]; rt is NaN where unavailable
+    """
+    counts = np.asarray(counts, dtype=float)
+    n_eval = max(0, len(counts) - window)
+    if disease in RT_EXCLUDED_DISEASES or n_eval == 0:
+        rt = np.full(n_eval, np.nan)
+        return rt, rt_status(rt)
+
+    recent_avg, previous_avg, previous_sum = window_means(counts, window, window)
+    hist_avg = monthly_average(years, months, counts)[months[window:]]
+    rt = apply_rt_rules(recent_avg, previous_avg, previous_sum, hist_avg, window * SMOOTH_MULTIPLIER)
+    return rt, rt_status(rt)
+
+
+def latest_rt(counts: np.ndarray, years: np.ndarray, months: np.ndarray, window: int = 7, disease: str = None):
+    """
+    Fast path for the last value of `rt_series`: evaluates only the final window and
+    the historical average of the final month.
+
+    Returns:
+        Rt as a float, or None where unavailable
+    """
+    counts = np.asarray(counts, dtype=float)
+    n = len(counts)
+    if disease in RT_EXCLUDED_DISEASES or n <= window:
+        return None
+
+    recent_avg, previous_avg, previous_sum = window_means(counts, window, n - 1, n)
+    month = months[-1]
+    hist = (years < years.max()) & (months == month)
+    hist_avg = counts[hist].sum() / (hist.sum() + 1e-9)
+
+    rt = apply_rt_rules(recent_avg, previous_avg, previous_sum, [hist_avg], window * SMOOTH_MULTIPLIER)
+    return rt_value(rt[0])
+
+
+def seasonal_metrics(years: np.ndarray, months: np.ndarray, counts: np.ndarray) -> dict:
+    """Year-over-year and previous-monsoon metrics relative to the latest day of the series."""
+    current_year, current_month = years[-1], months[-1]
+    this_month = (months == current_month)
+
+    current_month_cases = int(counts[this_month & (years == current_year)].sum())
+    same_month_last_year_cases = int(counts[this_month & (years == current_year - 1)].sum())
+
+    multiplier = "N/A"
+    if same_month_last_year_cases > 0:
+        multiplier = round(current_month_cases / same_month_last_year_cases, 1)
+
+    # Max monthly cases in the monsoon (June-Sept) of the previous year
+    monsoon = (years == current_year - 1) & (months >= 6) & (months <= 9)
+    monthly = np.bincount(months[monsoon], weights=counts[monsoon], minlength=13)
+    max_monsoon_cases = int(monthly.max()) if monsoon.any() else 0
+
+    return {
+        "current_month_cases": current_month_cases,
+        "same_month_last_year_cases": same_month_last_year_cases,
+        "multiplier": multiplier,
+        "max_monsoon_cases": max_monsoon_cases,
+    }
+
+
+def trailing_matrix(frame: pd.DataFrame, groups: List[str], width: int) -> np.ndarray:
+    """
+    Right-align the last `width` observed daily counts of every group into a
+    (groups x width) matrix, NaN-padded on the left for short histories.
+    The rules operate on days with reported cases, so each row is aligned on its own days.
+    """
+    matrix = np.full((len(groups), width), np.nan)
+    if frame.empty:
+        return matrix
+    frame = frame.sort_values("date")
+    pos_from_end = frame.groupby("disease").cumcount(ascending=False).to_numpy()
+    rows = pd.Categorical(frame["disease"], categories=groups).codes
+    keep = (pos_from_end < width) & (rows >= 0)
+    matrix[rows[keep], width - 1 - pos_from_end[keep]] = frame["count"].to_numpy(dtype=float)[keep]
+    return matrix
+
+
+def monthly_baseline(frame: pd.DataFrame, groups: List[str]) -> np.ndarray:
+    """
+    Historical average daily cases in each group's current month (month of its latest day),
+    excluding the group's current year so a spike cannot mask itself.
+    """
+    if frame.empty:
+        return np.zeros(len(groups))
+    df = frame[["disease", "date", "count"]].copy()
+    df["year"] = df["date"].dt.year
+    df["month"] = df["date"].dt.month
+
+    latest = df.groupby("disease")["date"].max()
+    df["current_year"] = df["disease"].map(latest.dt.year)
+    df["current_month"] = df["disease"].map(latest.dt.month)
+
+    hist = df[(df["year"] < df["current_year"]) & (df["month"] == df["current_month"])]
+    grouped = hist.groupby("disease")["count"]
+    baseline = grouped.sum() / (grouped.size() + 1e-9)
+    return baseline.reindex(groups).fillna(0).to_numpy(dtype=float)
+
+
+def latest_rt_by_disease(frame: pd.DataFrame, diseases: List[str], window: int = 7) -> List[dict]:
+    """
+    Latest Rt for every disease at once from a (date, disease, count) frame.
+
+    Returns:
+        One {"disease", "r_value", "status", "case_count"} entry per disease, in order
+    """
+    smooth_window = window * SMOOTH_MULTIPLIER
+    daily = frame.groupby(["disease", "date"], as_index=False)["count"].sum() if not frame.empty else frame
+
+    case_count = daily.groupby("disease")["count"].sum().reindex(diseases).fillna(0).to_numpy(dtype=int) if not daily.empty else np.zeros(len(diseases), dtype=int)
+    n_days = daily.groupby("disease").size().reindex(diseases).fillna(0).to_numpy(dtype=int) if not daily.empty else np.zeros(len(diseases), dtype=int)
+
+    matrix = trailing_matrix(daily, diseases, 2 * smooth_window)
+    previous = matrix[:, :smooth_window]
+    recent = matrix[:, smooth_window:]
+
+    recent_n = np.sum(~np.isnan(recent), axis=1)
+    previous_n = np.sum(~np.isnan(previous), axis=1)
+    recent_sum = np.nansum(recent, axis=1)
+    previous_sum = np.nansum(previous, axis=1)
+    recent_avg = np.divide(recent_sum, recent_n, out=np.zeros(len(diseases)), where=recent_n > 0)
+    previous_avg = np.divide(previous_sum, previous_n, out=np.zeros(len(diseases)), where=previous_n > 0)
+
+    rt = apply_rt_rules(recent_avg, previous_avg, previous_sum, monthly_baseline(daily, diseases), smooth_window)
+
+    # Not enough history at all, or excluded from ratio estimation
+    insufficient = (case_count < 5) | (n_days < window * 2) | np.isin(diseases, RT_EXCLUDED_DISEASES)
+    rt = np.where(insufficient, np.nan, rt)
+    status = rt_status(rt)
+
+    return [
+        {"disease": d, "r_value": rt_value(rt[i]), "status": str(status[i]), "case_count": int(case_count[i])}
+        for i, d in enumerate(diseases)
+    ]
@@ -0,0 +1,183 @@
+"""
+SIR result cache.
+run_sir_model is a pure function of its parameters, so results are memoized under a
+normalized parameter tuple: floats are quantized to a fixed number of significant
+digits and the legacy single intervention is folded into the schedule, so requests
+that describe the same simulation share one entry. The model is always run on the
+normalized parameters, so a cached result is exactly what a fresh run would return.
+Results live in a memory LRU backed by JSON files on disk with LRU eviction.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Optional
+
+from ml.sir_model import normalize_schedule
+
+
+DEFAULT_CACHE_DIR = os.getenv("SIR_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".sir_cache"))
+DEFAULT_MAX_MEMORY = int(os.getenv("SIR_CACHE_MAX_MEMORY", "1024"))
+DEFAULT_MAX_DISK = int(os.getenv("SIR_CACHE_MAX_DISK", "10000"))
+# Significant digits kept for float parameters
+QUANTIZE_DIGITS = 6
+
+
+def _quantize(value: Optional[float]) -> Optional[float]:
+    return None if value is None else float(f"{float(value):.{QUANTIZE_DIGITS}g}")
+
+
+def normalize_sir_params(
+    disease: str,
+    initial_infected: int,
+    days: int = 90,
+    intervention_day: Optional[int] = None,
+    intervention_effectiveness: float = 0.0,
+    custom_beta: Optional[float] = None,
+    custom_gamma: Optional[float] = None,
+    population: Optional[int] = None,
+    schedule=None,
+    metrics_only: bool = False,
+    age_structured: bool = False,
+    vector_borne: bool = False,
+    wards=None,
+    start_date=None,
+) -> dict:
+    """Canonical run_sir_model keyword arguments for a simulation request."""
+    events = list(schedule or [])
+    if intervention_day is not None and 0 < intervention_day < days:
+        events.append((intervention_day, None, 1 - intervention_effectiveness))
+    events = [(start, end, _quantize(factor)) for start, end, factor in normalize_schedule(events, days)]
+
+    return {
+        "disease": disease,
+        "initial_infected": int(initial_infected),
+        "days": int(days),
+        "custom_beta": _quantize(custom_beta),
+        "custom_gamma": _quantize(custom_gamma),
+        "population": None if population is None else int(population),
+        "schedule": events,
+        "metrics_only": bool(metrics_only),
+        "age_structured": bool(age_structured),
+        "vector_borne": bool(vector_borne),
+        "wards": None if wards is None else [(str(name), int(pop), _quantize(seed)) for name, pop, seed in wards],
+        # The monsoon season is resolved per calendar day, so entries roll over daily
+        "start_date": None if not vector_borne else str(start_date or date.today()),
+    }
+
+
+def _key_hash(params: dict) -> str:
+    return hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class SirResultCache:
+    """Two-level (memory + disk) LRU cache of SIR results keyed by normalized parameters."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_memory: int = DEFAULT_MAX_MEMORY, max_disk: int = DEFAULT_MAX_DISK):
+        self.cache_dir = cache_dir
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self._memory = OrderedDict()  # key hash -> result
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, params: dict) -> Optional[dict]:
+        """Cached result for normalized parameters, or None."""
+        digest = _key_hash(params)
+        with self._lock:
+            result = self._memory.get(digest)
+            if result is not None:
+                self._memory.move_to_end(digest)
+                self.memory_hits += 1
+                return result
+
+        result = self._load(digest)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(digest, result)
+        return result
+
+    def put(self, params: dict, result: dict):
+        digest = _key_hash(params)
+        with self._lock:
+            self._remember(digest, result)
+        self._store(digest, params, result)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else None,
+            "memory_entries": len(self._memory),
+        }
+
+    def _remember(self, digest: str, result: dict):
+        self._memory[digest] = result
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def _load(self, digest: str) -> Optional[dict]:
+        path = self._path(digest)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Touch for LRU ordering on disk
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return entry.get("result")
+
+    def _store(self, digest: str, params: dict, result: dict):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(digest)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"params": params, "result": result}, f)
+            os.replace(tmp_path, path)  # atomic, safe with concurrent writers
+            self._evict_disk()
+        except OSError as e:
+            print(f"Error persisting SIR cache entry: {e}")
+
+    def _evict_disk(self):
+        entries = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.endswith(".json")
+        ]
+        if len(entries) <= self.max_disk:
+            return
+        entries.sort(key=lambda p: os.path.getmtime(p))
+        for path in entries[:len(entries) - self.max_disk]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_default_cache: Optional[SirResultCache] = None
+
+
+def get_sir_cache() -> SirResultCache:
+    """Process-wide SIR result cache instance."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SirResultCache()
+    return _default_cache
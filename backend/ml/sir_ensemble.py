@@ -0,0 +1,144 @@
+"""
+Monte-Carlo SIR ensemble.
+Samples beta, gamma and I0 per run from the disease defaults and the observed Rt
+uncertainty, integrates every run at once with `integrate_sir_batch`, and reduces
+the trajectories to percentile bands.
+"""
+
+import numpy as np
+from typing import Optional, List, Tuple
+
+from ml.sir_model import DEFAULT_SIR_PARAMS, integrate_sir_batch, normalize_schedule, beta_schedule
+
+
+# Relative spread (lognormal sigma) of the recovery rate around the disease default
+GAMMA_SIGMA = 0.15
+# Lognormal sigma of Rt when only a point estimate is available
+RT_POINT_SIGMA = 0.25
+# Damping applied to observed Rt when deriving beta (same as /sir-simulate)
+BETA_DAMPING = 0.85
+ENSEMBLE_PERCENTILES = (5, 25, 50, 75, 95)
+MAX_ENSEMBLE_RUNS = 20000
+
+
+def sample_parameters(
+    disease: str,
+    n_runs: int,
+    initial_infected: int,
+    rt: Optional[float] = None,
+    rt_posterior: Optional[Tuple[float, float]] = None,
+    rng: Optional[np.random.Generator] = None,
+) -> dict:
+    """
+    Draw per-run SIR parameters.
+
+    Args:
+        disease: Disease name to look up default parameters
+        n_runs: Number of parameter sets
+        initial_infected: Observed active cases (Poisson-sampled per run)
+        rt: Point estimate of the current Rt
+        rt_posterior: (shape, scale) of a gamma posterior on Rt; preferred over `rt`
+        rng: Random generator
+
+    Returns:
+        Dict of (n_runs,) arrays: beta, gamma, I0, rt; plus the Rt source label
+    """
+    rng = rng or np.random.default_rng()
+    params = DEFAULT_SIR_PARAMS.get(disease, DEFAULT_SIR_PARAMS["Default"])
+
+    gamma = params["gamma"] * rng.lognormal(-GAMMA_SIGMA ** 2 / 2, GAMMA_SIGMA, n_runs)
+
+    if rt_posterior is not None:
+        shape, scale = rt_posterior
+        rt_samples = rng.gamma(shape, scale, n_runs)
+        beta = rt_samples * gamma * BETA_DAMPING
+        source = "renewal-posterior"
+    elif rt is not None:
+        rt_samples = rt * rng.lognormal(-RT_POINT_SIGMA ** 2 / 2, RT_POINT_SIGMA, n_runs)
+        beta = rt_samples * gamma * BETA_DAMPING
+        source = "point-estimate"
+    else:
+        rt_samples = params["beta"] / params["gamma"] * rng.lognormal(-RT_POINT_SIGMA ** 2 / 2, RT_POINT_SIGMA, n_runs)
+        beta = rt_samples * gamma
+        source = "disease-default"
+
+    I0 = np.maximum(rng.poisson(max(initial_infected, 1), n_runs), 1)
+    return {"beta": beta, "gamma": gamma, "I0": I0, "rt": rt_samples, "source": source}
+
+
+def _bands(values: np.ndarray, axis: int = -1) -> dict:
+    """Percentile bands of `values` along `axis`, keyed p5 / p25 / ..."""
+    pct = np.percentile(values, ENSEMBLE_PERCENTILES, axis=axis)
+    return {f"p{p}": np.round(pct[i]).astype(int).tolist() for i, p in enumerate(ENSEMBLE_PERCENTILES)}
+
+
+def run_sir_ensemble(
+    disease: str,
+    initial_infected: int,
+    population: Optional[int] = None,
+    days: int = 90,
+    n_runs: int = 1000,
+    rt: Optional[float] = None,
+    rt_posterior: Optional[Tuple[float, float]] = None,
+    intervention_day: Optional[int] = None,
+    intervention_effectiveness: float = 0.0,
+    schedule: Optional[List[Tuple[int, Optional[int], float]]] = None,
+    seed: Optional[int] = None,
+):
+    """
+    Run an SIR ensemble and summarize it as percentile bands.
+
+    Args:
+        disease: Disease name to look up default parameters
+        initial_infected: Current number of infected individuals
+        population: Population size (disease default when None)
+        days: Number of days to simulate
+        n_runs: Ensemble size (capped at MAX_ENSEMBLE_RUNS)
+        rt, rt_posterior: Observed Rt, see `sample_parameters`
+        intervention_day: Day on which intervention is deployed (None = no intervention)
+        intervention_effectiveness: Reduction in beta (0.0-1.0) when intervention is active
+        schedule: Intervention events (start_day, end_day, beta_multiplier), see `run_sir_model`
+        seed: Random seed for reproducible bands
+
+    Returns:
+        Dictionary with daily percentile bands for infected / recovered and
+        percentile summaries of R0, peak day, peak infections and final size
+    """
+    params = DEFAULT_SIR_PARAMS.get(disease, DEFAULT_SIR_PARAMS["Default"])
+    N = population if population is not None else params["N"]
+    n_runs = int(min(max(n_runs, 1), MAX_ENSEMBLE_RUNS))
+    rng = np.random.default_rng(seed)
+
+    draws = sample_parameters(disease, n_runs, initial_infected, rt=rt, rt_posterior=rt_posterior, rng=rng)
+    I0 = np.minimum(draws["I0"], N - 1).astype(float)
+
+    events = list(schedule or [])
+    if intervention_day is not None and 0 < intervention_day < days:
+        events.append((intervention_day, None, 1 - intervention_effectiveness))
+    events = normalize_schedule(events, days)
+    multiplier = beta_schedule(days, events) if events else None
+
+    traj = integrate_sir_batch(N - I0, I0, np.zeros(n_runs), N, draws["beta"], draws["gamma"], days, beta_multiplier=multiplier)
+    infected, recovered = traj[:, :, 1], traj[:, :, 2]
+
+    R0 = draws["beta"] / draws["gamma"]
+    return {
+        "days": list(range(days + 1)),
+        "runs": n_runs,
+        "percentiles": list(ENSEMBLE_PERCENTILES),
+        "infected": _bands(infected, axis=1),
+        "recovered": _bands(recovered, axis=1),
+        "peak_day": _bands(np.argmax(infected, axis=0)),
+        "peak_infections": _bands(infected.max(axis=0)),
+        "total_infected_end": _bands(recovered[-1]),
+        "R0": {f"p{p}": round(float(v), 2) for p, v in zip(ENSEMBLE_PERCENTILES, np.percentile(R0, ENSEMBLE_PERCENTILES))},
+        "parameters": {
+            "beta_mean": round(float(draws["beta"].mean()), 4),
+            "gamma_mean": round(float(draws["gamma"].mean()), 4),
+            "N": N,
+            "disease": disease,
+            "rt_source": draws["source"],
+            "seed": seed,
+            "description": params.get("description", ""),
+        },
+    }
@@ -0,0 +1,144 @@
+"""
+SIR calibration against observed daily incidence.
+A coarse grid of (beta, gamma, I0) candidates is scored in one batched integration,
+then the best candidate is refined by least squares whose Jacobian comes from a
+single batched integration of the forward-difference perturbations.
+"""
+
+import numpy as np
+
+from ml.sir_model import DEFAULT_SIR_PARAMS, integrate_sir_batch
+
+
+# Trailing days of incidence the model is fitted to
+FIT_WINDOW_DAYS = 60
+# Fewer reported cases than this in the window gives no identifiable curve
+MIN_FIT_CASES = 20
+MIN_FIT_DAYS = 14
+# Parameter bounds (per day / people); gamma stays within a factor band of the
+# disease's default recovery rate so flat endemic series cannot fit as slow epidemics
+BETA_BOUNDS = (1e-3, 3.0)
+GAMMA_BAND = (0.5, 2.0)
+# A fit is only reused by the simulators when it converged, explains at least
+# this share of the variance and has no parameter pinned to a bound
+MIN_REUSE_R_SQUARED = 0.5
+# Relative distance (in log-parameter space) that counts as sitting on a bound
+BOUND_TOLERANCE = 1e-3
+# Relative step for the finite-difference Jacobian (in log-parameter space)
+JACOBIAN_STEP = 1e-4
+
+
+def model_incidence(log_params: np.ndarray, population: float, days: int) -> np.ndarray:
+    """
+    New infections per day for many parameter sets.
+
+    Args:
+        log_params: (n_runs, 3) log beta, log gamma, log I0
+        population: Population size
+        days: Number of days of incidence
+
+    Returns:
+        (n_runs, days) daily new infections (drop in S)
+    """
+    beta, gamma, I0 = np.exp(log_params).T
+    I0 = np.minimum(I0, population - 1)
+    traj = integrate_sir_batch(population - I0, I0, np.zeros(len(I0)), population, beta, gamma, days)
+    return -np.diff(traj[:, :, 0], axis=0).T
+
+
+def _residuals(incidence: np.ndarray, observed: np.ndarray) -> np.ndarray:
+    """Square-root (variance-stabilized) residuals, so large days do not swamp the fit."""
+    return np.sqrt(np.maximum(incidence, 0)) - np.sqrt(observed)
+
+
+def fit_sir(observed, population: float, disease: str = None) -> dict:
+    """
+    Calibrate beta, gamma and I0 to an observed daily incidence curve.
+
+    Args:
+        observed: Daily new cases on a complete calendar, oldest first
+        population: Population size
+        disease: Disease name, for the starting gamma
+
+    Returns:
+        Dictionary with fitted parameters, fit quality and the fitted curve;
+        {"fitted": False, "message": ...} when the data cannot support a fit
+    """
+    from scipy.optimize import least_squares
+
+    observed = np.asarray(observed, dtype=float)[-FIT_WINDOW_DAYS:]
+    days = len(observed)
+    if days < MIN_FIT_DAYS or observed.sum() < MIN_FIT_CASES:
+        return {"fitted": False, "message": f"Need at least {MIN_FIT_DAYS} days and {MIN_FIT_CASES} cases to fit."}
+
+    defaults = DEFAULT_SIR_PARAMS.get(disease, DEFAULT_SIR_PARAMS["Default"])
+    gamma0 = defaults["gamma"]
+    lower = np.log([BETA_BOUNDS[0], gamma0 * GAMMA_BAND[0], 1.0])
+    upper = np.log([BETA_BOUNDS[1], gamma0 * GAMMA_BAND[1], max(2.0, population / 10)])
+
+    # Coarse grid around the disease defaults, all candidates in one integration
+    grid = np.array(np.meshgrid(
+        np.log(gamma0 * np.geomspace(0.1, 10, 12)),  # beta as R0 x gamma, R0 in [0.1, 10]
+        np.log(gamma0 * np.array([0.5, 1.0, 2.0])),
+        np.log(np.geomspace(1, max(2.0, observed[:7].sum() * 3), 5)),
+        indexing="ij",
+    )).reshape(3, -1).T
+    grid[:, 0] += grid[:, 1] - np.log(gamma0)  # keep R0 fixed as gamma varies
+    grid = np.clip(grid, lower, upper)
+    sse = (_residuals(model_incidence(grid, population, days), observed) ** 2).sum(axis=1)
+    start = grid[np.nanargmin(sse)]
+
+    def residuals(theta):
+        return _residuals(model_incidence(theta[None, :], population, days)[0], observed)
+
+    def jacobian(theta):
+        # Base point plus one perturbation per parameter, integrated together
+        batch = np.vstack([theta, theta + np.eye(3) * JACOBIAN_STEP])
+        inc = _residuals(model_incidence(batch, population, days), observed)
+        return ((inc[1:] - inc[0]) / JACOBIAN_STEP).T
+
+    result = least_squares(residuals, start, jac=jacobian, bounds=(lower, upper), method="trf")
+    beta, gamma, I0 = np.exp(result.x)
+    fitted = model_incidence(result.x[None, :], population, days)[0]
+
+    ss_res = float(((fitted - observed) ** 2).sum())
+    ss_tot = float(((observed - observed.mean()) ** 2).sum())
+    on_bound = (result.x - lower < BOUND_TOLERANCE) | (upper - result.x < BOUND_TOLERANCE)
+    # beta and gamma stay unrounded so reused fits reproduce the reported R0
+    return {
+        "fitted": True,
+        "beta": float(beta),
+        "gamma": float(gamma),
+        "I0": int(round(I0)),
+        "R0": round(float(beta / gamma), 2),
+        "N": int(population),
+        "window_days": days,
+        "rmse": round(float(np.sqrt(ss_res / days)), 3),
+        "r_squared": round(1 - ss_res / ss_tot, 3) if ss_tot > 0 else None,
+        "observed": observed.astype(int).tolist(),
+        "fitted_incidence": np.round(fitted, 2).tolist(),
+        "converged": bool(result.success),
+        "at_bounds": [name for name, hit in zip(("beta", "gamma", "I0"), on_bound) if hit],
+        "evaluations": int(result.nfev),
+    }
+
+
+def fit_rejection(fit: dict):
+    """
+    Why a fit should not drive the simulators, or None when it can be reused.
+
+    Args:
+        fit: A fit_sir result
+
+    Returns:
+        Short reason string, or None for a usable fit
+    """
+    if not fit.get("fitted"):
+        return fit.get("message", "not fitted")
+    if not fit.get("converged"):
+        return "least squares did not converge"
+    if fit.get("r_squared") is None or fit["r_squared"] < MIN_REUSE_R_SQUARED:
+        return f"r_squared {fit.get('r_squared')} below {MIN_REUSE_R_SQUARED}"
+    if fit.get("at_bounds"):
+        return f"{', '.join(fit['at_bounds'])} at parameter bound"
+    return None
@@ -1,11 +1,12 @@
 """
 SIR (Susceptible-Infected-Recovered) epidemiological model.
-Uses scipy ODE solver for differential equations.
+Uses scipy ODE solver for differential equations; `integrate_sir_batch` integrates
+many parameter sets at once with a vectorized fixed-step RK4.
 """
 
 import numpy as np
 from scipy.integrate import odeint
-from typing import Optional
+from typing import Optional, List, Tuple
 
 
 # Default SIR parameters per disease (beta=transmission, gamma=recovery rate)
@@ -22,6 +23,25 @@ DEFAULT_SIR_PARAMS = {
     "Default":        {"beta": 0.25, "gamma": 1/14, "N": 10000, "description": "Generic disease parameters"},
 }
 
+# Approximate serial intervals per disease (mean, sd in days) for renewal-equation Rt.
+# Vector-borne and water-borne diseases use the full transmission-cycle length as a proxy.
+SERIAL_INTERVALS = {
+    "Dengue":          {"mean": 16.0, "sd": 5.0},
+    "Malaria":         {"mean": 40.0, "sd": 12.0},
+    "Leptospirosis":   {"mean": 10.0, "sd": 4.0},
+    "Typhoid":         {"mean": 14.0, "sd": 6.0},
+    "Tuberculosis":    {"mean": 180.0, "sd": 90.0},
+    "COVID-19":        {"mean": 5.2,  "sd": 2.8},
+    "Influenza":       {"mean": 2.6,  "sd": 1.5},
+    "Gastroenteritis": {"mean": 3.5,  "sd": 2.0},
+    "Chikungunya":     {"mean": 14.0, "sd": 5.0},
+    "Default":         {"mean": 7.0,  "sd": 3.5},
+}
+
+
+# RK4 sub-steps per simulated day for the batched integrator
+BATCH_STEPS_PER_DAY = 4
+
 
 def sir_derivatives(y, t, N, beta, gamma):
     """SIR model differential equations."""
@@ -32,6 +52,44 @@ def sir_derivatives(y, t, N, beta, gamma):
     return dSdt, dIdt, dRdt
 
 
+def normalize_schedule(schedule, days: int) -> List[Tuple[int, int, float]]:
+    """
+    Validate an intervention schedule and clip it to the simulated horizon.
+
+    Args:
+        schedule: Iterable of (start_day, end_day, beta_multiplier); end_day None = until the end
+        days: Number of simulated days
+
+    Returns:
+        List of (start_day, end_day, beta_multiplier) with 0 <= start < end <= days, sorted by start
+    """
+    events = []
+    for start, end, multiplier in schedule or []:
+        end = days if end is None else end
+        if start < 0 or end <= start:
+            raise ValueError(f"Invalid intervention window [{start}, {end}).")
+        if multiplier < 0:
+            raise ValueError(f"beta_multiplier must be non-negative, got {multiplier}.")
+        start, end = int(start), int(min(end, days))
+        if start < days:
+            events.append((start, end, float(multiplier)))
+    return sorted(events)
+
+
+def beta_schedule(days: int, schedule) -> np.ndarray:
+    """Per-day beta multiplier; overlapping events multiply."""
+    multiplier = np.ones(max(days, 1))
+    for start, end, factor in schedule:
+        multiplier[start:end] *= factor
+    return multiplier
+
+
+def sir_derivatives_scheduled(y, t, N, beta, gamma, multiplier):
+    """SIR equations with a piecewise-constant beta(t) = beta * multiplier[floor(t)]."""
+    day = min(int(t), len(multiplier) - 1)
+    return sir_derivatives(y, t, N, beta * multiplier[day], gamma)
+
+
 def run_sir_model(
     disease: str,
     initial_infected: int,
@@ -41,6 +99,12 @@ def run_sir_model(
     custom_beta: Optional[float] = None,
     custom_gamma: Optional[float] = None,
     population: Optional[int] = None,
+    schedule: Optional[List[Tuple[int, Optional[int], float]]] = None,
+    metrics_only: bool = False,
+    age_structured: bool = False,
+    vector_borne: bool = False,
+    wards: Optional[List[Tuple[str, int, float]]] = None,
+    start_date: Optional[str] = None,
 ):
     """
     Run the SIR model for a given disease.
@@ -54,9 +118,20 @@ def run_sir_model(
         custom_beta: Override default transmission rate
         custom_gamma: Override default recovery rate
         population: Override default population size
+        schedule: Intervention events (start_day, end_day, beta_multiplier), applied on top of
+            the single intervention above; overlapping events multiply
+        metrics_only: Skip the ODE solve and the S, I, R series; peak and final-size
+            metrics come from the closed-form solution (`sir_metrics`)
+        age_structured: Split the population into age bands with a contact matrix
+            (see ml.sir_age); adds per-band results
+        vector_borne: Use the host-vector SIR-SEI model with monsoon-seasonal vector
+            capacity (see ml.vector_model)
+        wards: (name, population, initial_infected) rows for the host-vector model,
+            integrated in one batch; replaces initial_infected and population
+        start_date: Calendar date of day 0 for the host-vector monsoon season
         
     Returns:
-        Dictionary with S, I, R time series and R0 values
+        Dictionary with S, I, R time series (unless metrics_only) and R0 values
     """
     params = DEFAULT_SIR_PARAMS.get(disease, DEFAULT_SIR_PARAMS["Default"])
     
@@ -73,30 +148,60 @@ def run_sir_model(
     
     R0 = beta / gamma  # Basic reproduction number
     
+    events = list(schedule or [])
     if intervention_day is not None and 0 < intervention_day < days:
-        # Phase 1: before intervention
-        t1 = np.linspace(0, intervention_day, intervention_day + 1)
-        ret1 = odeint(sir_derivatives, y0, t1, args=(N, beta, gamma))
-        S1, I1, R1 = ret1.T
-        
-        # Phase 2: after intervention (reduced beta)
-        beta_reduced = beta * (1 - intervention_effectiveness)
-        y0_phase2 = ret1[-1]
-        remaining_days = days - intervention_day
-        t2 = np.linspace(0, remaining_days, remaining_days + 1)
-        ret2 = odeint(sir_derivatives, y0_phase2, t2, args=(N, beta_reduced, gamma))
-        S2, I2, R2 = ret2.T
-        
-        # Combine phases
-        S = np.concatenate([S1, S2[1:]])
-        I = np.concatenate([I1, I2[1:]])
-        R = np.concatenate([R1, R2[1:]])
-        
-        R0_post = beta_reduced / gamma
+        events.append((intervention_day, None, 1 - intervention_effectiveness))
+    events = normalize_schedule(events, days)
+
+    if vector_borne:
+        from ml.vector_model import run_vector_sir
+        return run_vector_sir(
+            disease, initial_infected, days, beta, gamma, N, schedule=events, metrics_only=metrics_only,
+            wards=wards, start_date=start_date,
+        )
+
+    if age_structured:
+        from ml.sir_age import run_age_structured_sir
+        return run_age_structured_sir(
+            disease, initial_infected, days, beta, gamma, N, schedule=events, metrics_only=metrics_only,
+        )
+
+    schedule_summary = [
+        {"start_day": start, "end_day": end, "beta_multiplier": round(factor, 4), "R0_effective": round(beta * factor / gamma, 2)}
+        for start, end, factor in events
+    ]
+    parameters = {
+        "beta": round(beta, 4),
+        "gamma": round(gamma, 4),
+        "N": N,
+        "disease": disease,
+        "description": params.get("description", ""),
+    }
+
+    if metrics_only:
+        metrics = sir_metrics(beta, gamma, N, I0, days, events)
+        R0_post = beta * float(beta_schedule(days, events).min()) / gamma if events else R0
+        return {
+            "R0": round(R0, 2),
+            "R0_post_intervention": round(R0_post, 2),
+            "peak_day": int(metrics["peak_day"][0]),
+            "peak_infections": int(round(metrics["peak_infections"][0])),
+            "total_infected_end": int(round(metrics["total_infected_end"][0])),
+            "final_size": int(round(metrics["final_size"][0])),
+            "schedule": schedule_summary,
+            "parameters": parameters,
+        }
+
+    if events:
+        # One pass with beta(t); the solver is told where beta jumps so no step straddles a change
+        multiplier = beta_schedule(days, events)
+        change_days = sorted({d for start, end, _ in events for d in (start, end) if 0 < d < days})
+        ret = odeint(sir_derivatives_scheduled, y0, t, args=(N, beta, gamma, multiplier), tcrit=change_days or None)
+        R0_post = beta * float(multiplier.min()) / gamma
     else:
         ret = odeint(sir_derivatives, y0, t, args=(N, beta, gamma))
-        S, I, R = ret.T
         R0_post = R0
+    S, I, R = ret.T
     
     # Peak infection
     peak_idx = int(np.argmax(I))
@@ -112,11 +217,210 @@ def run_sir_model(
         "peak_day": peak_idx,
         "peak_infections": peak_infections,
         "total_infected_end": int(round(R[-1])),
-        "parameters": {
-            "beta": round(beta, 4),
-            "gamma": round(gamma, 4),
-            "N": N,
-            "disease": disease,
-            "description": params.get("description", ""),
-        }
+        "schedule": schedule_summary,
+        "parameters": parameters,
+    }
+
+
+def _sir_flux(S, I, beta_over_n, gamma):
+    """Infection and recovery flows (new infections, new recoveries) per unit time."""
+    return beta_over_n * S * I, gamma * I
+
+
+def integrate_sir_batch(
+    S0: np.ndarray,
+    I0: np.ndarray,
+    R0: np.ndarray,
+    N,
+    beta,
+    gamma,
+    days: int,
+    beta_multiplier: Optional[np.ndarray] = None,
+    steps_per_day: int = BATCH_STEPS_PER_DAY,
+) -> np.ndarray:
+    """
+    Integrate many SIR trajectories at once with fixed-step RK4.
+
+    Args:
+        S0, I0, R0: (n_runs,) initial compartments
+        N, beta, gamma: Scalars or (n_runs,) arrays
+        days: Number of days to simulate
+        beta_multiplier: Optional per-day scaling of beta, shape (days,) or (days, n_runs);
+            changes land on day boundaries so no step straddles two regimes
+        steps_per_day: RK4 sub-steps per day
+
+    Returns:
+        (days + 1, n_runs, 3) array of daily S, I, R
+    """
+    S = np.asarray(S0, dtype=float).copy()
+    I = np.asarray(I0, dtype=float).copy()
+    R = np.asarray(R0, dtype=float).copy()
+    N = np.asarray(N, dtype=float)
+    beta = np.asarray(beta, dtype=float)
+    gamma = np.asarray(gamma, dtype=float)
+    h = 1.0 / steps_per_day
+
+    out = np.empty((days + 1, S.shape[0], 3))
+    out[0, :, 0], out[0, :, 1], out[0, :, 2] = S, I, R
+
+    for day in range(days):
+        b = beta if beta_multiplier is None else beta * beta_multiplier[day]
+        b_n = b / N
+        for _ in range(steps_per_day):
+            # Only S and I drive the dynamics; R accumulates the recovery flux
+            k1 = _sir_flux(S, I, b_n, gamma)
+            k2 = _sir_flux(S - 0.5 * h * k1[0], I + 0.5 * h * (k1[0] - k1[1]), b_n, gamma)
+            k3 = _sir_flux(S - 0.5 * h * k2[0], I + 0.5 * h * (k2[0] - k2[1]), b_n, gamma)
+            k4 = _sir_flux(S - h * k3[0], I + h * (k3[0] - k3[1]), b_n, gamma)
+
+            infections = h / 6.0 * (k1[0] + 2 * k2[0] + 2 * k3[0] + k4[0])
+            recoveries = h / 6.0 * (k1[1] + 2 * k2[1] + 2 * k3[1] + k4[1])
+            S = S - infections
+            I = I + infections - recoveries
+            R = R + recoveries
+        out[day + 1, :, 0], out[day + 1, :, 1], out[day + 1, :, 2] = S, I, R
+
+    return out
+
+
+# Quadrature nodes per schedule segment for the metrics-only solver
+METRICS_GRID_POINTS = 400
+# Closest relative approach to either end of a segment resolved by the time integral
+METRICS_MIN_GAP = 1e-8
+
+
+def _segments(days: int, schedule) -> List[Tuple[int, int, float]]:
+    """Collapse a schedule into maximal constant-multiplier (start, end, multiplier) runs."""
+    if days <= 0:
+        return []
+    multiplier = beta_schedule(days, schedule)
+    change = np.flatnonzero(np.diff(multiplier)) + 1
+    bounds = np.concatenate([[0], change, [days]])
+    return [(int(a), int(b), float(multiplier[a])) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def _grid_offset(position):
+    """
+    Relative offset (0..1 of the segment span) at a fractional node index of the
+    metrics grid. Nodes are uniform in log-distance to the nearer end, so exponential
+    growth / decay between nodes is followed exactly.
+    """
+    half = METRICS_GRID_POINTS // 2
+    log_ratio = np.log(0.5 / METRICS_MIN_GAP) / (half - 1)
+    lower = METRICS_MIN_GAP * np.exp((np.clip(position, 1, half) - 1) * log_ratio)
+    upper = 1.0 - 0.5 * np.exp(-(np.clip(position, half, 2 * half - 1) - half) * log_ratio)
+    return np.where(position < 1, position * METRICS_MIN_GAP, np.where(position <= half, lower, upper))
+
+
+def _interp_rows(x, xp, fp, beyond):
+    """Row-wise np.interp for monotone increasing rows of xp; `beyond` past the last node."""
+    n, g = xp.shape
+    idx = np.clip((xp < x[:, None]).sum(axis=1), 1, g - 1)
+    rows = np.arange(n)
+    x0, x1 = xp[rows, idx - 1], xp[rows, idx]
+    f0, f1 = fp[rows, idx - 1], fp[rows, idx]
+    w = np.clip(np.divide(x - x0, x1 - x0, out=np.zeros(n), where=x1 > x0), 0.0, 1.0)
+    return np.where(x > xp[:, -1], beyond, f0 + w * (f1 - f0))
+
+
+class _SegmentSolution:
+    """
+    Exact SIR trajectory of one constant-beta segment, parameterised by R.
+    On a segment S(R) = S_a exp(-q (R - R_a)) with q = beta / (gamma N), so the only
+    unknown is the time to reach R: t(R) = integral of dR / (gamma I(R)), tabulated on an
+    R grid that is geometric toward both ends, where I is small.
+    """
+
+    def __init__(self, S_a, R_a, N, beta, gamma):
+        from scipy.special import lambertw
+
+        self.S_a, self.R_a, self.N = S_a, R_a, N
+        self.q = beta / (gamma * N)
+        q = np.maximum(self.q, 1e-300)
+
+        # Final size: N - R_inf = S_a exp(-q (R_inf - R_a))  =>  S_inf = -W0(z) / q
+        z = np.maximum(-q * S_a * np.exp(-q * (N - R_a)), -np.exp(-1.0))
+        S_inf = np.where(self.q > 0, -lambertw(z).real / q, S_a)
+        self.R_inf = N - S_inf
+        self.span = np.maximum(self.R_inf - R_a, 0.0)
+
+        # Geometric toward both ends, where I is small; each half is integrated in the log of
+        # the distance w to its end (dR = w dlog w), which keeps the integrand smooth
+        half = METRICS_GRID_POINTS // 2
+        near = np.geomspace(METRICS_MIN_GAP, 0.5, half)
+        offsets = np.concatenate([[0.0], near, 1.0 - near[::-1][1:]])
+        distance = np.concatenate([[0.0], near, near[::-1][1:]])
+        log_step = np.abs(np.diff(np.log(np.maximum(distance, METRICS_MIN_GAP))))
+
+        self.R_grid = R_a[:, None] + self.span[:, None] * offsets[None, :]
+        S_grid = S_a[:, None] * np.exp(-self.q[:, None] * (self.R_grid - R_a[:, None]))
+        I_grid = N[:, None] - S_grid - self.R_grid
+        w = self.span[:, None] * distance[None, :]
+        integrand = np.divide(w, gamma[:, None] * I_grid, out=np.zeros_like(I_grid), where=I_grid > 0)
+        steps = 0.5 * (integrand[:, 1:] + integrand[:, :-1]) * log_step[None, :]
+        # First interval [R_a, R_a + gap]: 1 / I is flat there
+        steps[:, 0] = np.divide(w[:, 1], gamma * I_grid[:, 0], out=np.zeros(len(S_a)), where=I_grid[:, 0] > 0)
+        self.t_grid = np.concatenate([np.zeros((len(S_a), 1)), np.cumsum(steps, axis=1)], axis=1)
+
+    def state_at(self, elapsed):
+        """(S, I, R) after `elapsed` days into the segment."""
+        nodes = np.broadcast_to(np.arange(METRICS_GRID_POINTS, dtype=float), self.t_grid.shape)
+        position = _interp_rows(elapsed, self.t_grid, nodes, np.inf)
+        R = np.where(np.isinf(position), self.R_inf, self.R_a + self.span * _grid_offset(np.minimum(position, METRICS_GRID_POINTS - 1)))
+        R = np.where(self.span > 0, R, self.R_a)
+        S = self.S_a * np.exp(-self.q * (R - self.R_a))
+        return S, np.maximum(self.N - S - R, 0.0), R
+
+    def peak_time(self):
+        """Days into the segment of the interior prevalence peak (S = 1/q), NaN if I only falls."""
+        growing = (self.q * self.S_a > 1) & (self.span > 0)
+        R_peak = self.R_a + np.log(np.where(growing, self.q * self.S_a, 1.0)) / np.maximum(self.q, 1e-300)
+        t_peak = _interp_rows(R_peak, self.R_grid, self.t_grid, np.inf)
+        return np.where(growing, t_peak, np.nan)
+
+
+def sir_metrics(beta, gamma, N, initial_infected, days: int = 90, schedule=None) -> dict:
+    """
+    Peak day, peak infections and recovered-by-horizon without integrating a time series.
+    Vectorized over parameter sets; a schedule is handled segment by segment.
+
+    Args:
+        beta, gamma, N, initial_infected: Scalars or (n,) arrays
+        days: Horizon in days
+        schedule: Intervention events (start_day, end_day, beta_multiplier)
+
+    Returns:
+        Dict of (n,) arrays: peak_day, peak_infections, total_infected_end (recovered at
+        the horizon, as in run_sir_model) and final_size (Lambert-W limit as t -> infinity
+        under the last segment's beta)
+    """
+    beta, gamma, N, I0 = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in (beta, gamma, N, initial_infected)))
+    I0 = np.minimum(I0, N - 1)
+    S, I, R = N - I0, I0.copy(), np.zeros_like(N)
+
+    # Candidate (day, infected) pairs: segment boundaries and the integer days around interior peaks
+    cand_day, cand_I = [np.zeros_like(N)], [I.copy()]
+    final = R
+    for start, end, factor in _segments(days, normalize_schedule(schedule or [], days)):
+        segment = _SegmentSolution(S, R, N, beta * factor, gamma)
+        t_peak = segment.peak_time()
+        inside = t_peak < end - start
+        for rounding in (np.floor, np.ceil):
+            elapsed = np.where(inside, rounding(np.nan_to_num(t_peak)), 0.0)
+            cand_day.append(np.where(inside, start + elapsed, -1.0))
+            cand_I.append(np.where(inside, segment.state_at(elapsed)[1], -np.inf))
+        S, I, R = segment.state_at(np.full_like(N, end - start))
+        cand_day.append(np.full_like(N, end))
+        cand_I.append(I)
+        final = segment.R_inf
+
+    cand_day, cand_I = np.array(cand_day), np.array(cand_I)
+    # Highest prevalence, earliest day on ties (matches np.argmax over the daily series)
+    best = np.lexsort((cand_day, -np.round(cand_I, 6)), axis=0)[0]
+    cols = np.arange(len(N))
+    return {
+        "peak_day": cand_day[best, cols].astype(int),
+        "peak_infections": cand_I[best, cols],
+        "total_infected_end": R,
+        "final_size": final,
     }
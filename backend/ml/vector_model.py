@@ -0,0 +1,189 @@
+"""
+Host-vector (SIR-SEI) transmission model for mosquito-borne diseases.
+Hosts follow SIR; mosquitoes follow SEI with births toward a carrying capacity that
+rises through the monsoon months. Every ward is a row of one (6, n_wards) state
+integrated together, so a whole city is a single batched solve.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+
+from ml.sir_model import DEFAULT_SIR_PARAMS, beta_schedule, normalize_schedule
+from ml.forecast import MONSOON_MONTHS
+
+
+# Diseases the model applies to: those DEFAULT_SIR_PARAMS marks as vector-borne
+VECTOR_BORNE_DISEASES = [d for d, p in DEFAULT_SIR_PARAMS.items() if p["description"].startswith("Vector-borne")]
+
+# Per-day entomological parameters: biting rate, transmission probability per bite
+# (vector->host, host->vector), extrinsic incubation period and adult vector lifespan
+VECTOR_PARAMS = {
+    "Dengue":      {"biting_rate": 0.5, "p_vector_to_host": 0.5, "p_host_to_vector": 0.5, "eip_days": 10.0, "lifespan_days": 14.0},
+    "Chikungunya": {"biting_rate": 0.5, "p_vector_to_host": 0.5, "p_host_to_vector": 0.6, "eip_days": 4.0,  "lifespan_days": 14.0},
+    "Malaria":     {"biting_rate": 0.3, "p_vector_to_host": 0.3, "p_host_to_vector": 0.5, "eip_days": 12.0, "lifespan_days": 12.0},
+}
+
+# Vector carrying capacity during monsoon months relative to the dry season
+MONSOON_CAPACITY_FACTOR = 2.5
+STEPS_PER_DAY = 4
+
+
+def is_vector_borne(disease: str) -> bool:
+    return disease in VECTOR_BORNE_DISEASES and disease in VECTOR_PARAMS
+
+
+def seasonal_capacity(start_date, days: int) -> np.ndarray:
+    """Relative carrying capacity for each simulated day (1 dry season, MONSOON_CAPACITY_FACTOR in monsoon)."""
+    months = pd.date_range(pd.Timestamp(start_date).normalize(), periods=days + 1, freq="D").month
+    return np.where(np.isin(months, MONSOON_MONTHS), MONSOON_CAPACITY_FACTOR, 1.0)
+
+
+def run_vector_sir(
+    disease: str,
+    initial_infected: float,
+    days: int = 90,
+    custom_beta: Optional[float] = None,
+    custom_gamma: Optional[float] = None,
+    population: Optional[int] = None,
+    schedule: Optional[List[Tuple[int, Optional[int], float]]] = None,
+    metrics_only: bool = False,
+    wards: Optional[List[Tuple[str, int, float]]] = None,
+    start_date: Optional[str] = None,
+):
+    """
+    Run the host-vector model for one population or a batch of wards.
+
+    Args:
+        disease: Vector-borne disease name
+        initial_infected: Infected hosts (ignored when `wards` is given)
+        days: Number of days to simulate
+        custom_beta, custom_gamma: Host-side rates as in run_sir_model; beta / gamma is the
+            R0 the model reproduces on day 0, by calibrating vector density
+        population: Host population (ignored when `wards` is given)
+        schedule: Intervention events (start_day, end_day, multiplier on the biting rate)
+        metrics_only: Drop the S, I, R series from the result
+        wards: (name, population, initial_infected) per ward, integrated together
+        start_date: Calendar date of day 0 for the monsoon season (today by default)
+
+    Returns:
+        Dictionary in the run_sir_model layout (totals over all rows), plus vector
+        indicators and a per-ward summary when `wards` is given
+    """
+    params = DEFAULT_SIR_PARAMS.get(disease, DEFAULT_SIR_PARAMS["Default"])
+    vp = VECTOR_PARAMS[disease]
+    beta = custom_beta if custom_beta is not None else params["beta"]
+    gamma = custom_gamma if custom_gamma is not None else params["gamma"]
+    R0 = beta / gamma
+
+    if wards:
+        names = [w[0] for w in wards]
+        N_h = np.array([w[1] for w in wards], dtype=float)
+        I0 = np.array([w[2] for w in wards], dtype=float)
+    else:
+        N_h = np.array([population if population is not None else params["N"]], dtype=float)
+        I0 = np.array([initial_infected], dtype=float)
+    I0 = np.minimum(I0, N_h - 1)
+
+    a = vp["biting_rate"]
+    b_h, b_v = vp["p_vector_to_host"], vp["p_host_to_vector"]
+    sigma, mu = 1.0 / vp["eip_days"], 1.0 / vp["lifespan_days"]
+
+    # Ross-Macdonald: R0^2 = a^2 b_h b_v m sigma / ((sigma + mu) gamma mu) with m = vectors per host
+    vectors_per_host = R0 ** 2 * gamma * mu * (sigma + mu) / (a ** 2 * b_h * b_v * sigma)
+    capacity = seasonal_capacity(start_date or pd.Timestamp.today(), days)
+    K0 = vectors_per_host * N_h / capacity[0]  # dry-season capacity per ward
+
+    events = normalize_schedule(schedule, days)
+    multiplier = beta_schedule(days, events)
+
+    # Vectors start at capacity, infected compartments at quasi-equilibrium with I0
+    S_v = K0 * capacity[0]
+    force_v = a * b_v * I0 / N_h
+    E_v = force_v * S_v / (sigma + mu)
+    I_v = sigma * E_v / mu
+    # Linearized around all-susceptible vectors, so a large I0 / N overshoots the vector
+    # population; scale both down so the susceptible compartment is never negative
+    infected_v = E_v + I_v
+    scale = np.where(infected_v > S_v, S_v / np.where(infected_v > 0, infected_v, 1.0), 1.0)
+    E_v, I_v = E_v * scale, I_v * scale
+    y =np.array([N_h - I0, I0, np.zeros_like(N_h), S_v - E_v - I_v, E_v, I_v])
+
+    def rhs(y, bite, K):
+        S_h, I_h, R_h, S_v, E_v, I_v = y
+        infect_h = bite * b_h * I_v / N_h * S_h
+        infect_v = bite * b_v * I_h / N_h * S_v
+        return np.array([
+            -infect_h,
+            infect_h - gamma * I_h,
+            gamma * I_h,
+            mu * K - infect_v - mu * S_v,
+            infect_v - (sigma + mu) * E_v,
+            sigma * E_v - mu * I_v,
+        ])
+
+    h = 1.0 / STEPS_PER_DAY
+    hosts = np.empty((days + 1, 3, len(N_h)))
+    infectious_vectors = np.empty((days + 1, len(N_h)))
+    hosts[0], infectious_vectors[0] = y[:3], y[5]
+    for day in range(days):
+        bite, K = a * multiplier[day], K0 * capacity[day]
+        for _ in range(STEPS_PER_DAY):
+            k1 = rhs(y, bite, K)
+            k2 = rhs(y + 0.5 * h * k1, bite, K)
+            k3 = rhs(y + 0.5 * h * k2, bite, K)
+            k4 = rhs(y + h * k3, bite, K)
+            y = y + h / 6.0 * (k1 + 2 * k2 + 2 * k3 + k4)
+        hosts[day + 1], infectious_vectors[day + 1] = y[:3], y[5]
+
+    S, I, R = hosts.sum(axis=2).transpose(1, 0)
+    peak_idx = int(np.argmax(I))
+    result = {
+        "R0": round(R0, 2),
+        "R0_post_intervention": round(R0 * float(multiplier.min()), 2) if events else round(R0, 2),
+        "peak_day": peak_idx,
+        "peak_infections": int(round(I[peak_idx])),
+        "total_infected_end": int(round(R[-1])),
+        "schedule": [
+            {"start_day": start, "end_day": end, "beta_multiplier": round(factor, 4), "R0_effective": round(R0 * factor, 2)}
+            for start, end, factor in events
+        ],
+        "vector": {
+            "vectors_per_host": round(float(vectors_per_host), 3),
+            "monsoon_days": int((capacity[1:] > 1).sum()),
+            # R0 scales with the square root of vector density
+            "R0_seasonal_max": round(R0 * float(np.sqrt(capacity.max() / capacity[0])), 2),
+        },
+        "parameters": {
+            "beta": round(beta, 4),
+            "gamma": round(gamma, 4),
+            "N": int(N_h.sum()),
+            "disease": disease,
+            "model": "host-vector",
+            "description": params.get("description", ""),
+        },
+    }
+    if not metrics_only:
+        result.update({
+            "days": list(range(days + 1)),
+            "susceptible": [int(round(x)) for x in S],
+            "infected": [int(round(x)) for x in I],
+            "recovered": [int(round(x)) for x in R],
+        })
+        result["vector"]["capacity_factor"] = (capacity / capacity[0]).round(2).tolist()
+        result["vector"]["infectious_vectors"] = [int(round(x)) for x in infectious_vectors.sum(axis=1)]
+
+    if wards:
+        ward_peaks = np.argmax(hosts[:, 1, :], axis=0)
+        result["wards"] = [
+            {
+                "ward": name,
+                "population": int(N_h[i]),
+                "initial_infected": int(round(I0[i])),
+                "peak_day": int(ward_peaks[i]),
+                "peak_infections": int(round(hosts[ward_peaks[i], 1, i])),
+                "total_infected_end": int(round(hosts[-1, 2, i])),
+            }
+            for i, name in enumerate(names)
+        ]
+    return result
@@ -0,0 +1,242 @@
+"""
+Background precompute of analytics results (opt-in: PRECOMPUTE_ENABLED=1).
+An APScheduler job periodically recomputes registered endpoints for every
+configured parameter combination (tracked disease x city / ward) and keeps the
+answers in a result store, each tagged with the data watermark it was computed
+from. Endpoints serve a stored answer, with its freshness timestamp, only while
+the watermark of the data is unchanged and the answer is younger than
+PRECOMPUTE_MAX_AGE_MINUTES; otherwise, and for combinations the store does not
+hold, they compute live.
+
+Only one process schedules runs: the first worker to take PRECOMPUTE_LOCK_PATH.
+The store is snapshotted to disk after every run, and the other workers (and a
+restarted API) serve from that snapshot, reloading it when it changes.
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, every process schedules
+    fcntl = None
+
+
+PRECOMPUTE_ENABLED = os.getenv("PRECOMPUTE_ENABLED", "0") == "1"
+PRECOMPUTE_INTERVAL_MINUTES = float(os.getenv("PRECOMPUTE_INTERVAL_MINUTES", "30"))
+# Stored answers older than this are ignored and recomputed on the request path
+PRECOMPUTE_MAX_AGE_MINUTES = float(os.getenv("PRECOMPUTE_MAX_AGE_MINUTES", str(PRECOMPUTE_INTERVAL_MINUTES * 3)))
+PRECOMPUTE_PATH = os.getenv("PRECOMPUTE_PATH", os.path.join(os.path.dirname(__file__), ".precompute", "results.json"))
+# Held by the one process that schedules runs
+PRECOMPUTE_LOCK_PATH = os.getenv("PRECOMPUTE_LOCK_PATH", PRECOMPUTE_PATH + ".lock")
+# How often a process checks the snapshot on disk for another process's newer run
+RELOAD_CHECK_SECONDS = 5
+
+
+def result_key(endpoint: str, params: dict) -> str:
+    return json.dumps([endpoint, sorted(params.items())], default=str)
+
+
+def watermark_key(watermark) -> str:
+    """Watermark as stored, so a tuple and its JSON round-trip compare equal."""
+    return json.dumps(watermark, default=str)
+
+
+def with_freshness(payload, source: str, computed_at: float):
+    """Copy of a dict payload with a `freshness` block; other payloads pass through."""
+    if not isinstance(payload, dict):
+        return payload
+    return {
+        **payload,
+        "freshness": {
+            "source": source,
+            "computed_at": datetime.fromtimestamp(computed_at, timezone.utc).isoformat(),
+            "age_seconds": round(max(0.0, time.time() - computed_at), 1),
+        },
+    }
+
+
+class ResultStore:
+    """Precomputed payloads keyed by (endpoint, parameters), with computation time and data watermark."""
+
+    def __init__(self, path: Optional[str] = PRECOMPUTE_PATH, max_age_minutes: float = PRECOMPUTE_MAX_AGE_MINUTES):
+        self.path = path
+        self.max_age = max_age_minutes * 60
+        self._entries: Dict[str, tuple] = {}  # key -> (computed_at epoch seconds, watermark key, payload)
+        self._lock = threading.Lock()
+        self._loaded_mtime = None
+        self._checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, endpoint: str, params: dict, watermark):
+        """Stored payload with freshness, or None when absent, too old or computed from other data."""
+        self._reload_if_changed()
+        with self._lock:
+            entry = self._entries.get(result_key(endpoint, params))
+            if entry is None or time.time() - entry[0] > self.max_age:
+                self.misses += 1
+                return None
+            if entry[1] != watermark_key(watermark):
+                self.stale += 1
+                return None
+            self.hits += 1
+        return with_freshness(entry[2], "precomputed", entry[0])
+
+    def put(self, endpoint: str, params: dict, watermark, payload, computed_at: Optional[float] = None):
+        with self._lock:
+            self._entries[result_key(endpoint, params)] = (computed_at or time.time(), watermark_key(watermark), payload)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "stale": self.stale}
+
+    def _reload_if_changed(self):
+        now = time.time()
+        if not self.path or now - self._checked_at < RELOAD_CHECK_SECONDS:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._loaded_mtime:
+            self.load()
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self._entries.update({key: tuple(entry) for key, entry in entries.items()})
+            self._loaded_mtime = mtime
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            entries = dict(self._entries)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f, default=str)
+            os.replace(tmp_path, self.path)
+            self._loaded_mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            print(f"Error persisting precomputed results: {e}")
+
+
+class Precomputer:
+    """Registered recompute jobs driven by an APScheduler interval trigger."""
+
+    def __init__(self, store: ResultStore, interval_minutes: float = PRECOMPUTE_INTERVAL_MINUTES, lock_path: Optional[str] = PRECOMPUTE_LOCK_PATH):
+        self.store = store
+        self.interval_minutes = interval_minutes
+        self.lock_path = lock_path
+        self._jobs: List[tuple] = []  # (endpoint, compute fn, params factory, watermark fn)
+        self._scheduler = None
+        self._lock_file = None
+        self.enabled = False
+        self.runs = 0
+        self.errors = 0
+        self.last_run_started = None
+        self.last_run_seconds = None
+
+    def register(self, endpoint: str, compute: Callable, combinations: Callable[[], List[dict]], watermark: Callable):
+        """
+        Recompute `compute(**params)` for every params dict from `combinations()` each run.
+        `watermark(**params)` is a cheap change marker for the data behind one result.
+        """
+        self._jobs.append((endpoint, compute, combinations, watermark))
+
+    def watermark(self, endpoint: str, params: dict):
+        for name, _, _, watermark in self._jobs:
+            if name == endpoint:
+                return watermark(**params)
+        raise KeyError(endpoint)
+
+    async def run_once(self):
+        """One sequential pass over every job and combination, so live traffic keeps priority."""
+        started = time.time()
+        self.last_run_started = datetime.fromtimestamp(started, timezone.utc).isoformat()
+        for endpoint, compute, combinations, watermark in self._jobs:
+            for params in combinations():
+                try:
+                    # Taken before computing: data arriving meanwhile makes the entry stale, never wrong
+                    mark = await run_in_threadpool(watermark, **params)
+                    if inspect.iscoroutinefunction(compute):
+                        payload = await compute(**params)
+                    else:
+                        payload = await run_in_threadpool(compute, **params)
+                    self.store.put(endpoint, params, mark, payload, computed_at=started)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"Error precomputing {endpoint} {params}: {e}")
+        self.store.save()
+        self.runs += 1
+        self.last_run_seconds = round(time.time() - started, 1)
+
+    def start(self):
+        """Serve stored results; schedule runs too if no other process already does."""
+        self.enabled = True
+        self.store.load()
+        if not self._acquire_lock():
+            return
+
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+        self._scheduler = AsyncIOScheduler(event_loop=asyncio.get_running_loop())
+        # First run right away; a run still going when the next is due is skipped, not stacked
+        self._scheduler.add_job(
+            self.run_once, "interval", minutes=self.interval_minutes,
+            next_run_time=datetime.now(timezone.utc), max_instances=1, coalesce=True,
+        )
+        self._scheduler.start()
+
+    def shutdown(self):
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+        if self._lock_file is not None:
+            self._lock_file.close()  # releases the flock
+            self._lock_file = None
+        self.enabled = False
+
+    def _acquire_lock(self) -> bool:
+        if fcntl is None or not self.lock_path:
+            return True
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def stats(self) -> dict:
+        return {
+            **self.store.stats(),
+            "enabled": self.enabled,
+            "scheduling": self._scheduler is not None,
+            "interval_minutes": self.interval_minutes,
+            "runs": self.runs,
+            "errors": self.errors,
+            "last_run_started": self.last_run_started,
+            "last_run_seconds": self.last_run_seconds,
+        }
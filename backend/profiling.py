@@ -0,0 +1,250 @@
+"""
+On-demand profiling of single admin requests.
+A request carrying `X-Profile: 1` and a valid `X-Admin-Token` runs under a stack
+sampler and tracemalloc. Its response is unchanged apart from an X-Profile-Id header;
+the profile (flamegraph-ready collapsed stacks plus the top allocation sites) is
+written to PROFILE_DIR and served by /profiles/{id}.
+
+Scope: stacks are sampled from every thread and tracemalloc is process-wide, so
+requests running at the same time show up too; each profile records how many
+other requests overlapped it (`concurrent_requests`). Profile quiet periods, or
+read overlapping profiles with that in mind.
+
+Production safety: nothing runs unless ADMIN_TOKEN is set and matched, only one
+request is profiled at a time (others run normally with X-Profile-Status: busy),
+sampling stops after PROFILE_MAX_SECONDS, and tracemalloc is only active for the
+profiled request. The snapshot and profile files are written off the event loop,
+and only the newest PROFILE_KEEP profiles are kept. Compute-pool jobs of a
+profiled request run in-process so the sampler sees the model code.
+"""
+
+import contextvars
+import hmac
+import json
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(__file__), ".profiles"))
+# Stack sampling period and hard stop for one profiled request
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+# Stored profiles kept in PROFILE_DIR; older ones are deleted
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "100"))
+# Frames kept per allocation traceback (1 is enough for per-line sites and keeps overhead low)
+TRACEMALLOC_FRAMES = 1
+TOP_ALLOCATIONS = 25
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# Innermost frames of threads that are parked rather than working
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py", "thread.py")
+
+_profiling = contextvars.ContextVar("profiling", default=False)
+_profile_lock = threading.Lock()
+# HTTP requests in flight, and the overlap count of the profile in progress (event loop only)
+_inflight = 0
+_current_profile: Optional[dict] = None
+
+
+def profiling_active() -> bool:
+    """True inside a request that is being profiled."""
+    return _profiling.get()
+
+
+def is_admin(token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+class StackSampler:
+    """Samples every thread's Python stack on a timer into collapsed-stack counts."""
+
+    def __init__(self, interval: float, max_seconds: float):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        deadline = time.perf_counter() + self.max_seconds
+        while not self._stop.wait(self.interval) and time.perf_counter() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or frame.f_code.co_filename.endswith(_IDLE_FILES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg collapsed format, readable by flamegraph.pl and speedscope."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+def top_allocations(snapshot: tracemalloc.Snapshot, limit: int = TOP_ALLOCATIONS) -> list:
+    return [
+        {
+            "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+        # The sampler's own bookkeeping is not part of the request
+        for stat in snapshot.filter_traces([tracemalloc.Filter(False, __file__)]).statistics("lineno")[:limit]
+    ]
+
+
+def _profile_path(profile_id: str, ext: str) -> str:
+    return os.path.join(PROFILE_DIR, f"{profile_id}.{ext}")
+
+
+def load_profile(profile_id: str, collapsed: bool = False):
+    """Stored profile metadata dict (or collapsed-stack text); None if unknown."""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    try:
+        with open(_profile_path(profile_id, "collapsed" if collapsed else "json")) as f:
+            return f.read() if collapsed else json.load(f)
+    except OSError:
+        return None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles requests flagged by an admin."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _inflight
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if _current_profile is not None:
+            _current_profile["overlapping"] += 1
+        _inflight += 1
+        try:
+            await self._handle(scope, receive, send)
+        finally:
+            _inflight -= 1
+
+    async def _handle(self, scope, receive, send):
+        global _current_profile
+        headers = dict(scope.get("headers") or [])
+        flag = headers.get(b"x-profile", b"").decode().lower()
+        if flag not in ("1", "true", "yes") or not is_admin(headers.get(b"x-admin-token", b"").decode() or None):
+            return await self.app(scope, receive, send)
+
+        if not _profile_lock.acquire(blocking=False):
+            return await self.app(scope, receive, _with_headers(send, [(b"x-profile-status", b"busy")]))
+
+        profile_id = uuid.uuid4().hex
+        sampler = StackSampler(PROFILE_INTERVAL_MS / 1000, PROFILE_MAX_SECONDS)
+        # Leave tracemalloc alone if something else (e.g. PYTHONTRACEMALLOC) already runs it
+        owns_tracemalloc = not tracemalloc.is_tracing()
+        token = _profiling.set(True)
+        _current_profile = {"overlapping": _inflight - 1}
+        started = time.perf_counter()
+        status = {}
+        try:
+            if owns_tracemalloc:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            sampler.start()
+            await self.app(scope, receive, _with_headers(send, [(b"x-profile-id", profile_id.encode())], status))
+        finally:
+            elapsed = time.perf_counter() - started
+            overlapping = _current_profile["overlapping"]
+            _current_profile = None
+            _profiling.reset(token)
+            try:
+                # Snapshot and file writes take long enough to stall every other request on the loop
+                await run_in_threadpool(
+                    _finish_profile, profile_id, scope, status.get("code"), elapsed, sampler, owns_tracemalloc, overlapping,
+                )
+            finally:
+                _profile_lock.release()
+
+
+def _with_headers(send, extra: list, status: Optional[dict] = None):
+    async def wrapped(message):
+        if message["type"] == "http.response.start":
+            message["headers"] = list(message.get("headers", [])) + extra
+            if status is not None:
+                status["code"] = message["status"]
+        await send(message)
+    return wrapped
+
+
+def _finish_profile(profile_id: str, scope, status, elapsed: float, sampler: StackSampler, owns_tracemalloc: bool, overlapping: int):
+    sampler.stop()
+    snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+    peak = tracemalloc.get_traced_memory()[1] if snapshot is not None else None
+    if owns_tracemalloc:
+        tracemalloc.stop()
+    _store_profile(profile_id, scope, status, elapsed, sampler, snapshot, peak, overlapping)
+    _prune_profiles()
+
+
+def _store_profile(profile_id: str, scope, status, elapsed: float, sampler: StackSampler, snapshot, peak, overlapping: int):
+    meta = {
+        "profile_id": profile_id,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "method": scope["method"],
+        "path": scope["path"],
+        "query": scope.get("query_string", b"").decode(),
+        "status": status,
+        "duration_ms": round(elapsed * 1000, 1),
+        "samples": sampler.samples,
+        "interval_ms": PROFILE_INTERVAL_MS,
+        "traced_peak_kb": round(peak / 1024, 1) if peak is not None else None,
+        "top_allocations": top_allocations(snapshot) if snapshot is not None else [],
+        # Stacks and allocations are process-wide, not isolated to this request
+        "scope": "process",
+        "concurrent_requests": overlapping,
+    }
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(_profile_path(profile_id, "collapsed"), "w") as f:
+            f.write(sampler.collapsed())
+        with open(_profile_path(profile_id, "json"), "w") as f:
+            json.dump(meta, f, indent=2)
+    except OSError as e:
+        print(f"Error persisting profile {profile_id}: {e}")
+
+
+def _prune_profiles(keep: int = PROFILE_KEEP):
+    """Delete all but the newest `keep` profiles."""
+    try:
+        names = [n for n in os.listdir(PROFILE_DIR) if n.endswith(".json") and PROFILE_ID_PATTERN.match(n[:-5])]
+    except OSError:
+        return
+    names.sort(key=lambda n: os.path.getmtime(os.path.join(PROFILE_DIR, n)), reverse=True)
+    for name in names[keep:]:
+        for ext in ("json", "collapsed"):
+            try:
+                os.remove(_profile_path(name[:-5], ext))
+            except OSError:
+                pass
@@ -0,0 +1,40 @@
+"""Sorted-sweep Pareto frontier against the brute-force dominance check."""
+
+import numpy as np
+import pytest
+
+from ml.intervention_optimizer import pareto_front
+
+
+def brute_force_front(cost, averted, delay):
+    """Rows no other row beats or matches on every objective while beating it on one."""
+    score = np.column_stack([-cost, averted, delay])
+    ge = (score[:, None, :] >= score[None, :, :]).all(axis=2)
+    gt = (score[:, None, :] > score[None, :, :]).any(axis=2)
+    return np.flatnonzero(~(ge & gt).any(axis=0))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_brute_force_with_ties(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 300))
+    # Small integer ranges so equal costs, equal gains and identical rows all occur
+    cost = rng.integers(0, 15, n).astype(float)
+    averted = rng.integers(0, 10, n).astype(float)
+    delay = rng.integers(-4, 5, n)
+    np.testing.assert_array_equal(pareto_front(cost, averted, delay), brute_force_front(cost, averted, delay))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_brute_force_continuous(seed):
+    rng = np.random.default_rng(100 + seed)
+    n = 500
+    cost, averted, delay = rng.random(n), rng.normal(0, 100, n), rng.integers(-30, 60, n)
+    np.testing.assert_array_equal(pareto_front(cost, averted, delay), brute_force_front(cost, averted, delay))
+
+
+def test_identical_rows_are_kept_together():
+    cost = np.array([1.0, 1.0, 2.0])
+    averted = np.array([5.0, 5.0, 5.0])
+    delay = np.array([2, 2, 2])
+    np.testing.assert_array_equal(pareto_front(cost, averted, delay), [0, 1])
@@ -0,0 +1,85 @@
+"""Vectorized Rt kernel against the original per-day loop it replaced."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.rt import calendar, latest_rt, rt_series
+
+
+def baseline_rt_loop(daily: pd.DataFrame, window: int, disease: str):
+    """The per-day /r-value loop before vectorization, kept verbatim in behaviour."""
+    counts = daily["count"].values
+    dates = daily["date"].dt.date.values
+    daily = daily.assign(month=daily["date"].dt.month, year=daily["date"].dt.year)
+    historical = daily[daily["year"] < daily["year"].max()]
+    monthly_avg = historical.groupby("month")["count"].sum() / (historical.groupby("month").size() + 1e-9)
+
+    values = []
+    for i in range(window, len(counts)):
+        smooth_window = window * 3
+        recent_slice = counts[max(0, i - smooth_window):i]
+        previous_slice = counts[max(0, i - 2 * smooth_window):max(0, i - smooth_window)]
+        recent_avg = float(np.mean(recent_slice)) if len(recent_slice) > 0 else 0.0
+        previous_avg = float(np.mean(previous_slice)) if len(previous_slice) > 0 else 0.0
+
+        rt, status = None, "Insufficient Data"
+        if disease == "Tuberculosis":
+            pass
+        elif sum(previous_slice) >= 3:
+            if previous_avg < 10 / smooth_window:
+                rt = 1.0
+            else:
+                rt = round(1.0 + (recent_avg / previous_avg - 1.0) * 0.15, 2)
+                hist_avg = monthly_avg.get(pd.to_datetime(dates[i]).month, 0)
+                if hist_avg > 0 and abs(recent_avg - hist_avg) / max(hist_avg, 1) <= 0.40:
+                    rt = 1.0
+                rt = None if rt > 5.0 else min(rt, 1.8)
+            if rt is not None:
+                status = "Growing" if rt > 1.25 else ("Stable" if rt >= 0.95 else "Declining")
+        values.append((rt, status))
+    return values
+
+
+def synthetic_daily(seed: int, days: int = 500, skip: float = 0.2) -> pd.DataFrame:
+    """Daily counts over more than a year with outbreaks and lulls, and missing days."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-01-01", periods=days, freq="D")
+    # Log-rate random walk, then a lull below the baseline floor and an explosive surge,
+    # so the floor, dampening, seasonal, clamp and explosive-ratio rules all fire
+    rate = 6 * np.exp(np.cumsum(rng.normal(0, 0.2, days)).clip(-4, 4))
+    rate[-90:-45] = 0.3
+    rate[-45:] = 0.3 * np.exp(np.linspace(0, 7, 45))
+    daily = pd.DataFrame({"date": dates, "count": rng.poisson(rate)})
+    # Only days with cases are reported, and some days are missing entirely
+    keep = (daily["count"] > 0) & (rng.random(days) > skip)
+    return daily[keep].reset_index(drop=True)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("window", [3, 7, 14])
+@pytest.mark.parametrize("disease", ["Dengue", "Tuberculosis"])
+def test_rt_series_matches_loop(seed, window, disease):
+    daily = synthetic_daily(seed)
+    expected = baseline_rt_loop(daily, window, disease)
+
+    years, months = calendar(daily["date"])
+    rt, status = rt_series(daily["count"].to_numpy(), years, months, window, disease)
+
+    assert len(rt) == len(expected)
+    for (want_rt, want_status), got_rt, got_status in zip(expected, rt, status):
+        assert got_status == want_status
+        if want_rt is None:
+            assert np.isnan(got_rt)
+        else:
+            assert got_rt == want_rt
+
+
+@pytest.mark.parametrize("seed", [0, 3])
+def test_latest_rt_is_last_of_series(seed):
+    daily = synthetic_daily(seed)
+    years, months = calendar(daily["date"])
+    counts = daily["count"].to_numpy()
+    rt, _ = rt_series(counts, years, months, 7, "Dengue")
+    latest = latest_rt(counts, years, months, 7, "Dengue")
+    assert (latest is None and np.isnan(rt[-1])) or latest == rt[-1]
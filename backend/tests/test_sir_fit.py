@@ -0,0 +1,62 @@
+"""SIR calibration recovers known parameters and refuses to reuse fits that explain nothing."""
+
+import numpy as np
+import pytest
+
+from ml.sir_fit import fit_rejection, fit_sir, model_incidence
+
+
+def synthetic_incidence(beta: float, gamma: float, I0: float, population: float, days: int) -> np.ndarray:
+    return model_incidence(np.log([[beta, gamma, I0]]), population, days)[0]
+
+
+@pytest.mark.parametrize("beta, gamma, I0, population", [
+    (0.25, 1 / 12, 5, 5000),     # R0 = 3, peak inside the window
+    (0.12, 1 / 10, 20, 50000),   # R0 = 1.2, slow growth
+    (0.30, 1 / 16, 2, 20000),    # gamma below the Dengue default, within the band
+])
+def test_recovers_known_parameters(beta, gamma, I0, population):
+    observed = synthetic_incidence(beta, gamma, I0, population, 60)
+    fit = fit_sir(observed, population, "Dengue")
+
+    assert fit["fitted"] and fit["converged"]
+    assert fit["beta"] == pytest.approx(beta, rel=0.02)
+    assert fit["gamma"] == pytest.approx(gamma, rel=0.02)
+    assert fit["R0"] == pytest.approx(beta / gamma, rel=0.02)
+    assert fit["r_squared"] > 0.99
+    assert fit_rejection(fit) is None
+
+
+def test_recovers_parameters_from_noisy_counts():
+    rng = np.random.default_rng(7)
+    beta, gamma, population = 0.25, 1 / 12, 5000
+    observed = rng.poisson(synthetic_incidence(beta, gamma, 5, population, 60))
+    fit = fit_sir(observed, population, "Dengue")
+
+    assert fit["R0"] == pytest.approx(beta / gamma, rel=0.15)
+    assert fit["r_squared"] > 0.8
+    assert fit_rejection(fit) is None
+
+
+def test_reported_r0_matches_reusable_parameters():
+    observed = synthetic_incidence(0.2, 1 / 14, 3, 10000, 60)
+    fit = fit_sir(observed, 10000, "Dengue")
+    # Parameters are kept at full precision so a reused fit reproduces its R0
+    assert round(fit["beta"] / fit["gamma"], 2) == fit["R0"]
+
+
+def test_flat_endemic_series_is_not_reused():
+    rng = np.random.default_rng(3)
+    observed = rng.poisson(6, 60)
+    fit = fit_sir(observed, 5000, "Typhoid")
+
+    assert fit["fitted"]
+    assert fit_rejection(fit) is not None
+    # gamma stays within the disease band instead of sliding to a year-long recovery
+    assert 1 / 28 <= fit["gamma"] <= 1 / 7
+
+
+def test_too_little_data_is_not_fitted():
+    fit = fit_sir([0, 1, 0, 2, 1], 5000, "Dengue")
+    assert not fit["fitted"]
+    assert fit_rejection(fit) is not None
@@ -0,0 +1,16 @@
+"""Host-vector model initial state stays a valid partition of the vector population."""
+
+import pytest
+
+from ml.vector_model import run_vector_sir
+
+
+@pytest.mark.parametrize("initial_infected", [1, 500, 2500, 4000, 4999])
+def test_infected_vectors_never_exceed_vector_population(initial_infected):
+    population = 5000
+    result = run_vector_sir("Dengue", initial_infected, days=30, population=population, start_date="2026-01-15")
+    vectors = result["vector"]["vectors_per_host"] * population
+    # Dry-season start: capacity is flat, so the vector population stays at its day-0 size
+    assert all(0 <= v <= vectors * 1.001 for v in result["vector"]["infectious_vectors"])
+    assert min(result["susceptible"]) >= 0 and min(result["infected"]) >= 0
+
@@ -0,0 +1,51 @@
+-- Pre-aggregated daily case counts for the ML API
+-- The analytics endpoints only need per-day counts, so aggregate inside Postgres
+-- instead of shipping every raw medical record to the API and grouping in pandas.
+-- Payload size now scales with (days x groups), not with the number of records.
+
+CREATE OR REPLACE FUNCTION public.get_daily_case_counts(
+    p_diseases TEXT[] DEFAULT NULL,
+    p_state TEXT DEFAULT NULL,
+    p_city TEXT DEFAULT NULL,
+    p_ward TEXT DEFAULT NULL,
+    p_by_ward BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+    day DATE,
+    disease TEXT,
+    state TEXT,
+    city TEXT,
+    ward TEXT,
+    case_count BIGINT,
+    active_count BIGINT,
+    last_created_at TIMESTAMPTZ
+)
+LANGUAGE sql STABLE SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT
+        DATE(m.created_at) AS day,
+        d.name AS disease,
+        CASE WHEN p_by_ward THEN p.state END AS state,
+        CASE WHEN p_by_ward THEN p.city END AS city,
+        CASE WHEN p_by_ward THEN p.ward_name END AS ward,
+        COUNT(*) AS case_count,
+        COUNT(*) FILTER (WHERE UPPER(p.status) = 'ACTIVE') AS active_count,
+        MAX(m.created_at) AS last_created_at
+    FROM medical_records m
+    JOIN patients p ON p.id = m.patient_id
+    -- Label each record with the tracked disease(s) it matches; NULL list = no disease filter
+    LEFT JOIN UNNEST(p_diseases) AS d(name) ON m.diagnosis ILIKE '%' || d.name || '%'
+    WHERE (p_diseases IS NULL OR d.name IS NOT NULL)
+      AND (p_state IS NULL OR p.state = p_state)
+      AND (p_city IS NULL OR p.city = p_city)
+      AND (p_ward IS NULL OR p.ward_name = p_ward)
+    GROUP BY 1, 2, 3, 4, 5
+    ORDER BY 1, 2, 3, 4, 5;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.get_daily_case_counts(TEXT[], TEXT, TEXT, TEXT, BOOLEAN) TO authenticated, service_role;
+
+-- Index for the date bucketing / range scans above
+CREATE INDEX IF NOT EXISTS idx_medical_records_created_at ON public.medical_records(created_at);
+CREATE INDEX IF NOT EXISTS idx_medical_records_patient_id ON public.medical_records(patient_id);
@@ -0,0 +1,51 @@
+-- Cheap change marker for the data behind an analytics result
+-- The ML API checks this before serving a precomputed answer; it is one aggregate
+-- row per call, so the check costs far less than re-reading the daily counts.
+
+CREATE OR REPLACE FUNCTION public.get_data_watermark(
+    p_diseases TEXT[] DEFAULT NULL,
+    p_state TEXT DEFAULT NULL,
+    p_city TEXT DEFAULT NULL,
+    p_ward TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    last_created_at TIMESTAMPTZ,
+    record_count BIGINT,
+    patients_updated_at TIMESTAMPTZ
+)
+LANGUAGE sql STABLE SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT
+        MAX(m.created_at) AS last_created_at,
+        COUNT(*) AS record_count,
+        (SELECT MAX(updated_at) FROM patients) AS patients_updated_at
+    FROM medical_records m
+    JOIN patients p ON p.id = m.patient_id
+    WHERE (p_diseases IS NULL OR EXISTS (
+            SELECT 1 FROM UNNEST(p_diseases) AS d(name) WHERE m.diagnosis ILIKE '%' || d.name || '%'
+        ))
+      AND (p_state IS NULL OR p.state = p_state)
+      AND (p_city IS NULL OR p.city = p_city)
+      AND (p_ward IS NULL OR p.ward_name = p_ward);
+$$;
+
+GRANT EXECUTE ON FUNCTION public.get_data_watermark(TEXT[], TEXT, TEXT, TEXT) TO authenticated, service_role;
+
+-- Keep patients.updated_at current so location / status edits move the watermark
+CREATE OR REPLACE FUNCTION public.touch_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at = timezone('utc'::text, now());
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS touch_patients_updated_at ON public.patients;
+CREATE TRIGGER touch_patients_updated_at
+    BEFORE UPDATE ON public.patients
+    FOR EACH ROW EXECUTE FUNCTION public.touch_updated_at();
+
+CREATE INDEX IF NOT EXISTS idx_patients_updated_at ON public.patients(updated_at);